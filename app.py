@@ -5,52 +5,58 @@ import os
 import shutil
 import sys
 import json
+import re
 import traceback
+import multiprocessing
+from datetime import datetime
 from tkinter import filedialog, messagebox
 
-from backend import AudioEngine
+# backend (torch, whisper, qwen_tts) is imported where the engine is created,
+# not here: on Windows every BookSmith worker process re-imports this module
 
 # ============================================================================
 # PERMANENT FIX: Windows "Run as Admin" Bypass for AI Models
 # ============================================================================
 # This forces the app to COPY model files instead of linking them if the user
 # does not have the "Create Symbolic Links" privilege (WinError 1314).
-if os.name == 'nt':
-    try:
-        # 1. Test if we can create a real symlink
-        test_src = "symlink_test_src"
-        test_dst = "symlink_test_dst"
-        with open(test_src, 'w') as f: f.write("test")
+def _enable_symlink_copy_mode():
+    """Called from __main__ only, so worker processes never probe (and race on) the test files."""
+    if os.name == 'nt':
         try:
-            os.symlink(test_src, test_dst)
-            # If successful, clean up and do nothing (User has Admin/Dev Mode)
-            os.remove(test_src)
-            os.remove(test_dst)
-        except OSError as e:
-            # 2. If we get the privilege error, enable the "Copy Mode" patch
-            if getattr(e, 'winerror', 0) == 1314:
-                print("Notice: User lacks Symlink privilege. Enabling 'Copy Mode' for models.")
+            # 1. Test if we can create a real symlink
+            test_src = "symlink_test_src"
+            test_dst = "symlink_test_dst"
+            with open(test_src, 'w') as f: f.write("test")
+            try:
+                os.symlink(test_src, test_dst)
+                # If successful, clean up and do nothing (User has Admin/Dev Mode)
+                os.remove(test_src)
+                os.remove(test_dst)
+            except OSError as e:
+                # 2. If we get the privilege error, enable the "Copy Mode" patch
+                if getattr(e, 'winerror', 0) == 1314:
+                    print("Notice: User lacks Symlink privilege. Enabling 'Copy Mode' for models.")
                 
-                # Monkey-patch os.symlink to perform a copy instead
-                def symlink_copy(src, dst, target_is_directory=False, dir_fd=None):
-                    try:
-                        if os.path.isdir(src):
-                            shutil.copytree(src, dst)
-                        else:
-                            shutil.copy2(src, dst)
-                    except FileExistsError:
-                        pass # Target already exists, we are good
-                    except Exception as copy_err:
-                        print(f"Copy Mode Error: {copy_err}")
-                        raise
-
-                os.symlink = symlink_copy
+                    # Monkey-patch os.symlink to perform a copy instead
+                    def symlink_copy(src, dst, target_is_directory=False, dir_fd=None):
+                        try:
+                            if os.path.isdir(src):
+                                shutil.copytree(src, dst)
+                            else:
+                                shutil.copy2(src, dst)
+                        except FileExistsError:
+                            pass # Target already exists, we are good
+                        except Exception as copy_err:
+                            print(f"Copy Mode Error: {copy_err}")
+                            raise
+
+                    os.symlink = symlink_copy
             
-            # Clean up the test source file if the link failed
-            if os.path.exists(test_src): os.remove(test_src)
+                # Clean up the test source file if the link failed
+                if os.path.exists(test_src): os.remove(test_src)
 
-    except Exception as e:
-        print(f"Symlink Check Failed: {e}")
+        except Exception as e:
+            print(f"Symlink Check Failed: {e}")
 
 # ============================================================================
 # END FIX
@@ -81,6 +87,8 @@ class Vox1App(ctk.CTk):
         self.book_metadata = None  # Store JSON metadata (title, author, chapter count)
         self.stop_event = threading.Event()
         self.is_rendering = False
+        self.tune_stop_event = threading.Event()
+        self.is_tuning = False
 
         # BookSmith state
         self.booksmith_data = None  # Stores BookData object from BookSmith
@@ -113,7 +121,13 @@ class Vox1App(ctk.CTk):
             "show_timing": True,
             "debug_mode": False,
             "smart_import": True,
-            "attn_implementation": "auto"
+            "attn_implementation": "auto",
+            "schedule_mode": "length",
+            "memory_watermark": 0.85,
+            "save_trace": False,
+            "stream_preview": True,
+            "metrics_port": 0,
+            "ref_prompt_tokens": 160
         }
 
     def _save_settings(self):
@@ -135,12 +149,19 @@ class Vox1App(ctk.CTk):
                 self.settings["show_timing"] = self.show_timing_var.get()
             if hasattr(self, 'debug_mode_var'):
                 self.settings["debug_mode"] = self.debug_mode_var.get()
+            if hasattr(self, 'save_trace_var'):
+                self.settings["save_trace"] = self.save_trace_var.get()
+            if hasattr(self, 'stream_preview_var'):
+                self.settings["stream_preview"] = self.stream_preview_var.get()
             # Save Smart Import setting
             if hasattr(self, 'smart_import_var'):
                 self.settings["smart_import"] = self.smart_import_var.get()
             # Save Attention Implementation setting
             if hasattr(self, 'attn_implementation_var'):
                 self.settings["attn_implementation"] = self.attn_implementation_var.get()
+            # Save Render Order setting
+            if hasattr(self, 'schedule_mode_var'):
+                self.settings["schedule_mode"] = self.schedule_mode_var.get()
             with open(self.settings_file, 'w') as f: json.dump(self.settings, f, indent=2)
         except: pass
 
@@ -246,7 +267,17 @@ class Vox1App(ctk.CTk):
         self.desc_entry.insert("0.0", "A deep, soothing male voice.")
         
         self.file_label = ctk.CTkLabel(self.input_frame, text="Reference Audio:", anchor="w")
-        self.file_btn = ctk.CTkButton(self.input_frame, text="Choose File...", command=self._choose_ref_file)
+        self.ref_btn_frame = ctk.CTkFrame(self.input_frame, fg_color="transparent")
+        self.file_btn = ctk.CTkButton(self.ref_btn_frame, text="Choose File...", command=self._choose_ref_file)
+        self.file_btn.pack(side="left")
+        # Batch import: rank a folder of raw takes, then pick among the best clips
+        self.folder_btn = ctk.CTkButton(self.ref_btn_frame, text="Rank Folder...", command=self._rank_voice_folder,
+                                        fg_color="#555555")
+        self.folder_btn.pack(side="left", padx=10)
+        self.candidate_var = ctk.StringVar(value="")
+        self.candidate_menu = ctk.CTkOptionMenu(self.ref_btn_frame, variable=self.candidate_var, values=[""],
+                                                width=260, command=self._select_candidate)
+        self.candidate_labels = {}
         self.ref_file_path_label = ctk.CTkLabel(self.input_frame, text="No file selected", text_color="gray")
 
         # Smart Import checkbox for Lab tab
@@ -271,9 +302,53 @@ class Vox1App(ctk.CTk):
         self.gen_btn.pack(side="left", padx=5)
         self.play_btn = ctk.CTkButton(self.action_frame, text="Play Preview", command=self._play_preview, state="disabled", fg_color="green")
         self.play_btn.pack(side="left", padx=5)
+        self.stream_preview_var = ctk.BooleanVar(value=self.settings.get("stream_preview", True))
+        self.stream_preview_checkbox = ctk.CTkCheckBox(self.action_frame, text="Stream clone preview",
+                                                       variable=self.stream_preview_var, font=("Arial", 12))
+        self.stream_preview_checkbox.pack(side="left", padx=10)
         self.save_master_btn = ctk.CTkButton(self.action_frame, text="Save as Master Voice", command=self._save_master, state="disabled", fg_color="orange")
         self.save_master_btn.pack(side="right", padx=5)
 
+        # Takes: fixed seed replays a cached take instantly; blank = new take
+        self.takes_frame = ctk.CTkFrame(self.tab_lab, fg_color="transparent")
+        self.takes_frame.grid(row=3, column=0, sticky="ew", padx=10, pady=(0, 10))
+        ctk.CTkLabel(self.takes_frame, text="Seed:").pack(side="left", padx=(5, 2))
+        self.seed_entry = ctk.CTkEntry(self.takes_frame, width=80, placeholder_text="new take")
+        self.seed_entry.pack(side="left", padx=(0, 10))
+        ctk.CTkLabel(self.takes_frame, text="Design variants:").pack(side="left", padx=(10, 2))
+        self.variants_var = ctk.StringVar(value="1")
+        self.variants_menu = ctk.CTkOptionMenu(self.takes_frame, variable=self.variants_var,
+                                               values=["1", "2", "4", "6", "8"], width=60)
+        self.variants_menu.pack(side="left", padx=(0, 10))
+        ctk.CTkLabel(self.takes_frame, text="Previous takes:").pack(side="left", padx=(10, 2))
+        self.take_labels = {}
+        self.take_var = ctk.StringVar(value="")
+        self.take_menu = ctk.CTkOptionMenu(self.takes_frame, variable=self.take_var, values=[""],
+                                           command=self._select_take, width=360)
+        self.take_menu.pack(side="left", padx=5, fill="x", expand=True)
+
+    def _refresh_takes(self):
+        if not self.engine: return
+        self.take_labels = {}
+        for take in self.engine.preview_cache.history():
+            when = datetime.fromtimestamp(take["created"]).strftime("%H:%M:%S")
+            label = f"{when} {take['kind']} s{take['seed']}: {take['voice'][:28]} | {take['text'][:24]}"
+            self.take_labels[label] = take
+        labels = list(self.take_labels) or [""]
+        self.take_menu.configure(values=labels)
+        self.take_var.set(labels[0])
+
+    def _select_take(self, label):
+        take = self.take_labels.get(label)
+        if not take: return
+        self.preview_path = take["path"]
+        self.preview_is_design = take["kind"].startswith("design")
+        self.seed_entry.delete(0, "end")
+        self.seed_entry.insert(0, str(take["seed"]))
+        self.play_btn.configure(state="normal")
+        self.save_master_btn.configure(state="normal")
+        self.log(f"Selected take: {label}")
+
     def _setup_booksmith_tab(self):
         """Setup BookSmith tab for EPUB/PDF processing."""
         # Use same pattern as Studio tab - scrollable frame at top level
@@ -621,6 +696,26 @@ class Vox1App(ctk.CTk):
             font=("Roboto", 11), justify="left", text_color="gray")
         chunk_info.grid(row=3, column=0, sticky="w", pady=5)
 
+        # Render Order
+        order_label = ctk.CTkLabel(chunk_frame, text="Render Order (Default: length)",
+                                   font=("Roboto", 14, "bold"))
+        order_label.grid(row=4, column=0, sticky="w", pady=(15, 5))
+
+        self.schedule_mode_var = ctk.StringVar(value=self.settings.get("schedule_mode", "length"))
+        self.schedule_menu = ctk.CTkOptionMenu(chunk_frame,
+                                               variable=self.schedule_mode_var,
+                                               values=["length", "chapter"],
+                                               width=200)
+        self.schedule_menu.grid(row=5, column=0, sticky="w", pady=5)
+
+        order_info = ctk.CTkLabel(chunk_frame,
+            text="ℹ️ Order in which chunks are sent to the GPU:\n" +
+                 "   • length = Longest chunks first (fastest overall)\n" +
+                 "   • chapter = Reading order; each chapter (or preview part for .txt)\n" +
+                 "     is saved as soon as it is done so you can start listening early",
+            font=("Roboto", 11), justify="left", text_color="gray")
+        order_info.grid(row=6, column=0, sticky="w", pady=5)
+
         # Separator
         sep2 = ctk.CTkFrame(self.advanced_scroll, height=2, fg_color="gray30")
         sep2.grid(row=7, column=0, sticky="ew", pady=15)
@@ -709,6 +804,11 @@ class Vox1App(ctk.CTk):
                                              variable=self.debug_mode_var)
         self.debug_checkbox.grid(row=2, column=0, sticky="w", pady=5)
 
+        self.save_trace_var = ctk.BooleanVar(value=self.settings.get("save_trace", False))
+        self.trace_checkbox = ctk.CTkCheckBox(monitor_frame, text="Save render trace (Output/traces, open in ui.perfetto.dev)",
+                                             variable=self.save_trace_var)
+        self.trace_checkbox.grid(row=3, column=0, sticky="w", pady=5)
+
         # Separator
         sep4 = ctk.CTkFrame(self.advanced_scroll, height=2, fg_color="gray30")
         sep4.grid(row=14, column=0, sticky="ew", pady=15)
@@ -761,7 +861,71 @@ class Vox1App(ctk.CTk):
         self.rep_value_label.configure(text=f"Current: {float(value):.2f}")
 
     def _auto_detect_batch_size(self):
-        """Auto-detect optimal batch size based on available VRAM."""
+        """Use a saved auto-tune result, run a new sweep, or fall back to the VRAM table."""
+        if self.is_tuning:
+            # STOP COMMAND
+            self.tune_stop_event.set()
+            self.auto_detect_btn.configure(text="Stopping...", state="disabled")
+            return
+        if self.engine:
+            tuned = self.engine.tuned_settings()
+            if tuned and not messagebox.askyesno("Auto-Detect",
+                    f"Saved auto-tune for this GPU/model:\n" +
+                    f"Batch Size: {tuned['batch_size']}, Chunk Size: {tuned['chunk_size']}\n" +
+                    f"({tuned['chars_per_sec']:.0f} chars/s, measured {tuned['created']})\n\n" +
+                    f"Run a new sweep instead?"):
+                self._apply_tuned_settings(tuned)
+                return
+            if self.master_voice_path and not self.is_rendering and messagebox.askyesno("Auto-Tune",
+                    "Run timed test renders across batch and chunk sizes with your master voice?\n\n" +
+                    "This takes a few minutes. Choose No for a quick VRAM-based guess."):
+                self._run_auto_tune()
+                return
+        self._guess_batch_size_from_vram()
+
+    def _apply_tuned_settings(self, tuned):
+        self.batch_size_var.set(tuned["batch_size"])
+        self._update_batch_label(tuned["batch_size"])
+        self.chunk_size_var.set(tuned["chunk_size"])
+        self._update_chunk_label(tuned["chunk_size"])
+        self.log(f"Auto-tune settings loaded: batch {tuned['batch_size']}, chunk {tuned['chunk_size']}. "
+                 f"Click Apply to use them.")
+
+    def _run_auto_tune(self):
+        self.tune_stop_event.clear()
+        self.is_tuning = True
+        self.auto_detect_btn.configure(text="Stop Auto-Tune")
+        self.render_btn.configure(state="disabled")
+        self.status_bar.configure(text="Auto-tuning...")
+        self.progress_bar.set(0)
+
+        def run():
+            try:
+                tuned = self.engine.auto_tune(self.master_voice_path,
+                                              progress_callback=lambda p: self.after(0, lambda: self.progress_bar.set(p)),
+                                              stop_event=self.tune_stop_event)
+                if self.tune_stop_event.is_set():
+                    self.log("Auto-tune stopped. Settings unchanged.")
+                elif tuned:
+                    self.after(0, lambda: self._apply_tuned_settings(tuned))
+                    self.after(0, lambda: messagebox.showinfo("Auto-Tune",
+                        f"Fastest stable setting:\nBatch Size: {tuned['batch_size']}\n" +
+                        f"Chunk Size: {tuned['chunk_size']}\n\nClick Apply to use it."))
+                else:
+                    self.after(0, lambda: messagebox.showwarning("Auto-Tune", "No configuration completed. Check the Activity Log."))
+            except Exception:
+                self.log(traceback.format_exc())
+                self.after(0, lambda: messagebox.showerror("Auto-Tune", "Auto-tune failed. Check Activity Log for details."))
+            finally:
+                self.is_tuning = False
+                self.after(0, lambda: self.auto_detect_btn.configure(state="normal", text="Auto-Detect Optimal Size"))
+                self.after(0, lambda: self.status_bar.configure(text="Ready"))
+                self.after(0, self._check_render_ready)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _guess_batch_size_from_vram(self):
+        """Map total VRAM to a batch size (quick guess, no test renders)."""
         try:
             import torch
             if torch.cuda.is_available():
@@ -799,11 +963,13 @@ class Vox1App(ctk.CTk):
         self.batch_size_var.set(2)
         self.chunk_size_var.set(500)
         self.attn_implementation_var.set("auto")
+        self.schedule_mode_var.set("length")
         self.temperature_var.set(0.7)
         self.repetition_penalty_var.set(1.05)
         self.show_vram_var.set(True)
         self.show_timing_var.set(True)
         self.debug_mode_var.set(False)
+        self.save_trace_var.set(False)
         self._update_batch_label(2)
         self._update_chunk_label(500)
         self._update_temp_label(0.7)
@@ -842,6 +1008,7 @@ class Vox1App(ctk.CTk):
                     f"Batch Size: {self.batch_size_var.get()}\n" +
                     f"Chunk Size: {self.chunk_size_var.get()}\n" +
                     f"Attention: {self.attn_implementation_var.get()}\n" +
+                    f"Render Order: {self.schedule_mode_var.get()}\n" +
                     f"Temperature: {self.temperature_var.get():.1f}\n" +
                     f"Repetition Penalty: {self.repetition_penalty_var.get():.2f}\n\n" +
                     f"Engine reloaded with new settings."))
@@ -877,6 +1044,12 @@ class Vox1App(ctk.CTk):
                 top_k = self.settings.get("top_k", 20)
                 repetition_penalty = self.settings.get("repetition_penalty", 1.05)
                 attn_implementation = self.settings.get("attn_implementation", "auto")
+                schedule_mode = self.settings.get("schedule_mode", "length")
+                memory_watermark = self.settings.get("memory_watermark", 0.85)
+                save_trace = self.settings.get("save_trace", False)
+                metrics_port = self.settings.get("metrics_port", 0)
+                ref_prompt_tokens = self.settings.get("ref_prompt_tokens", 160)
+                from backend import AudioEngine
                 self.engine = AudioEngine(
                     log_callback=self.log,
                     model_size=size,
@@ -886,11 +1059,17 @@ class Vox1App(ctk.CTk):
                     top_p=top_p,
                     top_k=top_k,
                     repetition_penalty=repetition_penalty,
-                    attn_implementation=attn_implementation
+                    attn_implementation=attn_implementation,
+                    schedule_mode=schedule_mode,
+                    memory_watermark=memory_watermark,
+                    trace_renders=save_trace,
+                    metrics_port=metrics_port,
+                    ref_prompt_tokens=ref_prompt_tokens
                 )
                 self.after(0, lambda: self.status_bar.configure(text=f"System Ready ({size})"))
                 self.after(0, lambda: self.gen_btn.configure(state="normal"))
                 self.after(0, self._check_render_ready)
+                self.after(0, self._refresh_takes)
             except Exception as e:
                 err_msg = traceback.format_exc()
                 self.log("ENGINE ERROR:\n" + err_msg)
@@ -902,14 +1081,14 @@ class Vox1App(ctk.CTk):
     def _update_lab_mode(self):
         mode = self.mode_var.get()
         if mode == "design":
-            self.file_label.grid_forget(); self.file_btn.grid_forget(); self.ref_file_path_label.grid_forget()
+            self.file_label.grid_forget(); self.ref_btn_frame.grid_forget(); self.ref_file_path_label.grid_forget()
             self.smart_import_checkbox.grid_forget()
             self.desc_label.grid(row=0, column=0, sticky="w", padx=10, pady=(10,0))
             self.desc_entry.grid(row=1, column=0, sticky="ew", padx=10, pady=5)
         else:
             self.desc_label.grid_forget(); self.desc_entry.grid_forget()
             self.file_label.grid(row=0, column=0, sticky="w", padx=10, pady=(10,0))
-            self.file_btn.grid(row=1, column=0, sticky="w", padx=10, pady=5)
+            self.ref_btn_frame.grid(row=1, column=0, sticky="w", padx=10, pady=5)
             self.ref_file_path_label.grid(row=2, column=0, sticky="w", padx=10, pady=5)
             self.smart_import_checkbox.grid(row=3, column=0, sticky="w", padx=10, pady=(5, 10))
 
@@ -934,22 +1113,87 @@ class Vox1App(ctk.CTk):
 
         self.ref_file_path_label.configure(text=os.path.basename(path))
 
+    def _rank_voice_folder(self):
+        if not self.engine:
+            messagebox.showerror("Voice import", "Wait for the engine to finish loading.")
+            return
+        folder = filedialog.askdirectory(title="Folder of reference recordings")
+        if not folder:
+            return
+        self.folder_btn.configure(state="disabled", text="Ranking...")
+        self.status_bar.configure(text="Ranking voice recordings...")
+        def run():
+            try:
+                top = self.engine.import_voice_folder(folder)
+                self.after(0, lambda: self._show_candidates(top))
+            except Exception as e:
+                self.log(traceback.format_exc())
+                msg = str(e)  # e is unbound once the except block ends, before the callback runs
+                self.after(0, lambda m=msg: messagebox.showerror("Voice import", m))
+            finally:
+                self.after(0, lambda: self.folder_btn.configure(state="normal", text="Rank Folder..."))
+                self.after(0, lambda: self.status_bar.configure(text="Ready"))
+        threading.Thread(target=run, daemon=True).start()
+
+    def _show_candidates(self, top):
+        self.candidate_labels = {f"{i}. {os.path.basename(c['path'])} ({c['score']:.2f})": c
+                                 for i, c in enumerate(top, 1)}
+        if not self.candidate_labels:
+            self.candidate_menu.pack_forget()
+            return
+        labels = list(self.candidate_labels)
+        self.candidate_menu.configure(values=labels)
+        self.candidate_menu.pack(side="left")
+        self._select_candidate(labels[0])
+
+    def _select_candidate(self, label):
+        cand = self.candidate_labels.get(label)
+        if not cand: return
+        self.candidate_var.set(label)
+        self.ref_file_path = cand["clip"]
+        self.ref_file_path_label.configure(text=os.path.basename(cand["clip"]))
+        self.log(f"Reference: {label} - \"{cand['ref_text'][:60]}\"")
+
     def _generate_preview(self):
         mode = self.mode_var.get()
         text = self.preview_entry.get()
+        seed_text = self.seed_entry.get().strip()
+        if seed_text and not seed_text.isdigit():
+            messagebox.showerror("Seed", "Seed must be a whole number (or blank for a new take).")
+            return
+        seed = int(seed_text) if seed_text else None
         self.gen_btn.configure(state="disabled", text="Working...")
         self.status_bar.configure(text="Generating...")
         def run():
             try:
                 if mode == "design":
                     desc = self.desc_entry.get("0.0", "end").strip()
-                    path = self.engine.create_voice_design(text, desc)
+                    # Description tweaks: alternatives separated by a line containing only ---
+                    tweaks = [d.strip() for d in re.split(r"^\s*---\s*$", desc, flags=re.MULTILINE) if d.strip()]
+                    count = int(self.variants_var.get())
+                    if len(tweaks) > 1 or count > 1:
+                        paths = self.engine.create_voice_design_variants(
+                            text, tweaks[0], count=count, descriptions=tweaks if len(tweaks) > 1 else None, seed=seed)
+                        self.log(f"{len(paths)} variants ready. Pick one under 'Previous takes', then Save as Master Voice.")
+                        path = paths[0]
+                    else:
+                        path = self.engine.create_voice_design(text, desc, seed=seed)
                 else:
                     if not hasattr(self, 'ref_file_path'): raise ValueError("No file selected")
-                    path = self.engine.create_voice_clone_preview(text, self.ref_file_path)
+                    if self.stream_preview_var.get():
+                        def first_audio(partial_path):
+                            self.preview_path = partial_path
+                            self.after(0, lambda: self.play_btn.configure(state="normal"))
+                            self.after(0, lambda: self.status_bar.configure(text="Playing while generating..."))
+                        path = self.engine.stream_voice_clone_preview(text, self.ref_file_path,
+                                                                      on_first_audio=first_audio, seed=seed)
+                    else:
+                        path = self.engine.create_voice_clone_preview(text, self.ref_file_path, seed=seed)
                 self.preview_path = path
+                self.preview_is_design = mode == "design"
                 self.after(0, lambda: self.play_btn.configure(state="normal"))
                 self.after(0, lambda: self.save_master_btn.configure(state="normal"))
+                self.after(0, self._refresh_takes)
                 self.after(0, lambda: self.status_bar.configure(text="Done"))
             except Exception as e:
                 self.log(traceback.format_exc())
@@ -965,7 +1209,7 @@ class Vox1App(ctk.CTk):
         if self.preview_path:
             import shutil
             target = "master_voice.wav"
-            if self.mode_var.get() == "design": shutil.copy(self.preview_path, target)
+            if getattr(self, 'preview_is_design', self.mode_var.get() == "design"): shutil.copy(self.preview_path, target)
             else: shutil.copy(self.ref_file_path, target)
             self.master_voice_path = target
             self.studio_status.configure(text="Master Voice: LOADED", text_color="green")
@@ -1025,6 +1269,7 @@ class Vox1App(ctk.CTk):
                 title = manifest.get("title", "Untitled")
                 author = manifest.get("author", "Unknown")
                 chapter_count = len(manifest.get("chapters", []))
+                voice_count = len(manifest.get("voices", {}) or {})
 
                 self.book_metadata = {
                     "title": title,
@@ -1033,10 +1278,12 @@ class Vox1App(ctk.CTk):
                 }
 
                 self.book_label.configure(text=f"📖 {title}")
+                cast_info = f" • narrator + {voice_count} voices" if voice_count else ""
                 self.book_info_label.configure(
-                    text=f"by {author} • {chapter_count} chapters • JSON Manifest"
+                    text=f"by {author} • {chapter_count} chapters{cast_info} • JSON Manifest"
                 )
-                self.log(f"Loaded JSON manifest: '{title}' by {author} ({chapter_count} chapters)")
+                self.log(f"Loaded JSON manifest: '{title}' by {author} ({chapter_count} chapters{cast_info})")
+                self._log_render_estimate(sum(len(ch.get("text", "")) for ch in manifest.get("chapters", [])))
 
             except Exception as e:
                 self.log(f"Error reading JSON manifest: {e}")
@@ -1051,9 +1298,25 @@ class Vox1App(ctk.CTk):
             self.book_label.configure(text=os.path.basename(path))
             self.book_info_label.configure(text="")
             self.log(f"Loaded book: {path}")
+            try:
+                self._log_render_estimate(os.path.getsize(path))
+            except OSError:
+                pass
 
         self._check_render_ready()
 
+    def _log_render_estimate(self, chars):
+        """Show the history-based render time / output length estimate for a loaded book."""
+        if not self.engine or not chars: return
+        estimate = self.engine.estimate_render(chars, chunk_size=int(self.settings.get("chunk_size", 500)))
+        audio_h = estimate["audio_seconds"] / 3600
+        if estimate["render_seconds"] is not None:
+            render_h = estimate["render_seconds"] / 3600
+            self.log(f"Estimated output: ~{audio_h:.1f}h of audio, render time ~{render_h:.1f}h "
+                     f"(from {estimate['runs']} past renders)")
+        else:
+            self.log(f"Estimated output: ~{audio_h:.1f}h of audio (render time estimate available after the first render)")
+
     def _check_render_ready(self):
         # Book is ready if we have book_path OR book_metadata (from BookSmith)
         book_ready = self.book_path or (self.book_metadata and self.book_metadata.get("manifest"))
@@ -1153,16 +1416,18 @@ class Vox1App(ctk.CTk):
 
         def process():
             try:
-                from booksmith_module import EPUBProcessor, PDFProcessor
+                from booksmith_module import EPUBProcessor, PDFProcessor, IngestCache
 
                 self.log(f"BookSmith: Processing {file_ext.upper()} file...")
 
+                # Reopening an unchanged book (even in a later session) skips extraction
+                cache = IngestCache(os.path.join(os.path.dirname(os.path.abspath(__file__)), "booksmith_cache"))
+                def progress(msg):
+                    self.log(f"[BookSmith] {msg}")
                 if file_ext == 'epub':
-                    book_data = EPUBProcessor.process(path)
+                    book_data = EPUBProcessor.process(path, cache=cache, progress_callback=progress)
                 else:  # pdf
-                    def progress(msg):
-                        self.log(f"[BookSmith] {msg}")
-                    book_data = PDFProcessor.process(path, progress_callback=progress)
+                    book_data = PDFProcessor.process(path, progress_callback=progress, cache=cache)
 
                 self.booksmith_data = book_data
 
@@ -1418,6 +1683,7 @@ class Vox1App(ctk.CTk):
         )
 
         self.log(f"✓ Book ready: '{manifest['title']}' with {len(manifest['chapters'])} chapters")
+        self._log_render_estimate(sum(len(ch.get("text", "")) for ch in manifest["chapters"]))
 
         # Mark book as ready for rendering
         self._check_render_ready()
@@ -1438,5 +1704,7 @@ class Vox1App(ctk.CTk):
         if self.engine: os.startfile(self.engine.output_dir)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Frozen builds: let pool workers run their task, not the GUI
+    _enable_symlink_copy_mode()
     app = Vox1App()
     app.mainloop()
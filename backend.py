@@ -15,6 +15,22 @@ import gc
 import subprocess
 import json
 import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import sqlite3
+from contextlib import contextmanager, closing
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+try:
+    import psutil  # Optional: RSS / system RAM for the memory policy
+except ImportError:
+    psutil = None
+
+try:
+    import sounddevice  # Optional: live playback of streaming previews
+except (ImportError, OSError):  # OSError: PortAudio library missing
+    sounddevice = None
 
 # ============================================================================
 # PERMANENT FIX: Windows "Run as Admin" Bypass for AI Models
@@ -65,59 +81,52 @@ if os.name == 'nt':
 # SMART IMPORT FEATURE
 # ============================================================================
 
-def smart_import_audio(input_path, log_callback=None):
+SMART_IMPORT_ANALYSIS_RATE = 16000  # Hz; the speech scan never needs more
+SMART_IMPORT_BLOCK_SECONDS = 30     # audio decoded per pipe read
+SMART_IMPORT_FRAME_MS = 10          # loudness frame length
+VOICE_IMPORT_EXTENSIONS = (".wav", ".mp3", ".flac", ".m4a", ".ogg", ".opus", ".aac")
+VOICE_IMPORT_TOP_N = 5
+
+def smart_import_audio(input_path, log_callback=None, output_path=None):
     """
     Optimizes audio file for voice cloning:
     - Normalizes volume (DISABLED to preserve quality)
     - Finds best 5-second segment if file is long
     - Strips silence
     - Exports as WAV (Original Sample Rate)
+
+    The file is scanned through an ffmpeg pipe a block at a time, keeping only
+    10 ms loudness frames, so multi-hour recordings never sit in RAM. Only the
+    chosen segment is decoded at full quality.
     """
     def log(msg):
         if log_callback:
             log_callback(msg)
 
     try:
-        log("Smart Import: Loading audio file...")
-
-        # 1. Load audio
-        audio = AudioSegment.from_file(input_path)
-        original_duration = len(audio) / 1000  # Convert to seconds
-
-        # 2. Convert to mono (Required for model structure, but keep sample rate high)
-        audio = audio.set_channels(1)
-        
-        # --- DISABLED NORMALIZATION to preserve original dynamics ---
-        # change_in_dBFS = -20 - audio.dBFS
-        # audio = audio.apply_gain(change_in_dBFS)
-        log("Smart Import: Converted to mono (Volume untouched)")
+        log("Smart Import: Scanning audio file...")
 
-        # 3. If <= 10 seconds, just strip silence and return
-        if len(audio) <= 10000:
-            log("Smart Import: File is short, optimizing...")
-            audio = strip_silence(audio, silence_thresh=-40, padding=100)
+        # 1. Stream the file once for its loudness track (mono, analysis rate)
+        rms_values, original_duration = _stream_frame_rms(input_path)
 
+        if output_path is None:
             output_dir = "VOX-Output"
             os.makedirs(output_dir, exist_ok=True)
             output_path = os.path.join(output_dir, "master_voice_optimized.wav")
 
-            # Keep original sample rate
-            audio.export(output_path, format="wav") 
-            
+        # 2. If <= 10 seconds, just strip silence and return
+        if original_duration <= 10:
+            log("Smart Import: File is short, optimizing...")
+            audio = _export_reference_clip(input_path, output_path)
             duration_msg = f"{len(audio)/1000:.1f}s"
             return output_path, f"Optimized {duration_msg} clip"
 
-        # 4. For long files, find best 5-second segment (Stability Optimization)
-        log("Smart Import: Analyzing speech patterns for best 5s clip...")
-        best_segment, segment_start = find_best_speech_segment(audio, target_duration=5000)
-        best_segment = strip_silence(best_segment, silence_thresh=-40, padding=100)
-
-        output_dir = "VOX-Output"
-        os.makedirs(output_dir, exist_ok=True)
-        output_path = os.path.join(output_dir, "master_voice_optimized.wav")
-
-        # Export 'best_segment' (the 5s clip), NOT 'audio'
-        best_segment.export(output_path, format="wav")
+        # 3. For long files, find best 5-second segment (Stability Optimization)
+        log(f"Smart Import: Analyzing {original_duration/60:.1f} min of speech for best 5s clip...")
+        best_frame, _ = _best_speech_window(rms_values, 1000 / SMART_IMPORT_FRAME_MS, window_ms=5000)
+        segment_start = best_frame * SMART_IMPORT_FRAME_MS / 1000
+        # Export the best 5s clip, NOT the whole file
+        best_segment = _export_reference_clip(input_path, output_path, start=segment_start, duration=5.0)
 
         start_min = int(segment_start // 60)
         start_sec = int(segment_start % 60)
@@ -132,67 +141,1156 @@ def smart_import_audio(input_path, log_callback=None):
         if log_callback: log_callback(f"Smart Import error: {str(e)}")
         raise
 
-def find_best_speech_segment(audio, target_duration=5000):
-    samples = np.array(audio.get_array_of_samples())
-    sample_rate = audio.frame_rate
-    frame_length = int(sample_rate * 0.01)
-    num_frames = len(samples) // frame_length
+def _stream_frame_rms(input_path, sample_rate=SMART_IMPORT_ANALYSIS_RATE, frame_ms=SMART_IMPORT_FRAME_MS,
+                      block_seconds=SMART_IMPORT_BLOCK_SECONDS):
+    """
+    Decode input_path through an ffmpeg pipe (mono s16le at sample_rate) and
+    return (per-frame RMS array, duration in seconds). Memory use is one block
+    of PCM plus 8 bytes per frame, however long the recording is.
+    """
+    frame_length = int(sample_rate * frame_ms / 1000)
+    frame_bytes = frame_length * 2
+    block_bytes = frame_bytes * max(1, int(block_seconds * 1000 / frame_ms))
+    cmd = ['ffmpeg', '-v', 'error', '-i', input_path, '-vn', '-f', 's16le', '-ac', '1',
+           '-ar', str(sample_rate), 'pipe:1']
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    blocks, tail, total_bytes = [], b'', 0
+    try:
+        while True:
+            data = process.stdout.read(block_bytes)
+            if not data: break
+            total_bytes += len(data)
+            buf = tail + data
+            usable = len(buf) - len(buf) % frame_bytes
+            tail = buf[usable:]
+            if usable:
+                frames = np.frombuffer(buf[:usable], dtype=np.int16).reshape(-1, frame_length).astype(np.float64)
+                blocks.append(np.sqrt(np.mean(frames * frames, axis=1)))
+    finally:
+        process.stdout.close()
+        stderr = process.stderr.read().decode('utf-8', errors='replace')
+        process.wait()
+    if process.returncode != 0:
+        raise RuntimeError(f"Could not decode audio: {(stderr.strip().splitlines() or ['ffmpeg failed'])[-1]}")
+
+    rms_values = np.concatenate(blocks) if blocks else np.zeros(0)
+    return rms_values, total_bytes / 2 / sample_rate
+
+def _export_reference_clip(input_path, output_path, start=0.0, duration=None):
+    """Decode a segment (mono, original sample rate, volume untouched), strip silence, save as WAV."""
+    clip = _decode_mono_segment(input_path, start=start, duration=duration)
+    clip = strip_silence(clip, silence_thresh=-40, padding=100)
+    clip.export(output_path, format="wav")
+    return clip
+
+def analyze_voice_candidate(path):
+    """
+    Score one reference recording the way smart import picks its clip.
+    Returns {"path", "score", "density", "start", "duration"}: score is the
+    best 5s window's speech density/continuity score (0..1), density the
+    speech fraction of the whole file (breaks ties between clean takes).
+    """
+    rms_values, duration = _stream_frame_rms(path)
+    start_frame, score = _best_speech_window(rms_values, 1000 / SMART_IMPORT_FRAME_MS, window_ms=5000)
+    peak = rms_values.max() if len(rms_values) else 0
+    density = float(np.mean(rms_values > 0.1 * peak)) if peak > 0 else 0.0
+    return {"path": path, "score": round(score, 4), "density": round(density, 4), "duration": round(duration, 2),
+            "start": 0.0 if duration <= 10 else start_frame * SMART_IMPORT_FRAME_MS / 1000}
+
+def rank_voice_folder(folder, workers=None, log_callback=None, stop_event=None):
+    """
+    Analyze every audio file in folder concurrently and return the results
+    sorted best first. Decoding runs in the ffmpeg child processes, so a
+    thread pool keeps every core busy without re-importing torch in workers.
+    Files that fail to decode are logged and left out.
+    """
+    def log(msg):
+        if log_callback: log_callback(msg)
+
+    paths = sorted(os.path.join(folder, f) for f in os.listdir(folder)
+                   if f.lower().endswith(VOICE_IMPORT_EXTENSIONS))
+    if not paths: return []
+    workers = workers or min(8, os.cpu_count() or 1)
+    log(f"Voice import: Analyzing {len(paths)} recordings ({workers} at a time)...")
+
+    results = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(analyze_voice_candidate, p): p for p in paths}
+        for done, future in enumerate(as_completed(futures), 1):
+            if stop_event and stop_event.is_set():
+                for f in futures: f.cancel()
+                break
+            try:
+                results.append(future.result())
+            except Exception as e:
+                log(f"Voice import: Skipped {os.path.basename(futures[future])} ({e})")
+            if done % 5 == 0 or done == len(paths):
+                log(f"Voice import: {done}/{len(paths)} analyzed")
+
+    results.sort(key=lambda r: (-r["score"], -r["density"], r["path"]))
+    return results
+
+def _decode_mono_segment(input_path, start=0.0, duration=None):
+    """
+    Decode [start, start + duration) seconds of input_path to a mono
+    AudioSegment at the file's own sample rate. Seeking happens on the input
+    side, so ffmpeg skips straight to the segment instead of decoding up to it.
+    """
+    fd, tmp_path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    try:
+        cmd = ['ffmpeg', '-y', '-v', 'error']
+        if start: cmd += ['-ss', f"{start:.3f}"]
+        if duration is not None: cmd += ['-t', f"{duration:.3f}"]
+        cmd += ['-i', input_path, '-vn', '-ac', '1', tmp_path]
+        result = subprocess.run(cmd, capture_output=True)
+        if result.returncode != 0:
+            stderr = result.stderr.decode('utf-8', errors='replace').strip()
+            raise RuntimeError(f"Could not decode audio: {(stderr.splitlines() or ['ffmpeg failed'])[-1]}")
+        return AudioSegment.from_wav(tmp_path)
+    finally:
+        if os.path.exists(tmp_path): os.remove(tmp_path)
+
+def _audio_samples(audio):
+    """Int view of a mono AudioSegment's samples (zero-copy except for 24-bit audio)."""
+    dtype = {1: np.int8, 2: np.int16, 4: np.int32}.get(audio.sample_width)
+    if dtype is None:
+        samples = audio.get_array_of_samples()
+        return np.frombuffer(samples, dtype=np.dtype(samples.typecode))
+    return np.frombuffer(audio.raw_data, dtype=dtype)
+
+def _span_energy(samples, bounds, block_samples=1 << 22):
+    """
+    Sum of squares of samples[bounds[k]:bounds[k+1]] for every k, via prefix
+    sums taken a block at a time so a long recording is never widened to
+    float64 all at once.
+    """
+    out = np.empty(len(bounds) - 1)
+    spans = len(out)
+    if spans == 0: return out
+    per_block = max(1, block_samples * spans // max(1, int(bounds[-1] - bounds[0])))
+    for j in range(0, spans, per_block):
+        b = bounds[j:j + per_block + 1]
+        x = samples[b[0]:b[-1]].astype(np.float64)
+        c = np.concatenate(([0.0], np.cumsum(x * x)))
+        edges = c[b - b[0]]
+        out[j:j + len(b) - 1] = edges[1:] - edges[:-1]
+    return out
+
+def _best_speech_window(rms_values, frames_per_second, window_ms=5000, step_ms=100):
+    """
+    (start frame, score) of the window_ms window with the best mix of speech
+    density (70%) and continuity (30%), scored over per-frame RMS values.
+    """
+    num_frames = len(rms_values)
+    if num_frames == 0: return 0, 0.0
+    peak = rms_values.max()
+    if peak > 0: rms_values = rms_values / peak
 
-    rms_values = []
-    for i in range(num_frames):
-        start = i * frame_length
-        end = start + frame_length
-        frame = samples[start:end]
-        rms = np.sqrt(np.mean(frame.astype(float) ** 2))
-        rms_values.append(rms)
+    speech_threshold = 0.1
+    window_size_frames = int((window_ms / 1000) * frames_per_second)
+    step_size_frames = max(1, int((step_ms / 1000) * frames_per_second))
+
+    # Every window is scored at once from prefix sums of speech frames and
+    # speech/non-speech transitions (transitions inside [s, e) are the flips
+    # between frames s..e-1).
+    is_speech = rms_values > speech_threshold
+    speech_sum = np.concatenate(([0], np.cumsum(is_speech)))
+    flip_sum = np.concatenate(([0], np.cumsum(is_speech[1:] != is_speech[:-1])))
+
+    starts = np.arange(0, max(1, num_frames - window_size_frames + 1), step_size_frames)
+    ends = np.minimum(starts + window_size_frames, num_frames)
+    totals = ends - starts
+    speech_density = np.where(totals > 0, (speech_sum[ends] - speech_sum[starts]) / np.maximum(totals, 1), 0.0)
+    transitions = flip_sum[np.maximum(ends - 1, starts)] - flip_sum[starts]
+    continuity_score = 1.0 / (1.0 + transitions * 0.1)
+
+    scores = speech_density * 0.7 + continuity_score * 0.3
+    best = int(np.argmax(scores))
+    return int(starts[best]), float(scores[best])
+
+def _speech_bounds(audio, min_silence_len=100, silence_thresh=-40):
+    """
+    (start_ms, end_ms) of the first and last non-silent sections, or None if
+    the clip is silent throughout. Same rule as pydub's detect_nonsilent with
+    seek_step=1 (a window of min_silence_len ms at every ms whose integer RMS
+    is <= the threshold is silent; silent windows closer than
+    min_silence_len merge), but from prefix sums instead of one slice per ms.
+    """
+    length = len(audio)
+    if length < min_silence_len: return 0, length
+    samples = _audio_samples(audio)
+    thresh = (10 ** (silence_thresh / 20)) * audio.max_possible_amplitude
+
+    # Per-ms energy, then the energy of every min_silence_len window
+    ms_bounds = np.minimum((np.arange(length + 1) * audio.frame_rate / 1000.0).astype(np.int64), len(samples))
+    energy = np.concatenate(([0.0], np.cumsum(_span_energy(samples, ms_bounds))))
+    starts = np.arange(length - min_silence_len + 1)
+    counts = np.maximum(ms_bounds[starts + min_silence_len] - ms_bounds[starts], 1)
+    rms = np.floor(np.sqrt((energy[starts + min_silence_len] - energy[starts]) / counts))
+    silent = np.flatnonzero(rms <= thresh)
+    if len(silent) == 0: return 0, length
+
+    breaks = np.flatnonzero(np.diff(silent) > min_silence_len)
+    first_end = int(silent[breaks[0]] if len(breaks) else silent[-1]) + min_silence_len
+    last_start = int(silent[breaks[-1] + 1] if len(breaks) else silent[0])
+    if silent[0] == 0 and first_end == length: return None
+
+    start = first_end if silent[0] == 0 else 0
+    end = last_start if silent[-1] + min_silence_len == length else length
+    return start, end
 
-    rms_values = np.array(rms_values)
-    if rms_values.max() > 0: rms_values = rms_values / rms_values.max()
+def strip_silence(audio, silence_thresh=-40, padding=200):
+    bounds = _speech_bounds(audio, min_silence_len=100, silence_thresh=silence_thresh)
+    if bounds is None: return audio
+    start_trim = max(0, bounds[0] - padding)
+    end_trim = min(len(audio), bounds[1] + padding)
+    return audio[start_trim:end_trim].fade_in(duration=50).fade_out(duration=50)
 
-    speech_threshold = 0.1
-    window_size_ms = target_duration
-    step_size_ms = 1000
+# ============================================================================
+# RENDER JOURNAL (CRASH-SAFE RESUME)
+# ============================================================================
 
-    window_size_frames = int((window_size_ms / 1000) * (sample_rate / frame_length))
-    step_size_frames = int((step_size_ms / 1000) * (sample_rate / frame_length))
+JOURNAL_VERSION = 2  # 2: chunk audio lives in a PCM spool instead of per-chunk WAVs
+
+def _file_digest(path, block_size=1 << 20):
+    """SHA1 of a file's contents (used to tie a job to the exact voice file)."""
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+def _atomic_write_json(path, data):
+    """Write JSON via temp file + os.replace so a crash never leaves a torn file."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+class RenderJournal:
+    """
+    Per-job record of finished chunks and chapters.
 
-    best_score = -1
-    best_start_frame = 0
+    A job is identified by the source text/manifest plus the voice file contents,
+    so re-rendering the same book with the same voice(s) finds its old journal.
+    Chunk audio lives in the job's PcmSpool until the job is finalized; if the
+    render settings changed since the journal was written, it starts fresh.
+    """
+    def __init__(self, jobs_root, source_key, voice_paths, settings, log=print):
+        self.log = log
+        if isinstance(voice_paths, str): voice_paths = [voice_paths]
+        voice_key = ",".join(_file_digest(p) if os.path.exists(p) else os.path.basename(p) for p in voice_paths)
+        self.job_id = hashlib.sha1((source_key + "|" + voice_key).encode('utf-8')).hexdigest()[:16]
+        self.job_dir = os.path.join(jobs_root, self.job_id)
+        self.path = os.path.join(self.job_dir, "journal.json")
+        self.settings = settings
+        os.makedirs(self.job_dir, exist_ok=True)
+
+        self.data = None
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get("version") != JOURNAL_VERSION:
+                    self.log("Journal: Old format found, starting fresh.")
+                elif data.get("settings") != settings:
+                    self.log("Journal: Render settings changed since last run, starting fresh.")
+                else:
+                    self.data = data
+            except Exception as e:
+                self.log(f"Journal: Could not read existing journal ({e}), starting fresh.")
+
+        if self.data is None:
+            self._reset()
+        else:
+            self._drop_missing_files()
+        self.spool = PcmSpool(os.path.join(self.job_dir, "chunks"), log=self.log)
+
+    def _reset(self):
+        for f in os.listdir(self.job_dir):
+            fp = os.path.join(self.job_dir, f)
+            if os.path.isdir(fp): shutil.rmtree(fp, ignore_errors=True)  # v1 per-chunk WAV folder
+            else: os.unlink(fp)
+        now = datetime.now().isoformat(timespec='seconds')
+        self.data = {
+            "version": JOURNAL_VERSION,
+            "job_id": self.job_id,
+            "settings": self.settings,
+            "created": now,
+            "updated": now,
+            "chapters": {},
+        }
+        _atomic_write_json(self.path, self.data)  # spool is opened after the reset
+
+    def _drop_missing_files(self):
+        # A chapter whose audio file vanished must be rendered again
+        chapters = self.data["chapters"]
+        for key in [k for k, v in chapters.items() if not os.path.exists(v["path"])]:
+            del chapters[key]
+
+    @property
+    def is_resume(self):
+        return bool(len(self.spool) or self.data["chapters"])
+
+    def save(self):
+        """Make spooled chunks durable, then commit the journal. Call once per batch."""
+        self.spool.flush()
+        self.data["updated"] = datetime.now().isoformat(timespec='seconds')
+        _atomic_write_json(self.path, self.data)
+
+    # --- chunks ---
+    def chapter_chunks(self, chapter_idx):
+        """View of one chapter's spooled chunks keyed by chunk index (add / get / in / len)."""
+        return SpoolChapterView(self.spool, chapter_idx)
+
+    def release_chapter_chunks(self, chapter_idx):
+        """Forget a chapter's chunks once it has been stitched and recorded (space returns at finalize)."""
+        self.spool.discard_prefix(f"{chapter_idx}:")
+
+    # --- chapters ---
+    def chapter_done(self, chapter_idx):
+        return str(chapter_idx) in self.data["chapters"]
+
+    def chapter_entry(self, chapter_idx):
+        return self.data["chapters"].get(str(chapter_idx))
+
+    def record_chapter(self, chapter_idx, path, title):
+        self.data["chapters"][str(chapter_idx)] = {"path": path, "title": title}
+        self.save()
+
+    def finalize(self):
+        """Remove the job folder once the final output exists."""
+        self.spool.close()
+        shutil.rmtree(self.job_dir, ignore_errors=True)
+
+
+class PcmSpool:
+    """
+    Append-only 16-bit PCM file (<base>.pcm) plus a sidecar text index
+    (<base>.idx, one "key offset length sample_rate" line per chunk, offsets in
+    samples). Chunks are read back through numpy.memmap, so a whole book can be
+    assembled without holding it in RAM. On open, index lines that are torn or
+    point past the end of the PCM file are dropped and any unindexed tail bytes
+    (a crash between the two writes) are truncated away.
+    """
+    def __init__(self, base_path, log=print):
+        self.pcm_path = base_path + ".pcm"
+        self.idx_path = base_path + ".idx"
+        self.log = log
+        self.sample_rate = None
+        self._index = {}  # key -> (offset, length)
+        self._map = None
+        self._recover()
+        self._pcm = open(self.pcm_path, 'ab')
+        self._idx = open(self.idx_path, 'a', encoding='utf-8')
+        self._end = os.path.getsize(self.pcm_path) // 2
+
+    def _recover(self):
+        pcm_samples = os.path.getsize(self.pcm_path) // 2 if os.path.exists(self.pcm_path) else 0
+        valid, dropped, end = [], 0, 0
+        if os.path.exists(self.idx_path):
+            with open(self.idx_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) != 4 or not line.endswith("\n"):
+                        dropped += 1
+                        continue
+                    key, offset, length, sr = parts[0], int(parts[1]), int(parts[2]), int(parts[3])
+                    if offset + length > pcm_samples:
+                        dropped += 1
+                        continue
+                    valid.append(line)
+                    if length: self._index[key] = (offset, length)
+                    else: self._index.pop(key, None)  # zero-length record = discarded
+                    self.sample_rate = sr
+                    end = max(end, offset + length)
+        if dropped:
+            self.log(f"Spool: dropped {dropped} incomplete index entries after an interrupted run.")
+            with open(self.idx_path, 'w', encoding='utf-8') as f:
+                f.writelines(valid)
+        if pcm_samples > end:
+            with open(self.pcm_path, 'r+b') as f:
+                f.truncate(end * 2)
+
+    def add(self, key, wav, sample_rate):
+        if self.sample_rate and sample_rate != self.sample_rate:
+            raise ValueError(f"Chunk sample rate {sample_rate} != spool rate {self.sample_rate}")
+        self.sample_rate = sample_rate
+        samples = _as_int16(np.asarray(wav).reshape(-1))
+        self._pcm.write(samples.tobytes())
+        self._index[key] = (self._end, len(samples))
+        self._idx.write(f"{key} {self._end} {len(samples)} {sample_rate}\n")
+        self._end += len(samples)
+
+    def flush(self):
+        """fsync PCM before the index so an index entry never points at unwritten audio."""
+        for f in (self._pcm, self._idx):
+            f.flush()
+            os.fsync(f.fileno())
+
+    def get(self, key):
+        offset, length = self._index[key]
+        if self._map is None or len(self._map) < offset + length:
+            self._pcm.flush()
+            self._map = np.memmap(self.pcm_path, dtype=np.int16, mode='r')
+        return self._map[offset:offset + length]
+
+    def discard_prefix(self, prefix):
+        for key in [k for k in self._index if k.startswith(prefix)]:
+            del self._index[key]
+            self._idx.write(f"{key} 0 0 {self.sample_rate}\n")
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def close(self):
+        self._map = None
+        for f in (self._pcm, self._idx):
+            if not f.closed: f.close()
+
+
+class SpoolChapterView:
+    """One chapter's chunks in a PcmSpool, addressed by integer chunk index."""
+    def __init__(self, spool, chapter_idx):
+        self.spool = spool
+        self.prefix = f"{chapter_idx}:"
+
+    @property
+    def sample_rate(self):
+        return self.spool.sample_rate
+
+    def add(self, chunk_idx, wav, sample_rate):
+        self.spool.add(f"{self.prefix}{chunk_idx}", wav, sample_rate)
+
+    def get(self, chunk_idx):
+        return self.spool.get(f"{self.prefix}{chunk_idx}")
+
+    def __contains__(self, chunk_idx):
+        return f"{self.prefix}{chunk_idx}" in self.spool
+
+    def __len__(self):
+        return sum(1 for k in self.spool._index if k.startswith(self.prefix))
+
+def _as_int16(samples):
+    """Float (-1..1) or int16 samples -> int16."""
+    if samples.dtype == np.int16:
+        return samples
+    return (np.clip(samples.astype(np.float32), -1.0, 1.0) * 32767.0).astype(np.int16)
+
+def _micro_fade(samples, sample_rate, ms=50):
+    """
+    Copy of an int16 chunk with pydub's fade_in(ms).fade_out(ms) applied, sample
+    for sample: the chunk is snapped to whole milliseconds the way pydub slices
+    it, then ramped linearly in amplitude from db_to_float(-120) with each
+    sample floored like audioop.mul. Exact at whole frames per millisecond
+    (the model's 24 kHz).
+    """
+    length_ms = round(1000 * (len(samples) / sample_rate))
+    fade_frames = min(ms, length_ms) * (sample_rate / 1000.0)
+    n = min(int(fade_frames), len(samples))
+    frames = int(length_ms * (sample_rate / 1000.0)) if len(samples) > n else n
+    seg = np.zeros(frames, dtype=np.int16)
+    seg[:min(frames, len(samples))] = samples[:frames]
+    if n:
+        steps = np.arange(n, dtype=np.float64)
+        floor = 10 ** (-120 / 20)
+        fade_in = floor + ((1.0 - floor) / fade_frames) * steps
+        fade_out = 1.0 + ((floor - 1.0) / fade_frames) * steps
+        seg[:n] = np.floor(seg[:n] * fade_in)
+        seg[frames - n:] = np.floor(seg[frames - n:] * fade_out)
+    return seg
 
-    for start_frame in range(0, max(1, num_frames - window_size_frames + 1), step_size_frames):
-        end_frame = min(start_frame + window_size_frames, num_frames)
-        window_rms = rms_values[start_frame:end_frame]
-        speech_frames = np.sum(window_rms > speech_threshold)
-        total_frames = len(window_rms)
-        speech_density = speech_frames / total_frames if total_frames > 0 else 0
-        
-        is_speech = window_rms > speech_threshold
-        transitions = np.sum(np.diff(is_speech.astype(int)) != 0)
-        continuity_score = 1.0 / (1.0 + transitions * 0.1)
-        
-        score = speech_density * 0.7 + continuity_score * 0.3
-        if score > best_score:
-            best_score = score
-            best_start_frame = start_frame
+# ============================================================================
+# MEMORY PRESSURE POLICY
+# ============================================================================
 
-    start_ms = int((best_start_frame * frame_length / sample_rate) * 1000)
-    end_ms = min(start_ms + window_size_ms, len(audio))
-    return audio[start_ms:end_ms], start_ms / 1000
+def _process_rss_bytes():
+    """Resident set size of this process, or None if it can't be measured."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return None
+
+def _system_ram_bytes():
+    """(available, total) system RAM in bytes, or None."""
+    if psutil is not None:
+        vm = psutil.virtual_memory()
+        return vm.available, vm.total
+    try:
+        info = {}
+        with open("/proc/meminfo") as f:
+            for line in f:
+                key, value = line.split(":", 1)
+                info[key] = int(value.split()[0]) * 1024
+        return info["MemAvailable"], info["MemTotal"]
+    except Exception:
+        return None
+
+class MemoryPolicy:
+    """
+    Decides when the render loop should clean up memory.
+
+    Instead of calling gc.collect()/empty_cache()/synchronize() on a fixed
+    cadence, it measures system RAM use and (on CUDA) device memory use
+    including the allocator cache, and only intervenes when one of them is
+    above `watermark` (a fraction of the total). gc.collect() handles RAM;
+    torch.cuda.empty_cache() is only called when the allocator actually holds
+    cached blocks that could be returned. Out-of-memory errors always clean up.
+    """
+    def __init__(self, device, watermark=0.85, log=print):
+        self.device = device
+        self.watermark = watermark
+        self.log = log
+        self.reset()
+
+    def reset(self):
+        self.stats = {"checks": 0, "gc_collect": 0, "cache_flush": 0, "oom_recoveries": 0}
+        self.peak_ram = 0.0
+        self.peak_vram = 0.0
+        self.peak_rss = 0
+
+    def ram_pressure(self):
+        rss = _process_rss_bytes()
+        if rss: self.peak_rss = max(self.peak_rss, rss)
+        ram = _system_ram_bytes()
+        if not ram: return None
+        available, total = ram
+        pressure = 1.0 - available / total
+        self.peak_ram = max(self.peak_ram, pressure)
+        return pressure
+
+    def vram_pressure(self):
+        """(used fraction incl. allocator cache, cached-but-unused bytes)"""
+        if self.device != "cuda": return None, 0
+        free, total = torch.cuda.mem_get_info()
+        cached = torch.cuda.memory_reserved() - torch.cuda.memory_allocated()
+        pressure = 1.0 - free / total
+        self.peak_vram = max(self.peak_vram, pressure)
+        return pressure, cached
+
+    def _collect(self):
+        gc.collect()
+        self.stats["gc_collect"] += 1
+
+    def _flush_cache(self):
+        torch.cuda.empty_cache()
+        self.stats["cache_flush"] += 1
+
+    def maybe_cleanup(self, stage=""):
+        """Check pressure and clean up only above the watermark. Returns True if it acted."""
+        self.stats["checks"] += 1
+        ram = self.ram_pressure()
+        vram, cached = self.vram_pressure()
+
+        acted = []
+        if (ram is not None and ram > self.watermark) or (vram is not None and vram > self.watermark):
+            # Dropping Python references is what lets the allocator reuse or return blocks
+            self._collect()
+            acted.append("gc")
+        if vram is not None and vram > self.watermark and cached > 0:
+            self._flush_cache()
+            acted.append("cache flush")
+
+        if acted:
+            ram_txt = f"RAM {ram:.0%}" if ram is not None else "RAM n/a"
+            vram_txt = f" | VRAM {vram:.0%}" if vram is not None else ""
+            self.log(f"Memory policy [{stage}]: {ram_txt}{vram_txt} above {self.watermark:.0%} -> {', '.join(acted)}")
+        return bool(acted)
+
+    def after_error(self, error, stage="error"):
+        """Always release memory after an OOM; other errors only under pressure."""
+        oom_type = getattr(torch.cuda, "OutOfMemoryError", MemoryError)
+        if isinstance(error, (oom_type, MemoryError)) or "out of memory" in str(error).lower():
+            self.stats["oom_recoveries"] += 1
+            self._collect()
+            if self.device == "cuda": self._flush_cache()
+            return True
+        return self.maybe_cleanup(stage)
+
+    def summary(self):
+        parts = [f"{self.stats['checks']} checks",
+                 f"{self.stats['gc_collect']} gc",
+                 f"{self.stats['cache_flush']} cache flushes",
+                 f"{self.stats['oom_recoveries']} OOM recoveries",
+                 f"peak RAM {self.peak_ram:.0%}"]
+        if self.peak_rss: parts.append(f"peak RSS {self.peak_rss / 1024**3:.2f}GB")
+        if self.device == "cuda": parts.append(f"peak VRAM {self.peak_vram:.0%}")
+        return "Memory policy: " + ", ".join(parts)
 
-def strip_silence(audio, silence_thresh=-40, padding=200):
-    from pydub.silence import detect_nonsilent
-    nonsilent_ranges = detect_nonsilent(audio, min_silence_len=100, silence_thresh=silence_thresh)
-    if not nonsilent_ranges: return audio
-    start_trim = max(0, nonsilent_ranges[0][0] - padding)
-    end_trim = min(len(audio), nonsilent_ranges[-1][1] + padding)
-    return audio[start_trim:end_trim].fade_in(duration=50).fade_out(duration=50)
+# ============================================================================
+# RENDER TRACING (CHROME TRACE / JSONL)
+# ============================================================================
+
+class RenderTracer:
+    """
+    Collects timed spans (model load, transcription, generate, transfer,
+    stitch, export, ffmpeg mux...) for one render. Spans are only recorded
+    between begin() and end(), so it costs nothing outside a traced render.
+    end() writes a Chrome trace (open in chrome://tracing or ui.perfetto.dev)
+    and a JSONL event log.
+    """
+    def __init__(self):
+        self.active = False
+        self.events = []
+        self.name = ""
+        self._t0 = 0.0
+        self._lock = threading.Lock()
+
+    def begin(self, name):
+        self.events = []
+        self.name = name
+        self._t0 = time.perf_counter()
+        self.active = True
+
+    def record(self, name, start, cat="render", **args):
+        """Record a span that started at time.perf_counter() value `start` and ends now."""
+        if not self.active: return
+        end = time.perf_counter()
+        with self._lock:
+            self.events.append({"name": name, "cat": cat, "start": start - self._t0,
+                                "dur": end - start, "tid": threading.get_ident(), "args": args})
+
+    @contextmanager
+    def span(self, name, cat="render", **args):
+        if not self.active:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, cat=cat, **args)
+
+    def stage_totals(self):
+        totals = {}
+        for e in self.events:
+            totals[e["name"]] = totals.get(e["name"], 0.0) + e["dur"]
+        return totals
+
+    def end(self, out_dir):
+        """Stop recording and write <name>_<time>.trace.json / .events.jsonl. Returns (trace, jsonl)."""
+        self.active = False
+        if not self.events: return None, None
+        os.makedirs(out_dir, exist_ok=True)
+        safe_name = "".join(c for c in self.name if c.isalnum() or c in ' -_').strip().replace(" ", "_") or "render"
+        base = os.path.join(out_dir, f"{safe_name}_{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+        pid = os.getpid()
+
+        trace = {"displayTimeUnit": "ms", "traceEvents": [
+            {"name": e["name"], "cat": e["cat"], "ph": "X", "pid": pid, "tid": e["tid"],
+             "ts": round(e["start"] * 1e6, 1), "dur": round(e["dur"] * 1e6, 1), "args": e["args"]}
+            for e in self.events
+        ]}
+        with open(base + ".trace.json", 'w', encoding='utf-8') as f:
+            json.dump(trace, f)
+        with open(base + ".events.jsonl", 'w', encoding='utf-8') as f:
+            for e in self.events:
+                f.write(json.dumps({"name": e["name"], "cat": e["cat"], "start_s": round(e["start"], 6),
+                                    "dur_s": round(e["dur"], 6), "thread": e["tid"], "args": e["args"]}) + "\n")
+        return base + ".trace.json", base + ".events.jsonl"
+
+# ============================================================================
+# LIVE RENDER METRICS (PROMETHEUS TEXT FORMAT)
+# ============================================================================
+
+# Upper bounds (seconds) for the per-batch latency histogram
+BATCH_LATENCY_BUCKETS = (1, 2, 5, 10, 20, 30, 60, 120, 300)
+
+class RenderMetrics:
+    """
+    Live counters and gauges for the current render: chunks done/remaining,
+    audio seconds produced per wall second (real-time factor), a per-batch
+    latency histogram, failed batches, RSS and VRAM. Served by
+    MetricsServer and dumped to Output/metrics/ when a job ends.
+    """
+    def __init__(self, device, model_size="", batch_size=0):
+        self.device = device
+        self.model_size = model_size
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self.reset("")
+        self.status = "idle"
+
+    def reset(self, job_name, total_chunks=0, done_chunks=0):
+        with self._lock:
+            self.job_name = job_name
+            self.status = "running"
+            self.started = time.time()
+            self.finished = None
+            self.chunks_total = total_chunks
+            self.chunks_done = done_chunks
+            self.chunks_resumed = done_chunks
+            self.chars_done = 0
+            self.eta_seconds = None
+            self.audio_seconds = 0.0
+            self.batches = 0
+            self.batch_failures = 0
+            self.oom_errors = 0
+            self.last_batch_time = None
+            self.latency_sum = 0.0
+            self.latency_buckets = [0] * len(BATCH_LATENCY_BUCKETS)
+
+    def set_totals(self, total_chunks, done_chunks):
+        """Called once a job knows its chunk plan (after resume is applied)."""
+        with self._lock:
+            self.chunks_total = total_chunks
+            self.chunks_done = done_chunks
+            self.chunks_resumed = done_chunks
+
+    def observe_batch(self, seconds, chunks, audio_seconds, chars=0):
+        with self._lock:
+            self.batches += 1
+            self.chunks_done += chunks
+            self.chars_done += chars
+            self.audio_seconds += audio_seconds
+            self.last_batch_time = time.time()
+            self.latency_sum += seconds
+            for i, bound in enumerate(BATCH_LATENCY_BUCKETS):
+                if seconds <= bound:
+                    self.latency_buckets[i] += 1
+
+    def batch_failed(self, error):
+        with self._lock:
+            self.batch_failures += 1
+            if "out of memory" in str(error).lower() or isinstance(error, MemoryError):
+                self.oom_errors += 1
+
+    def finish(self, status):
+        with self._lock:
+            self.status = status
+            self.finished = time.time()
+
+    def snapshot(self):
+        with self._lock:
+            wall = ((self.finished or time.time()) - self.started) if self.job_name else 0.0
+            data = {
+                "job": self.job_name,
+                "status": self.status,
+                "model_size": self.model_size,
+                "device": self.device,
+                "batch_size": self.batch_size,
+                "chunks_total": self.chunks_total,
+                "chunks_done": self.chunks_done,
+                "chunks_remaining": max(0, self.chunks_total - self.chunks_done),
+                "chunks_resumed": self.chunks_resumed,
+                "batches": self.batches,
+                "batch_failures": self.batch_failures,
+                "oom_errors": self.oom_errors,
+                "chars_done": self.chars_done,
+                "audio_seconds": round(self.audio_seconds, 3),
+                "wall_seconds": round(wall, 3),
+                "real_time_factor": round(self.audio_seconds / wall, 4) if wall > 0 else 0.0,
+                "last_batch_time": self.last_batch_time,
+                "eta_seconds": round(self.eta_seconds, 1) if self.eta_seconds is not None else None,
+                "batch_latency_sum": round(self.latency_sum, 3),
+                "batch_latency_buckets": dict(zip(map(str, BATCH_LATENCY_BUCKETS), self.latency_buckets)),
+            }
+        data["rss_bytes"] = _process_rss_bytes() or 0
+        if self.device == "cuda":
+            data["vram_allocated_bytes"] = torch.cuda.memory_allocated()
+            data["vram_reserved_bytes"] = torch.cuda.memory_reserved()
+        return data
+
+    def to_prometheus(self):
+        d = self.snapshot()
+        job_label = d["job"].replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+        labels = f'job_name="{job_label}",model_size="{d["model_size"]}",device="{d["device"]}"'
+        lines = []
+
+        def metric(name, kind, help_text, value, extra=""):
+            lines.append(f"# HELP vox_{name} {help_text}")
+            lines.append(f"# TYPE vox_{name} {kind}")
+            lines.append(f"vox_{name}{{{labels}{extra}}} {value}")
+
+        metric("render_running", "gauge", "1 while a render job is running.", int(d["status"] == "running"))
+        metric("chunks_total", "gauge", "Chunks planned for the current job.", d["chunks_total"])
+        metric("chunks_done_total", "counter", "Chunks rendered (including resumed ones).", d["chunks_done"])
+        metric("chunks_remaining", "gauge", "Chunks still to render.", d["chunks_remaining"])
+        metric("batches_total", "counter", "Successful generate batches.", d["batches"])
+        metric("batch_failures_total", "counter", "Failed batches (retried on the next resume).", d["batch_failures"])
+        metric("oom_errors_total", "counter", "Failed batches caused by out-of-memory.", d["oom_errors"])
+        metric("audio_seconds_total", "counter", "Seconds of audio generated this job.", d["audio_seconds"])
+        metric("wall_seconds", "gauge", "Wall-clock seconds since the job started.", d["wall_seconds"])
+        metric("real_time_factor", "gauge", "Audio seconds produced per wall second.", d["real_time_factor"])
+        metric("last_batch_timestamp_seconds", "gauge", "Unix time of the last finished batch (stall detection).",
+               d["last_batch_time"] or 0)
+        if d["eta_seconds"] is not None:
+            metric("eta_seconds", "gauge", "Estimated seconds until the render finishes.", d["eta_seconds"])
+        metric("process_rss_bytes", "gauge", "Resident memory of the render process.", d["rss_bytes"])
+        if "vram_allocated_bytes" in d:
+            metric("vram_allocated_bytes", "gauge", "CUDA memory allocated by tensors.", d["vram_allocated_bytes"])
+            metric("vram_reserved_bytes", "gauge", "CUDA memory held by the caching allocator.", d["vram_reserved_bytes"])
+
+        lines.append("# HELP vox_batch_latency_seconds Wall time per generate batch.")
+        lines.append("# TYPE vox_batch_latency_seconds histogram")
+        for bound, count in d["batch_latency_buckets"].items():
+            lines.append(f'vox_batch_latency_seconds_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f'vox_batch_latency_seconds_bucket{{{labels},le="+Inf"}} {d["batches"]}')
+        lines.append(f"vox_batch_latency_seconds_sum{{{labels}}} {d['batch_latency_sum']}")
+        lines.append(f"vox_batch_latency_seconds_count{{{labels}}} {d['batches']}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, out_dir):
+        """Write <job>_<time>.json and .prom (node_exporter textfile format). Returns the JSON path."""
+        os.makedirs(out_dir, exist_ok=True)
+        safe_name = "".join(c for c in self.job_name if c.isalnum() or c in ' -_').strip().replace(" ", "_") or "render"
+        base = os.path.join(out_dir, f"{safe_name}_{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+        with open(base + ".json", 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        with open(base + ".prom", 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        return base + ".json"
+
+
+class MetricsServer:
+    """
+    Optional local HTTP endpoint serving GET /metrics in Prometheus text format.
+    One server per port is shared for the life of the process; a reloaded
+    engine just points it at its own RenderMetrics.
+    """
+    _servers = {}
+
+    def __init__(self, port, host="127.0.0.1"):
+        self.metrics = None
+        server_ref = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = (server_ref.metrics.to_prometheus() if server_ref.metrics else "").encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # keep scrapes out of the console
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def serve(cls, port, metrics):
+        if port not in cls._servers:
+            cls._servers[port] = cls(port)
+        cls._servers[port].metrics = metrics
+        return cls._servers[port]
+
+# ============================================================================
+# THROUGHPUT HISTORY & ETA
+# ============================================================================
+
+# Narration pace used for output-length estimates until history exists (~180 wpm)
+DEFAULT_CHARS_PER_AUDIO_SECOND = 15.0
+# How many seconds of live observation the history prior is worth
+ETA_PRIOR_SECONDS = 120.0
 
+def _format_duration(seconds):
+    seconds = int(max(0, seconds))
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}h {m:02d}m" if h else f"{m}m {s:02d}s"
+
+
+class RenderHistory:
+    """
+    Small SQLite record of finished renders: generated chars, audio seconds
+    and wall time per model size, device, batch size and chunk size. Feeds
+    EtaEstimator and doubles as a throughput regression log. Each call opens
+    its own connection because renders run on worker threads.
+    """
+    def __init__(self, db_path):
+        self.db_path = db_path
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""CREATE TABLE IF NOT EXISTS renders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created TEXT, job TEXT, status TEXT,
+            model_size TEXT, device TEXT, batch_size INTEGER, chunk_size INTEGER,
+            chars INTEGER, chunks INTEGER, audio_seconds REAL, wall_seconds REAL)""")
+        return conn
+
+    def record(self, job, status, model_size, device, batch_size, chunk_size, chars, chunks, audio_seconds, wall_seconds):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("INSERT INTO renders (created, job, status, model_size, device, batch_size, chunk_size, "
+                         "chars, chunks, audio_seconds, wall_seconds) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         (datetime.now().isoformat(timespec='seconds'), job, status, model_size, device,
+                          batch_size, chunk_size, chars, chunks, audio_seconds, wall_seconds))
+
+    def rates(self, model_size, device, batch_size, chunk_size, limit=20):
+        """
+        (chars per wall second, chars per audio second, runs used) from the most
+        recent matching renders. Falls back from the exact configuration to the
+        same model/device, then to the same device. (None, None, 0) with no data.
+        """
+        levels = [("model_size = ? AND device = ? AND batch_size = ? AND chunk_size = ?",
+                   (model_size, device, batch_size, chunk_size)),
+                  ("model_size = ? AND device = ?", (model_size, device)),
+                  ("device = ?", (device,))]
+        with closing(self._connect()) as conn:
+            for where, params in levels:
+                rows = conn.execute(f"SELECT chars, audio_seconds, wall_seconds FROM renders WHERE {where} "
+                                    "AND chars > 0 AND wall_seconds > 0 ORDER BY id DESC LIMIT ?",
+                                    params + (limit,)).fetchall()
+                if rows:
+                    chars = sum(r[0] for r in rows)
+                    audio = sum(r[1] for r in rows)
+                    wall = sum(r[2] for r in rows)
+                    return chars / wall, (chars / audio if audio > 0 else None), len(rows)
+        return None, None, 0
+
+
+class EtaEstimator:
+    """
+    Remaining-time estimate for a running job. Starts from the historical
+    chars/s for this configuration and shifts toward the rate observed in
+    this job: the prior counts as ETA_PRIOR_SECONDS of observation.
+    """
+    def __init__(self, chars_remaining, prior_chars_per_sec=None):
+        self.chars_remaining = chars_remaining
+        self.prior_rate = prior_chars_per_sec
+        self.started = time.time()
+
+    def rate(self, chars_done):
+        elapsed = time.time() - self.started
+        if self.prior_rate:
+            return (self.prior_rate * ETA_PRIOR_SECONDS + chars_done) / (ETA_PRIOR_SECONDS + elapsed)
+        return chars_done / elapsed if chars_done and elapsed > 0 else None
+
+    def eta_seconds(self, chars_done):
+        rate = self.rate(chars_done)
+        if not rate: return None
+        return max(0.0, self.chars_remaining - chars_done) / rate
+
+# ============================================================================
+# VOICE LAB PREVIEW CACHE
 # ============================================================================
 
+PREVIEW_CACHE_ENTRIES = 64
+
+class PreviewCache:
+    """
+    Bounded on-disk cache of Voice Lab takes. A take is keyed by everything
+    that determines its audio: kind, text, description or reference-audio
+    digest, model id, seed and sampling params. Every take keeps its own WAV,
+    so earlier takes can be replayed side by side. Reference transcriptions
+    are cached by audio digest as well, and so is where a reference was cut
+    to fit each prompt budget. Least recently used takes are evicted.
+    """
+    def __init__(self, cache_dir, max_entries=PREVIEW_CACHE_ENTRIES, log=print):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.log = log
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self._lock = threading.Lock()
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+        self.index.setdefault("takes", {})
+        self.index.setdefault("transcripts", {})
+        self.index.setdefault("reference_cuts", {})
+
+    @staticmethod
+    def key_for(**fields):
+        return hashlib.sha1(json.dumps(fields, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        _atomic_write_json(self.index_path, self.index)
+
+    def get(self, key):
+        """Path of a cached take (marked as recently used), or None."""
+        with self._lock:
+            take = self.index["takes"].get(key)
+            if not take: return None
+            path = os.path.join(self.cache_dir, take["file"])
+            if not os.path.exists(path):
+                del self.index["takes"][key]
+                self._save()
+                return None
+            take["last_used"] = time.time()
+            self._save()
+            return path
+
+    def put(self, key, wav_path, **meta):
+        """Copy a finished preview into the cache and return the cached path."""
+        with self._lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fname = f"{key[:16]}.wav"
+            cached = os.path.join(self.cache_dir, fname)
+            if os.path.abspath(wav_path) != os.path.abspath(cached):
+                shutil.copyfile(wav_path, cached)
+            now = time.time()
+            self.index["takes"][key] = dict(meta, key=key, file=fname, created=now, last_used=now)
+            self._evict()
+            self._save()
+            return cached
+
+    def _evict(self):
+        takes = self.index["takes"]
+        for key in sorted(takes, key=lambda k: takes[k]["last_used"])[:max(0, len(takes) - self.max_entries)]:
+            try:
+                os.remove(os.path.join(self.cache_dir, takes[key]["file"]))
+            except OSError:
+                pass
+            del takes[key]
+
+    def history(self, limit=20):
+        """Most recent takes first: dicts with path plus the stored metadata."""
+        with self._lock:
+            takes = sorted(self.index["takes"].values(), key=lambda t: t["created"], reverse=True)
+            return [dict(t, path=os.path.join(self.cache_dir, t["file"])) for t in takes[:limit]]
+
+    def transcript(self, digest):
+        return self.index["transcripts"].get(digest)
+
+    def put_transcript(self, digest, text):
+        self._put_small("transcripts", digest, text)
+
+    def reference_cut(self, digest, budget):
+        """{"cut": seconds or None (no clean cut fits), "text": kept transcript}, or None."""
+        return self.index["reference_cuts"].get(f"{digest}:{budget}")
+
+    def put_reference_cut(self, digest, budget, cut, text):
+        self._put_small("reference_cuts", f"{digest}:{budget}", {"cut": cut, "text": text})
+
+    def _put_small(self, table, key, value):
+        with self._lock:
+            entries = self.index[table]
+            entries[key] = value
+            # Tiny entries, but keep them bounded alongside the takes
+            if len(entries) > self.max_entries * 4:
+                for old in list(entries)[:len(entries) - self.max_entries * 4]:
+                    del entries[old]
+            self._save()
+
+# ============================================================================
+# STREAMING PREVIEW SINK
+# ============================================================================
+
+class PreviewStream:
+    """
+    Receives preview audio as it is generated. Every frame is appended to a
+    growing WAV (header flushed, so the file is playable mid-stream) and, when
+    sounddevice is available, queued to a background playback thread.
+    """
+    def __init__(self, out_path, play=True, on_first_audio=None, log=print):
+        self.out_path = out_path
+        self.play = play and sounddevice is not None
+        self.on_first_audio = on_first_audio
+        self.log = log
+        self.sample_rate = None
+        self.frames_written = 0
+        self._file = None
+        self._queue = None
+        self._player = None
+
+    def _open(self, sr):
+        self.sample_rate = sr
+        self._file = sf.SoundFile(self.out_path, mode='w', samplerate=sr, channels=1, subtype='PCM_16')
+        if self.play:
+            import queue
+            self._queue = queue.Queue()
+            self._player = threading.Thread(target=self._playback, daemon=True)
+            self._player.start()
+
+    def _playback(self):
+        try:
+            with sounddevice.OutputStream(samplerate=self.sample_rate, channels=1, dtype='float32') as out:
+                while True:
+                    frame = self._queue.get()
+                    if frame is None: break
+                    out.write(frame.reshape(-1, 1))
+        except Exception as e:
+            self.log(f"Live playback unavailable: {e}")
+
+    def write(self, frame, sr):
+        frame = np.asarray(frame, dtype=np.float32).reshape(-1)
+        if self._file is None:
+            self._open(sr)
+        self._file.write(frame)
+        self._file.flush()
+        if self._queue is not None:
+            self._queue.put(frame)
+        self.frames_written += 1
+        if self.frames_written == 1 and self.on_first_audio:
+            self.on_first_audio(self.out_path)
+
+    def close(self, wait_for_playback=False):
+        if self._file is not None:
+            self._file.close()
+        if self._queue is not None:
+            self._queue.put(None)
+            if wait_for_playback: self._player.join()
+
+# ============================================================================
+
+# Scheduling: "length" sorts each chapter longest-first (max throughput);
+# "chapter" walks the book in reading order, sorting blocks of this many batches.
+SCHEDULE_MODES = ("length", "chapter")
+# Manifest voice key that always maps to the loaded master voice
+NARRATOR_VOICE = "narrator"
+CHAPTER_ORDER_WINDOW = 4
+# TXT renders in "chapter" mode publish a preview MP3 every this many chunks
+PREVIEW_SECTION_CHUNKS = 40
+
+# Streaming previews generate this many characters (whole sentences) per segment
+PREVIEW_STREAM_CHARS = 120
+
+# --- REFERENCE PROMPT BUDGET ---
+# The clone prompt (reference codes + transcript) is prepended to every sequence.
+# 12Hz speech tokenizer: 24 kHz audio in 1920-sample frames = 12.5 tokens per second.
+REF_AUDIO_TOKENS_PER_SECOND = 12.5
+REF_TEXT_CHARS_PER_TOKEN = 4
+# ~10 s of reference plus its transcript; 0 disables trimming
+REF_PROMPT_TOKENS = 160
+# Never trim a reference below this, however tight the budget
+REF_PROMPT_MIN_SECONDS = 3.0
+
+# --- AUTO-TUNE ---
+# Grid swept by AudioEngine.auto_tune (batch sizes ascending)
+AUTOTUNE_BATCH_SIZES = (1, 2, 4, 8, 12, 16, 24, 32, 48, 64)
+AUTOTUNE_CHUNK_SIZES = (300, 500, 800)
+# Stop growing the batch once throughput improves by less than this
+AUTOTUNE_MIN_GAIN = 0.05
+# Representative narration: long and short sentences, dialogue, numbers
+CALIBRATION_TEXT = (
+    "The lighthouse keeper had kept the same routine for thirty-one years. "
+    "Every evening at a quarter past six he climbed the hundred and twelve steps, "
+    "wound the clockwork, trimmed the wick, and wrote a single line in the logbook. "
+    "Most nights the line said nothing more than the weather. "
+    "\"Fog again,\" he muttered, pressing the pen hard into the paper. "
+    "\"Always fog in October.\"\n\n"
+    "Down in the village, nobody thought much about him. "
+    "The baker sent up a loaf on Tuesdays; the postman left letters in a tin box by the gate. "
+    "But on the night the Margaret Rose failed to come home, every eye in the harbor turned toward the tower, "
+    "and the old man, who had never once been late, found the door at the bottom of the stairs locked from the inside. "
+    "He stood there for a long moment, listening to the sea. "
+    "Then he took the spare key from his coat, the one he had sworn he would never need, and began to climb.\n\n"
+)
+
 class AudioEngine:
     def __init__(self, log_callback=print, model_size="1.7B", batch_size=5, chunk_size=500,
                  temperature=0.7, top_p=0.8, top_k=20, repetition_penalty=1.05,
-                 attn_implementation="auto"):
+                 attn_implementation="auto", schedule_mode="length", memory_watermark=0.85,
+                 trace_renders=False, metrics_port=0, ref_prompt_tokens=REF_PROMPT_TOKENS):
         self.log = log_callback
         self.model_size = model_size
         self.batch_size = batch_size
@@ -203,9 +1301,21 @@ class AudioEngine:
         self.top_k = top_k
         self.repetition_penalty = repetition_penalty
         self.attn_implementation = attn_implementation
+        self.schedule_mode = schedule_mode if schedule_mode in SCHEDULE_MODES else "length"
+        self.ref_prompt_tokens = int(ref_prompt_tokens or 0)
 
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         self.log(f"Initializing AudioEngine on {self.device}...")
+        self.memory_policy = MemoryPolicy(self.device, watermark=memory_watermark, log=self.log)
+        self.trace_renders = trace_renders
+        self.tracer = RenderTracer()
+        self.metrics = RenderMetrics(self.device, model_size=model_size, batch_size=batch_size)
+        if metrics_port:
+            try:
+                MetricsServer.serve(int(metrics_port), self.metrics)
+                self.log(f"Metrics endpoint: http://127.0.0.1:{metrics_port}/metrics")
+            except OSError as e:
+                self.log(f"Could not start metrics endpoint on port {metrics_port}: {e}")
 
         if self.device == "cuda":
             torch.backends.cudnn.benchmark = False
@@ -217,10 +1327,18 @@ class AudioEngine:
         self.temp_dir = os.path.join(self.base_dir, "temp_work")
         self.output_dir = os.path.join(self.base_dir, "Output")
         self.models_dir = os.path.join(self.base_dir, "models")
+        # Render journals live here and survive _clear_temp_dir (see RenderJournal)
+        self.jobs_dir = os.path.join(self.temp_dir, "jobs")
 
         os.makedirs(self.temp_dir, exist_ok=True)
+        os.makedirs(self.jobs_dir, exist_ok=True)
         os.makedirs(self.output_dir, exist_ok=True)
         os.makedirs(self.models_dir, exist_ok=True)
+        self.history = RenderHistory(os.path.join(self.base_dir, "render_history.db"))
+        self.autotune_path = os.path.join(self.base_dir, "autotune.json")
+        self.preview_cache = PreviewCache(os.path.join(self.base_dir, "preview_cache"), log=self.log)
+        self._eta = None
+        self._job_chunk_size = self.chunk_size
 
         os.environ['HF_HOME'] = self.models_dir
         os.environ['TRANSFORMERS_CACHE'] = self.models_dir
@@ -294,6 +1412,7 @@ class AudioEngine:
         if self.active_model_type == model_type: return 
 
         self._unload_active_model()
+        load_start = time.perf_counter()
 
         if model_type == 'design':
             model_id = self.design_model_id
@@ -359,6 +1478,7 @@ class AudioEngine:
                 )
             
             self.active_model_type = model_type
+            self.tracer.record("model_load", load_start, model=model_id)
             self.log(f"Model loaded successfully.")
             self._log_vram("After Load")
 
@@ -375,21 +1495,165 @@ class AudioEngine:
             percent = (reserved / total) * 100
             self.log(f"[{stage}] VRAM: Alloc {allocated:.2f}GB | Rsrv {reserved:.2f}GB / {total:.1f}GB ({percent:.0f}%)")
 
-    def _transcribe_audio(self, audio_path):
+    def _transcribe_audio(self, audio_path, word_timestamps=False):
+        """Transcript text, or (text, [(start, end, word), ...]) with word_timestamps=True."""
         if self.whisper_model is None:
             self.log("Loading Whisper model...")
-            self.whisper_model = whisper.load_model("small", device=self.device)
-        result = self.whisper_model.transcribe(audio_path)
-        return result["text"].strip()
+            with self.tracer.span("whisper_load"):
+                self.whisper_model = whisper.load_model("small", device=self.device)
+        with self.tracer.span("transcribe", audio=os.path.basename(audio_path)):
+            result = self.whisper_model.transcribe(audio_path, word_timestamps=word_timestamps)
+        if not word_timestamps:
+            return result["text"].strip()
+        words = [(w["start"], w["end"], w["word"]) for seg in result.get("segments", []) for w in seg.get("words", [])]
+        return result["text"].strip(), words
+
+    @staticmethod
+    def _prompt_tokens(seconds, text):
+        """Approximate clone-prompt length: reference audio codes plus transcript tokens."""
+        return int(round(seconds * REF_AUDIO_TOKENS_PER_SECOND + len(text) / REF_TEXT_CHARS_PER_TOKEN))
+
+    def _fit_reference_prompt(self, key, audio_path):
+        """
+        Transcribe a reference and, if its prompt would exceed ref_prompt_tokens,
+        cut it at the last word boundary that fits (preferring a sentence end).
+        Word timestamps are only requested when a cut is needed, and the cut is
+        cached per reference and budget so later renders and resumes skip Whisper.
+        Returns (audio_path, ref_text); the trimmed clip lives in temp_work.
+        """
+        budget = self.ref_prompt_tokens
+        digest = _file_digest(audio_path)
+        out_path = os.path.join(self.temp_dir, "ref_prompts", f"{key}_{digest[:12]}_{budget}.wav")
+        fitted = self.preview_cache.reference_cut(digest, budget) if budget else None
+        if fitted:
+            # Fitted before: no Whisper, at most a re-cut (temp_work is cleared after each render)
+            if fitted["cut"] is None:
+                return audio_path, fitted["text"]
+            if not os.path.exists(out_path):
+                self._export_reference_cut(audio_path, fitted["cut"], out_path)
+            self.log(f"Reference prompt ({key}): reusing {fitted['cut']:.1f}s cut (budget {budget})")
+            return out_path, fitted["text"]
 
-    def create_voice_design(self, text, description, output_filename="preview_design.wav"):
+        try:
+            seconds = sf.info(audio_path).duration
+        except Exception:
+            seconds = len(AudioSegment.from_file(audio_path)) / 1000
+        # Word timings need a slower Whisper pass: only ask for them when a cut is needed.
+        # The audio alone may already prove it is; otherwise check the cached plain transcript first.
+        words = None
+        if budget and self._prompt_tokens(seconds, "") > budget:
+            text, words = self._transcribe_audio(audio_path, word_timestamps=True)
+        else:
+            _, text = self._cached_transcription(audio_path)
+        cost = self._prompt_tokens(seconds, text)
+        if budget and cost > budget and words is None:
+            text, words = self._transcribe_audio(audio_path, word_timestamps=True)
+            cost = self._prompt_tokens(seconds, text)
+        if not budget or cost <= budget or not words:
+            self.log(f"Reference prompt ({key}): {seconds:.1f}s, ~{cost} tokens")
+            return audio_path, text
+
+        # Candidate cuts: just after each word, halfway into the following pause.
+        # Take the last sentence end that fits unless it wastes most of the budget.
+        longest = sentence = None
+        for i, (start, end, _) in enumerate(words):
+            next_start = words[i + 1][0] if i + 1 < len(words) else seconds
+            cut = min(seconds, end + min(0.25, max(0.0, next_start - end) / 2))
+            kept_text = "".join(w for _, _, w in words[:i + 1]).strip()
+            if cut < REF_PROMPT_MIN_SECONDS: continue
+            if self._prompt_tokens(cut, kept_text) > budget: break
+            longest = (cut, kept_text)
+            if kept_text.endswith((".", "!", "?", "\"", "”")): sentence = longest
+        best = sentence if sentence and longest and sentence[0] >= 0.6 * longest[0] else longest
+        if best is None:
+            self.log(f"Reference prompt ({key}): {seconds:.1f}s, ~{cost} tokens "
+                     f"(over the {budget}-token budget, but no clean cut >= {REF_PROMPT_MIN_SECONDS:.0f}s fits)")
+            self.preview_cache.put_reference_cut(digest, budget, None, text)
+            return audio_path, text
+
+        cut, kept_text = best
+        self._export_reference_cut(audio_path, cut, out_path)
+        self.preview_cache.put_reference_cut(digest, budget, cut, kept_text)
+        self.log(f"Reference prompt ({key}): {seconds:.1f}s ~{cost} tokens -> {cut:.1f}s "
+                 f"~{self._prompt_tokens(cut, kept_text)} tokens (budget {budget})")
+        return out_path, kept_text
+
+    @staticmethod
+    def _export_reference_cut(audio_path, cut, out_path):
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        _decode_mono_segment(audio_path, duration=cut).fade_out(30).export(out_path, format="wav")
+
+    def _sampling_params(self):
+        return {"temperature": self.temperature, "top_p": self.top_p, "top_k": self.top_k,
+                "repetition_penalty": self.repetition_penalty}
+
+    def _preview_key(self, kind, text, voice, seed):
+        """Cache key for a Voice Lab take; voice is the description or the reference digest."""
+        model_id = self.design_model_id if kind == "design" else self.clone_model_id
+        return self.preview_cache.key_for(kind=kind, text=text, voice=voice, model=model_id,
+                                          seed=seed, params=self._sampling_params())
+
+    def _cached_transcription(self, audio_path):
+        """Whisper transcription of a reference, reused while the file content is unchanged."""
+        digest = _file_digest(audio_path)
+        ref_text = self.preview_cache.transcript(digest)
+        if ref_text is None:
+            ref_text = self._transcribe_audio(audio_path)
+            self.preview_cache.put_transcript(digest, ref_text)
+        return digest, ref_text
+
+    @staticmethod
+    def _seed_preview(seed):
+        """Pick a seed when none is given (so every take is reproducible) and apply it."""
+        if seed is None:
+            seed = int.from_bytes(os.urandom(2), "big")
+        torch.manual_seed(seed)
+        return seed
+
+    def import_voice_folder(self, folder, top_n=VOICE_IMPORT_TOP_N, progress_callback=None, stop_event=None):
+        """
+        Rank every recording in folder (see rank_voice_folder), then write an
+        optimized clip and a cached transcript for the top_n. Clips and a
+        ranking.json land in Output/voice_candidates/<folder name>/.
+        Returns the top_n results with "clip" and "ref_text" added.
+        """
+        ranked = rank_voice_folder(folder, log_callback=self.log, stop_event=stop_event)
+        if not ranked:
+            self.log("Voice import: No usable recordings found.")
+            return []
+
+        out_dir = os.path.join(self.output_dir, "voice_candidates", os.path.basename(os.path.normpath(folder)))
+        os.makedirs(out_dir, exist_ok=True)
+        top = ranked[:top_n]
+        for rank, cand in enumerate(top, 1):
+            if stop_event and stop_event.is_set(): return top[:rank - 1]
+            stem = os.path.splitext(os.path.basename(cand["path"]))[0]
+            cand["clip"] = os.path.join(out_dir, f"{rank:02d}_{stem}.wav")
+            _export_reference_clip(cand["path"], cand["clip"], start=cand["start"],
+                                   duration=None if cand["duration"] <= 10 else 5.0)
+            _, cand["ref_text"] = self._cached_transcription(cand["clip"])
+            self.log(f"Voice import: #{rank} {os.path.basename(cand['path'])} (score {cand['score']:.2f})")
+            if progress_callback: progress_callback(rank / len(top))
+
+        _atomic_write_json(os.path.join(out_dir, "ranking.json"), {"folder": folder, "ranked": ranked})
+        return top
+
+    def create_voice_design(self, text, description, output_filename="preview_design.wav", seed=None):
+        """Returns the cached take's path; an identical request (same seed) replays instantly."""
+        if seed is not None:
+            cached = self.preview_cache.get(self._preview_key("design", text, description, seed))
+            if cached:
+                self.log(f"Replaying cached design take (seed {seed}).")
+                return cached
         self._ensure_model('design')
         output_path = os.path.join(self.output_dir, output_filename)
         self.log(f"Generating Voice Design...")
+        seed = self._seed_preview(seed)
         with torch.inference_mode():
             # Cap tokens at 2048 to prevent loops, enough for previews
             wavs, sr = self.active_model.generate_voice_design(
-                text=text, language="English", instruct=description, max_new_tokens=2048
+                text=text, language="English", instruct=description, max_new_tokens=2048,
+                do_sample=True, **self._sampling_params()
             )
             # SAFE CPU MOVE: Check if it's already a numpy array
             wav_out = wavs[0]
@@ -400,17 +1664,63 @@ class AudioEngine:
             del wavs
         
         sf.write(output_path, wav_cpu, sr)
-        return output_path
+        return self.preview_cache.put(self._preview_key("design", text, description, seed), output_path,
+                                      kind="design", text=text, voice=description, seed=seed)
+
+    def create_voice_design_variants(self, text, description, count=4, descriptions=None, seed=None):
+        """
+        Generate several design takes in one batched generate_voice_design call for A/B
+        comparison: `count` samples of one description, or one take per entry of
+        `descriptions` (description tweaks). A batch shares one seed, so each take is
+        identified by (seed, variant index). Returns the cached take paths in order.
+        """
+        instructs = list(descriptions) if descriptions else [description] * max(1, int(count))
+        keys = [self._preview_key("design-variant", text, [instructs, i], seed) for i in range(len(instructs))]
+        if seed is not None:
+            cached = [self.preview_cache.get(k) for k in keys]
+            if all(cached):
+                self.log(f"Replaying {len(cached)} cached design variants (seed {seed}).")
+                return cached
 
-    def create_voice_clone_preview(self, text, ref_audio_path, output_filename="preview_clone.wav"):
+        self._ensure_model('design')
+        self.log(f"Generating {len(instructs)} Voice Design variants in one batch...")
+        seed = self._seed_preview(seed)
+        keys = [self._preview_key("design-variant", text, [instructs, i], seed) for i in range(len(instructs))]
+        start = time.perf_counter()
+        with torch.inference_mode():
+            wavs, sr = self.active_model.generate_voice_design(
+                text=[text] * len(instructs), language=["English"] * len(instructs), instruct=instructs,
+                max_new_tokens=2048, do_sample=True, **self._sampling_params()
+            )
+            wavs_cpu = [w.cpu().float().numpy() if hasattr(w, 'cpu') else w for w in wavs]
+            del wavs
+        self.log(f"{len(instructs)} variants in {time.perf_counter() - start:.1f}s")
+
+        paths = []
+        for i, (key, instruct, wav) in enumerate(zip(keys, instructs, wavs_cpu)):
+            output_path = os.path.join(self.output_dir, f"preview_design_v{i+1}.wav")
+            sf.write(output_path, wav, sr)
+            paths.append(self.preview_cache.put(key, output_path, kind=f"design v{i+1}", text=text,
+                                                voice=instruct, seed=seed))
+        return paths
+
+    def create_voice_clone_preview(self, text, ref_audio_path, output_filename="preview_clone.wav", seed=None):
+        """Returns the cached take's path; an identical request (same seed) replays instantly."""
+        digest, ref_text = self._cached_transcription(ref_audio_path)
+        if seed is not None:
+            cached = self.preview_cache.get(self._preview_key("clone", text, digest, seed))
+            if cached:
+                self.log(f"Replaying cached clone take (seed {seed}).")
+                return cached
         self._ensure_model('clone')
         output_path = os.path.join(self.output_dir, output_filename)
-        ref_text = self._transcribe_audio(ref_audio_path)
         self.log(f"Cloning voice...")
+        seed = self._seed_preview(seed)
         with torch.inference_mode():
             # Cap tokens at 2048
             wavs, sr = self.active_model.generate_voice_clone(
-                text=text, language="English", ref_audio=ref_audio_path, ref_text=ref_text, max_new_tokens=2048
+                text=text, language="English", ref_audio=ref_audio_path, ref_text=ref_text, max_new_tokens=2048,
+                do_sample=True, **self._sampling_params()
             )
             # SAFE CPU MOVE
             wav_out = wavs[0]
@@ -421,32 +1731,292 @@ class AudioEngine:
             del wavs
 
         sf.write(output_path, wav_cpu, sr)
-        return output_path
+        return self.preview_cache.put(self._preview_key("clone", text, digest, seed), output_path,
+                                      kind="clone", text=text, voice=os.path.basename(ref_audio_path), seed=seed)
+
+    def stream_voice_clone_preview(self, text, ref_audio_path, output_filename="preview_clone.wav",
+                                   on_first_audio=None, play=True, stop_event=None, seed=None):
+        """
+        Clone preview that starts sounding after the first sentence instead of the whole text.
+        qwen_tts has no streaming decoder (non_streaming_mode only changes how text is fed),
+        so the text is split into sentence groups of ~PREVIEW_STREAM_CHARS that share one
+        voice prompt, and each group goes to a PreviewStream as soon as it is generated.
+        """
+        digest, ref_text = self._cached_transcription(ref_audio_path)
+        if seed is not None:
+            cached = self.preview_cache.get(self._preview_key("clone-stream", text, digest, seed))
+            if cached:
+                self.log(f"Replaying cached clone take (seed {seed}).")
+                if on_first_audio: on_first_audio(cached)
+                return cached
+        self._ensure_model('clone')
+        output_path = os.path.join(self.output_dir, output_filename)
+        segments = [c for c in self._chunk_text(text, max_chars=PREVIEW_STREAM_CHARS) if c.strip()]
+        self.log(f"Cloning voice (streaming {len(segments)} segments)...")
+
+        stream = PreviewStream(output_path, play=play, on_first_audio=on_first_audio, log=self.log)
+        seed = self._seed_preview(seed)
+        start = time.perf_counter()
+        try:
+            with torch.inference_mode():
+                voice_prompt = None
+                if hasattr(self.active_model, 'create_voice_clone_prompt'):
+                    voice_prompt = self.active_model.create_voice_clone_prompt(ref_audio=ref_audio_path, ref_text=ref_text)
+                for n, segment in enumerate(segments):
+                    if stop_event and stop_event.is_set(): break
+                    # Same sampling as create_voice_clone_preview, so a streamed take matches a plain one
+                    wavs_cpu, sr = self._generate_batch([segment], voice_prompt, ref_audio_path, ref_text,
+                                                        do_sample=True, **self._sampling_params())
+                    if n: stream.write(np.zeros(int(sr * 0.25), dtype=np.float32), sr)  # same breath gap as renders
+                    stream.write(wavs_cpu[0], sr)
+                    if n == 0:
+                        self.log(f"First audio after {time.perf_counter() - start:.1f}s")
+        finally:
+            stream.close()
+        self.log(f"Preview complete in {time.perf_counter() - start:.1f}s")
+        if stop_event and stop_event.is_set():
+            return output_path
+        return self.preview_cache.put(self._preview_key("clone-stream", text, digest, seed), output_path,
+                                      kind="clone", text=text, voice=os.path.basename(ref_audio_path), seed=seed)
+
+    def _generate_batch(self, batch_texts, voice_prompt, ref_audio, ref_text, max_new_tokens=2048, **sampling):
+        """
+        Run one generate_voice_clone batch and return CPU numpy arrays + sample rate.
+        `sampling` adds to / overrides the render's sampling kwargs (previews pass do_sample, top_k...).
+        """
+        sampling = {"temperature": self.temperature, "top_p": self.top_p,
+                    "repetition_penalty": self.repetition_penalty, **sampling}
+        gen_start = time.perf_counter()
+        if voice_prompt is not None:
+            wavs, sr = self.active_model.generate_voice_clone(
+                text=batch_texts, language="English", voice_clone_prompt=voice_prompt,
+                max_new_tokens=max_new_tokens, non_streaming_mode=True, **sampling
+            )
+        else:
+            wavs, sr = self.active_model.generate_voice_clone(
+                text=batch_texts, language="English", ref_audio=ref_audio, ref_text=ref_text,
+                max_new_tokens=max_new_tokens, non_streaming_mode=True, **sampling
+            )
+        self.tracer.record("generate", gen_start, batch=len(batch_texts),
+                           longest_chars=max(len(t) for t in batch_texts))
+
+        # --- FIX: Move to CPU *immediately* inside loop ---
+        with self.tracer.span("transfer", batch=len(batch_texts)):
+            wavs_cpu = []
+            for w in wavs:
+                if hasattr(w, "cpu"):
+                    wavs_cpu.append(w.cpu().float().numpy())
+                else:
+                    wavs_cpu.append(w)
+            del wavs
+        return wavs_cpu, sr
+
+    def _journal_settings(self, chunk_size):
+        """Settings that change the rendered audio; a mismatch invalidates a journal."""
+        return {
+            "model": self.render_model_id,
+            "chunk_size": chunk_size,
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "repetition_penalty": self.repetition_penalty,
+            "ref_prompt_tokens": self.ref_prompt_tokens,
+        }
+
+    def _schedule_batches(self, items):
+        """
+        Split work items (chapter_idx, chunk_idx, text, voice_key) into batches.
+
+        items must be in reading order. In "length" mode each chapter is sorted
+        longest-first so batches hold similar lengths (least padding). In
+        "chapter" mode the book is walked in reading order in blocks of
+        CHAPTER_ORDER_WINDOW batches, each block sorted by length: chapters finish
+        in order while batches stay nearly as homogeneous.
+        Within a block, batches never mix voices so one cached prompt serves the batch.
+        """
+        blocks = []
+        if self.schedule_mode == "chapter":
+            block_size = self.batch_size * CHAPTER_ORDER_WINDOW
+            blocks = [items[i : i + block_size] for i in range(0, len(items), block_size)]
+        else:
+            for item in items:
+                if blocks and blocks[-1][0][0] == item[0]: blocks[-1].append(item)
+                else: blocks.append([item])
+
+        for block in blocks:
+            by_voice = {}
+            for item in block:
+                by_voice.setdefault(item[3], []).append(item)
+            for group in by_voice.values():
+                group.sort(key=lambda x: len(x[2]), reverse=True)
+                for i in range(0, len(group), self.batch_size):
+                    yield group[i : i + self.batch_size]
+
+    def _iter_rendered_batches(self, items, voices, stop_event=None, max_new_tokens=2048):
+        """
+        Generate every scheduled batch. voices maps voice_key -> (voice_prompt, ref_audio, ref_text).
+        Yields (batch_items, wavs_cpu, sr, seconds) for each successful batch;
+        failed batches are logged and skipped.
+        Returns early (without raising) when stop_event is set.
+        """
+        with torch.inference_mode():
+            for n, batch_items in enumerate(self._schedule_batches(items)):
+                if stop_event and stop_event.is_set():
+                    return
+
+                # Clean up only when RAM/VRAM is near the watermark
+                with self.tracer.span("memory_check", batch=n):
+                    self.memory_policy.maybe_cleanup(f"batch {n}")
+
+                # VRAM Log
+                if n % 20 == 0: self._log_vram(f"Batch {n}")
+
+                try:
+                    batch_start = time.time()
+                    voice_prompt, ref_audio, ref_text = voices[batch_items[0][3]]
+                    wavs_cpu, sr = self._generate_batch([x[2] for x in batch_items], voice_prompt,
+                                                        ref_audio, ref_text, max_new_tokens=max_new_tokens)
+                except Exception as e:
+                    self.log(f"Error in batch: {e}")
+                    self.metrics.batch_failed(e)
+                    self.memory_policy.after_error(e, f"batch {n} error")
+                    continue
+
+                seconds = time.time() - batch_start
+                self.metrics.observe_batch(seconds, len(batch_items), sum(len(w) for w in wavs_cpu) / sr,
+                                           chars=sum(len(x[2]) for x in batch_items))
+                yield batch_items, wavs_cpu, sr, seconds
+
+    def estimate_render(self, chars, chunk_size=None):
+        """
+        Predict render time and output length for `chars` characters of text from
+        past renders with this configuration. render_seconds is None until the
+        history has a comparable run.
+        """
+        chunk_size = chunk_size or self.chunk_size
+        chars_per_sec, chars_per_audio_sec, runs = self.history.rates(
+            self.model_size, self.device, self.batch_size, chunk_size)
+        return {
+            "render_seconds": chars / chars_per_sec if chars_per_sec else None,
+            "audio_seconds": chars / (chars_per_audio_sec or DEFAULT_CHARS_PER_AUDIO_SECOND),
+            "runs": runs,
+        }
+
+    def _begin_eta(self, chars_remaining, chunk_size):
+        """Log the pre-render estimate and start the live ETA for this job."""
+        self._job_chunk_size = chunk_size
+        estimate = self.estimate_render(chars_remaining, chunk_size)
+        prior_rate = chars_remaining / estimate["render_seconds"] if estimate["render_seconds"] else None
+        self._eta = EtaEstimator(chars_remaining, prior_rate)
+        if not chars_remaining: return
+        audio_txt = f"~{_format_duration(estimate['audio_seconds'])} of audio"
+        if estimate["render_seconds"] is not None:
+            self.log(f"Estimate: {audio_txt}, render time ~{_format_duration(estimate['render_seconds'])} "
+                     f"(based on {estimate['runs']} past renders)")
+        else:
+            self.log(f"Estimate: {audio_txt}; no render history for this setup yet, ETA will follow the first batches")
+
+    def _log_batch_done(self, processed_count, total_chunks, seconds, batch_len):
+        speed_per_chunk = seconds / batch_len
+        progress_pct = (processed_count / total_chunks) * 100 if total_chunks else 100
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        eta_txt = ""
+        if self._eta:
+            eta = self._eta.eta_seconds(self.metrics.chars_done)
+            self.metrics.eta_seconds = eta
+            if eta is not None: eta_txt = f" | ETA {_format_duration(eta)}"
+        if self.device == "cuda":
+            # CHANGED TO MEMORY_RESERVED to match Task Manager
+            reserved = torch.cuda.memory_reserved() / 1024**3
+            self.log(f"[{timestamp}] Done {processed_count}/{total_chunks} ({progress_pct:.0f}%) | {speed_per_chunk:.2f}s/chunk | VRAM: {reserved:.1f}GB{eta_txt}")
+        else:
+            self.log(f"[{timestamp}] Done {processed_count}/{total_chunks} ({progress_pct:.0f}%) | {speed_per_chunk:.2f}s/chunk{eta_txt}")
+
+    def _stitched_pieces(self, chunks, sample_rate):
+        """Yield the stitched book as int16 pieces: each chunk with micro-fades, breath gaps between."""
+        # --- STITCHING LOGIC WITH 250ms BREATH GAP & MICRO-FADES ---
+        gap = np.zeros(int(sample_rate * 0.250), dtype=np.int16)  # 250ms gap
+        for n, chunk in enumerate(chunks):
+            if n: yield gap
+            # Stitching is interleaved with encoding, so each chunk gets its own span
+            with self.tracer.span("stitch", chunk=n):
+                seg = _micro_fade(_as_int16(chunk), sample_rate)  # 50ms fade in/out on every chunk
+            yield seg
+
+    def _write_stitched(self, chunks, sample_rate, out_path, fmt):
+        """
+        Stitch chunk arrays straight into out_path, one chunk at a time, so RAM stays
+        bounded however long the book is: WAV through soundfile, anything else
+        through an ffmpeg pipe.
+        """
+        with self.tracer.span("export", format=fmt, file=os.path.basename(out_path)):
+            if fmt == "wav":
+                with sf.SoundFile(out_path, 'w', samplerate=sample_rate, channels=1, subtype='PCM_16') as f:
+                    for piece in self._stitched_pieces(chunks, sample_rate):
+                        f.write(piece)
+                return out_path
+
+            cmd = ['ffmpeg', '-y', '-loglevel', 'error', '-f', 's16le', '-ar', str(sample_rate), '-ac', '1',
+                   '-i', 'pipe:0', '-f', fmt, out_path]
+            process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+            try:
+                for piece in self._stitched_pieces(chunks, sample_rate):
+                    process.stdin.write(piece.tobytes())
+            finally:
+                process.stdin.close()
+                stderr = process.stderr.read().decode('utf-8', errors='replace')
+                process.wait()
+            if process.returncode != 0:
+                raise RuntimeError(f"ffmpeg encode failed: {stderr[-500:]}")
+        return out_path
+
+    def _run_render_job(self, name, render_fn, *args, **kwargs):
+        """Run a render with live metrics (and the tracer, if enabled); dump both when it ends."""
+        self.metrics.reset(name)
+        self._eta = None
+        if self.trace_renders: self.tracer.begin(name)
+        status = "failed"
+        try:
+            with self.tracer.span("render_total", cat="job"):
+                result = render_fn(*args, **kwargs)
+            status = "completed" if result else "stopped"
+            return result
+        finally:
+            self.metrics.finish(status)
+            self._record_history(status)
+            try:
+                metrics_path = self.metrics.dump(os.path.join(self.output_dir, "metrics"))
+                self.log(f"Render metrics saved: {metrics_path}")
+            except OSError as e:
+                self.log(f"Could not save render metrics: {e}")
+            if self.trace_renders:
+                trace_path, _ = self.tracer.end(os.path.join(self.output_dir, "traces"))
+                if trace_path:
+                    totals = sorted(self.tracer.stage_totals().items(), key=lambda kv: -kv[1])
+                    self.log("Trace stages: " + ", ".join(f"{k} {v:.1f}s" for k, v in totals))
+                    self.log(f"Trace saved: {trace_path}")
+
+    def _record_history(self, status):
+        snap = self.metrics.snapshot()
+        if status == "failed" or not snap["chars_done"]: return
+        try:
+            self.history.record(snap["job"], status, self.model_size, self.device, self.batch_size,
+                                self._job_chunk_size, snap["chars_done"], snap["chunks_done"] - snap["chunks_resumed"],
+                                snap["audio_seconds"], snap["wall_seconds"])
+        except sqlite3.Error as e:
+            self.log(f"Could not update render history: {e}")
 
     def render_book(self, text_file_path, master_voice_path, progress_callback=None, stop_event=None):
+        book_name = os.path.splitext(os.path.basename(text_file_path))[0]
+        return self._run_render_job(book_name, self._render_book, text_file_path, master_voice_path,
+                            progress_callback, stop_event)
+
+    def _render_book(self, text_file_path, master_voice_path, progress_callback=None, stop_event=None):
         self._unload_active_model()
         self._ensure_model('render')
+        self.memory_policy.reset()
 
         self.log("Step 1/3: Analyzing Master Voice...")
-        ref_text = self._transcribe_audio(master_voice_path)
-
-        # CRITICAL: Unload Whisper and SYNC
-        if self.whisper_model is not None:
-            del self.whisper_model
-            self.whisper_model = None
-            gc.collect()
-            if self.device == "cuda":
-                torch.cuda.empty_cache()
-                torch.cuda.synchronize()
-            self.log("Whisper model unloaded to free VRAM")
-
-        voice_prompt = None
-        try:
-             if hasattr(self.active_model, 'create_voice_clone_prompt'):
-                self.log("Optimizing voice embedding...")
-                voice_prompt = self.active_model.create_voice_clone_prompt(ref_audio=master_voice_path, ref_text=ref_text)
-        except Exception as e:
-             self.log(f"Optimization skipped: {e}")
+        voices = self._prepare_voices({NARRATOR_VOICE: master_voice_path})
 
         self.log("Step 2/3: Reading text...")
         original_book_name = os.path.splitext(os.path.basename(text_file_path))[0]
@@ -459,113 +2029,82 @@ class AudioEngine:
 
         chunks = self._chunk_text(full_text)
         total_chunks = len(chunks)
-        self.log(f"Starting render of {total_chunks} chunks.")
+
+        # --- CRASH-SAFE RESUME ---
+        journal = RenderJournal(self.jobs_dir, hashlib.sha1(full_text.encode('utf-8')).hexdigest(),
+                                master_voice_path, self._journal_settings(self.chunk_size), log=self.log)
+
+        results_cache = journal.chapter_chunks(0)
+        processed_count = sum(1 for i in range(total_chunks) if i in results_cache)
+        if processed_count:
+            self.log(f"Resuming job {journal.job_id}: {processed_count}/{total_chunks} chunks already rendered.")
+        self.metrics.set_totals(sum(1 for c in chunks if c.strip()), processed_count)
+        self._begin_eta(sum(len(c) for i, c in enumerate(chunks) if c.strip() and i not in results_cache),
+                        self.chunk_size)
+        self.log(f"Starting render of {total_chunks} chunks ({self.schedule_mode} order).")
+
+        # --- EARLY LISTENING: publish finished parts in reading order ---
+        preview_dir = os.path.join(self.output_dir, f"{original_book_name}_preview")
+        sections = [range(s, min(s + PREVIEW_SECTION_CHUNKS, total_chunks))
+                    for s in range(0, total_chunks, PREVIEW_SECTION_CHUNKS)]
+        next_section = 0
+
+        def publish_ready_sections():
+            nonlocal next_section
+            while next_section < len(sections):
+                section = sections[next_section]
+                if any(i not in results_cache for i in section if chunks[i].strip()):
+                    return
+                ready = [i for i in section if i in results_cache]
+                part_path = os.path.join(preview_dir, f"{original_book_name}_part_{next_section+1:03d}.mp3")
+                if ready and not os.path.exists(part_path):
+                    os.makedirs(preview_dir, exist_ok=True)
+                    self._write_stitched((results_cache.get(i) for i in ready), results_cache.sample_rate,
+                                         part_path, "mp3")
+                    self.log(f"Preview ready: {part_path}")
+                next_section += 1
 
         # --- SMART BATCHING ---
-        indexed_chunks = [(i, c) for i, c in enumerate(chunks) if c.strip()]
-        indexed_chunks.sort(key=lambda x: len(x[1]), reverse=True)
+        items = [(0, i, c, NARRATOR_VOICE) for i, c in enumerate(chunks) if c.strip() and i not in results_cache]
         
-        results_cache = {}
-        processed_count = 0
-        
-        with torch.inference_mode():
-            for i in range(0, len(indexed_chunks), self.batch_size):
-                if stop_event and stop_event.is_set():
-                    self.log("Render stopped by user.")
-                    return None
-
-                batch_items = indexed_chunks[i : i + self.batch_size]
-                batch_indices = [item[0] for item in batch_items]
-                batch_texts = [item[1] for item in batch_items]
-
-                # --- FIX: Periodic Cleanup (Every 5 batches) ---
-                if i % 5 == 0 and i > 0:
-                    gc.collect()
-                    if self.device == "cuda": 
-                        torch.cuda.empty_cache()
-                        torch.cuda.synchronize()
-
-                # VRAM Log
-                if i % 20 == 0: self._log_vram(f"Batch {i//self.batch_size}")
-
-                try:
-                    batch_start = time.time()
-                    
-                    if voice_prompt is not None:
-                        wavs, sr = self.active_model.generate_voice_clone(
-                            text=batch_texts, language="English", voice_clone_prompt=voice_prompt,
-                            max_new_tokens=2048, temperature=self.temperature, top_p=self.top_p,
-                            repetition_penalty=self.repetition_penalty, non_streaming_mode=True
-                        )
-                    else:
-                        wavs, sr = self.active_model.generate_voice_clone(
-                            text=batch_texts, language="English", ref_audio=master_voice_path, ref_text=ref_text,
-                            max_new_tokens=2048, temperature=self.temperature, top_p=self.top_p,
-                            repetition_penalty=self.repetition_penalty, non_streaming_mode=True
-                        )
-
-                    # --- FIX: Move to CPU *immediately* inside loop ---
-                    wavs_cpu = []
-                    for w in wavs:
-                        if hasattr(w, "cpu"):
-                            wavs_cpu.append(w.cpu().float().numpy())
-                        else:
-                            wavs_cpu.append(w)
-                    del wavs 
-
-                    for idx, (wav, original_index) in enumerate(zip(wavs_cpu, batch_indices)):
-                        voice_sig = os.path.basename(master_voice_path)
-                        chunk_hash = hashlib.md5((chunks[original_index] + voice_sig).encode('utf-8')).hexdigest()[:8]
-                        temp_wav = os.path.join(self.temp_dir, f"chunk_{original_index:04d}_{chunk_hash}.wav")
-                        sf.write(temp_wav, wav, sr)
-                        results_cache[original_index] = AudioSegment.from_wav(temp_wav)
-                        
-                    duration = time.time() - batch_start
-                    processed_count += len(batch_items)
-                    speed_per_chunk = duration / len(batch_items)
-                    progress_pct = (processed_count / total_chunks) * 100
-                    
-                    timestamp = datetime.now().strftime("%H:%M:%S")
-                    
-                    if self.device == "cuda":
-                         reserved = torch.cuda.memory_reserved() / 1024**3
-                         self.log(f"[{timestamp}] Done {processed_count}/{total_chunks} ({progress_pct:.0f}%) | {speed_per_chunk:.2f}s/chunk | VRAM: {reserved:.1f}GB")
-                    else:
-                         self.log(f"[{timestamp}] Done {processed_count}/{total_chunks} ({progress_pct:.0f}%) | {speed_per_chunk:.2f}s/chunk")
-
-                    if progress_callback: 
-                        progress_callback(processed_count / total_chunks)
-
-                except Exception as e:
-                    self.log(f"Error in batch: {e}")
-                    gc.collect()
-                    if self.device == "cuda": torch.cuda.empty_cache()
-                    continue
+        for batch_items, wavs_cpu, sr, seconds in self._iter_rendered_batches(
+                items, voices, stop_event=stop_event):
+            with self.tracer.span("write_chunks", chunks=len(batch_items)):
+                for wav, (_, original_index, _, _) in zip(wavs_cpu, batch_items):
+                    results_cache.add(original_index, wav, sr)
+            with self.tracer.span("journal_save"):
+                journal.save()
+
+            processed_count += len(batch_items)
+            self._log_batch_done(processed_count, total_chunks, seconds, len(batch_items))
+            if progress_callback: 
+                progress_callback(processed_count / total_chunks)
+            if self.schedule_mode == "chapter":
+                publish_ready_sections()
+
+        self.log(self.memory_policy.summary())
+        if stop_event and stop_event.is_set():
+            self.log(f"Render stopped by user. Progress saved (job {journal.job_id}).")
+            return None
 
         self.log("Step 3/3: Stitching audio in correct order...")
         
-        # --- NEW STITCHING LOGIC WITH 250ms BREATH GAP & MICRO-FADES ---
-        silence_gap = AudioSegment.silent(duration=250) # 250ms gap
-        
-        audio_segments = []
+        ready = []
         for i in range(total_chunks):
             if i in results_cache:
-                audio_segments.append(results_cache[i])
+                ready.append(i)
             else:
                 self.log(f"Warning: Chunk {i} failed to render.")
 
-        if audio_segments:
-            # Process first chunk
-            final_audio = audio_segments[0].fade_in(50).fade_out(50)
-            
-            # Process subsequent chunks
-            for seg in audio_segments[1:]: 
-                processed_seg = seg.fade_in(50).fade_out(50)
-                final_audio += silence_gap + processed_seg 
-
+        if ready:
+            # Streams from the memory-mapped spool into the encoder; the book is never fully in RAM
             out_path = os.path.join(self.output_dir, f"{original_book_name}_audiobook.mp3")
-            final_audio.export(out_path, format="mp3")
+            self._write_stitched((results_cache.get(i) for i in ready), results_cache.sample_rate, out_path, "mp3")
             self.log(f"SUCCESS: Saved to {out_path}")
+            # Only a fully stitched book retires the journal; failed chunks stay resumable
+            if all(i in results_cache for i, c in enumerate(chunks) if c.strip()):
+                journal.finalize()
+                shutil.rmtree(preview_dir, ignore_errors=True)
             self._clear_temp_dir()
             return out_path
         else:
@@ -686,22 +2225,50 @@ class AudioEngine:
 
     def render_from_manifest(self, json_path, master_voice_path, progress_callback=None, stop_event=None, chunk_size=None):
         with open(json_path, 'r', encoding='utf-8') as f: manifest = json.load(f)
-        return self._render_from_manifest_data(manifest, master_voice_path, progress_callback, stop_event, chunk_size=chunk_size)
+        return self._render_from_manifest_data(manifest, master_voice_path, progress_callback, stop_event, chunk_size=chunk_size,
+                                               voice_base_dir=os.path.dirname(os.path.abspath(json_path)))
+
+    def _resolve_manifest_voices(self, manifest, master_voice_path, voice_base_dir=None):
+        """
+        Map every voice key used by the manifest to an audio file.
+
+        The master voice is always the narrator. Other keys come from the
+        manifest's top-level "voices" table and are referenced by a chapter's
+        "voice" or by a span's "voice" inside chapter "spans". Relative paths
+        are resolved against voice_base_dir (the manifest's folder).
+        """
+        table = manifest.get("voices", {}) or {}
+        if NARRATOR_VOICE in table:
+            self.log(f"Note: manifest voice '{NARRATOR_VOICE}' is ignored; the loaded master voice narrates.")
+
+        used = set()
+        for chapter in manifest.get("chapters", []):
+            used.add(chapter.get("voice") or NARRATOR_VOICE)
+            for span in chapter.get("spans") or []:
+                used.add(span.get("voice") or chapter.get("voice") or NARRATOR_VOICE)
+
+        voice_paths = {NARRATOR_VOICE: master_voice_path}
+        for key in sorted(used - {NARRATOR_VOICE}):
+            if key not in table:
+                raise RuntimeError(f"Manifest uses voice '{key}' but has no entry for it in \"voices\".")
+            path = table[key]
+            if voice_base_dir and not os.path.isabs(path):
+                path = os.path.join(voice_base_dir, path)
+            if not os.path.exists(path):
+                raise RuntimeError(f"Voice file for '{key}' not found: {path}")
+            voice_paths[key] = path
+        return voice_paths
+
+    def _prepare_voices(self, voice_paths):
+        """
+        Transcribe every reference and build its clone prompt before rendering starts.
+        Returns voice_key -> (voice_prompt or None, ref_audio, ref_text).
+        """
+        # Trim long references to the prompt budget while Whisper is still loaded
+        fitted = {key: self._fit_reference_prompt(key, path) for key, path in voice_paths.items()}
+        voice_paths = {key: path for key, (path, _) in fitted.items()}
+        ref_texts = {key: text for key, (_, text) in fitted.items()}
 
-    def _render_from_manifest_data(self, manifest, master_voice_path, progress_callback=None, stop_event=None, chunk_size=None):
-        self._unload_active_model()
-        self._ensure_model('render')
-        
-        book_title = manifest.get("title", "Untitled")
-        author = manifest.get("author", "Unknown") # Get author for filename
-        chapters_data = manifest.get("chapters", [])
-        
-        # Clean folder name
-        book_output_dir = os.path.join(self.output_dir, "".join(c for c in book_title if c.isalnum() or c in ' -_').strip())
-        os.makedirs(book_output_dir, exist_ok=True)
-
-        ref_text = self._transcribe_audio(master_voice_path)
-        
         # CRITICAL: Unload Whisper and SYNC
         if self.whisper_model is not None:
             del self.whisper_model
@@ -712,132 +2279,274 @@ class AudioEngine:
                 torch.cuda.synchronize()
             self.log("Whisper model unloaded to free VRAM")
 
-        voice_prompt = None
+        voices = {}
+        for key, path in voice_paths.items():
+            voice_prompt = None
+            try:
+                if hasattr(self.active_model, 'create_voice_clone_prompt'):
+                    self.log(f"Optimizing voice embedding ({key})...")
+                    with self.tracer.span("voice_prompt", voice=key):
+                        voice_prompt = self.active_model.create_voice_clone_prompt(ref_audio=path, ref_text=ref_texts[key])
+            except Exception as e:
+                self.log(f"Voice prompt for '{key}' skipped: {e}")
+            voices[key] = (voice_prompt, path, ref_texts[key])
+        if len(voices) > 1:
+            self.log(f"Prepared {len(voices)} voices: {', '.join(voices)}")
+        return voices
+
+    # --- AUTO-TUNE ---
+    def _device_fingerprint(self):
+        """Key for persisted tuning: device, memory, model, attention backend and torch version."""
+        if self.device == "cuda":
+            props = torch.cuda.get_device_properties(0)
+            device = f"{props.name} {props.total_memory // 1024**2}MB"
+        else:
+            device = f"cpu x{os.cpu_count()}"
+        return f"{device} | {self.render_model_id} | attn={self.attn_implementation} | torch {torch.__version__}"
+
+    def _load_autotune_results(self):
         try:
-            if hasattr(self.active_model, 'create_voice_clone_prompt'):
-                voice_prompt = self.active_model.create_voice_clone_prompt(ref_audio=master_voice_path, ref_text=ref_text)
-        except: pass
+            with open(self.autotune_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def tuned_settings(self):
+        """Persisted auto-tune result for this device + model, or None."""
+        return self._load_autotune_results().get(self._device_fingerprint())
+
+    def _probe_config(self, voice, chunks, batch_size, probe_batches):
+        """Time probe_batches batches of batch_size calibration chunks. Returns chars/s and audio s/s."""
+        voice_prompt, ref_audio, ref_text = voice
+        texts = [chunks[i % len(chunks)] for i in range(batch_size * probe_batches)]
+        chars, audio_seconds = 0, 0.0
+        start = time.perf_counter()
+        for b in range(probe_batches):
+            batch = texts[b * batch_size:(b + 1) * batch_size]
+            wavs_cpu, sr = self._generate_batch(batch, voice_prompt, ref_audio, ref_text)
+            chars += sum(len(t) for t in batch)
+            audio_seconds += sum(len(w) for w in wavs_cpu) / sr
+        elapsed = time.perf_counter() - start
+        return chars / elapsed, audio_seconds / elapsed
+
+    def auto_tune(self, voice_path, batch_sizes=AUTOTUNE_BATCH_SIZES, chunk_sizes=AUTOTUNE_CHUNK_SIZES,
+                  probe_batches=2, progress_callback=None, stop_event=None):
+        """
+        Sweep batch size x chunk size with short timed renders of CALIBRATION_TEXT.
+        For each chunk size the batch grows until it hits OOM, memory above the
+        watermark, or less than AUTOTUNE_MIN_GAIN improvement. The fastest stable
+        configuration is saved per device fingerprint (see tuned_settings) and
+        returned as a dict, or None if nothing completed or stop_event was set.
+        """
+        self._unload_active_model()
+        self._ensure_model('render')
+        self.memory_policy.reset()
+        voice = self._prepare_voices({NARRATOR_VOICE: voice_path})[NARRATOR_VOICE]
+        fingerprint = self._device_fingerprint()
+        self.log(f"Auto-tune: {fingerprint}")
+
+        grid = []
+        steps = len(batch_sizes) * len(chunk_sizes)
+        done = 0
+        with torch.inference_mode():
+            # Warm-up so the first probe doesn't pay for kernel/cache setup
+            self._generate_batch([CALIBRATION_TEXT[:200]], *voice)
+
+            for chunk_size in chunk_sizes:
+                chunks = [c for c in self._chunk_text(CALIBRATION_TEXT * 4, max_chars=chunk_size) if c.strip()]
+                best_rate = 0.0
+                for batch_size in batch_sizes:
+                    if stop_event and stop_event.is_set():
+                        break
+                    entry = {"batch_size": batch_size, "chunk_size": chunk_size}
+                    try:
+                        chars_per_sec, audio_rate = self._probe_config(voice, chunks, batch_size, probe_batches)
+                    except Exception as e:
+                        self.memory_policy.after_error(e, f"auto-tune b{batch_size} c{chunk_size}")
+                        entry["error"] = str(e)[:200]
+                        grid.append(entry)
+                        self.log(f"Auto-tune: batch {batch_size} @ {chunk_size} chars failed ({entry['error']}), stopping here")
+                        break
+                    vram, _ = self.memory_policy.vram_pressure()
+                    entry.update(chars_per_sec=round(chars_per_sec, 2), audio_per_sec=round(audio_rate, 3),
+                                 stable=vram is None or vram <= self.memory_policy.watermark)
+                    grid.append(entry)
+                    self.log(f"Auto-tune: batch {batch_size:>2} @ {chunk_size} chars -> "
+                             f"{chars_per_sec:.1f} chars/s, {audio_rate:.2f}x real time")
+                    done += 1
+                    if progress_callback: progress_callback(done / steps)
+
+                    if not entry["stable"]:
+                        self.log(f"Auto-tune: VRAM {vram:.0%} above watermark, stopping at batch {batch_size}")
+                        break
+                    if best_rate and chars_per_sec < best_rate * (1 + AUTOTUNE_MIN_GAIN):
+                        break  # diminishing returns
+                    best_rate = max(best_rate, chars_per_sec)
+                self.memory_policy.maybe_cleanup(f"auto-tune chunk {chunk_size}")
+                if stop_event and stop_event.is_set():
+                    break
+
+        if stop_event and stop_event.is_set():
+            # A partial sweep may have missed the best setting; keep the saved one
+            self.log("Auto-tune: stopped, nothing saved.")
+            return None
+        stable = [e for e in grid if e.get("stable")]
+        if not stable:
+            self.log("Auto-tune: no configuration completed.")
+            return None
+        best = max(stable, key=lambda e: e["chars_per_sec"])
+        result = {"batch_size": best["batch_size"], "chunk_size": best["chunk_size"],
+                  "chars_per_sec": best["chars_per_sec"], "audio_per_sec": best["audio_per_sec"],
+                  "created": datetime.now().isoformat(timespec='seconds'), "grid": grid}
+
+        results = self._load_autotune_results()
+        results[fingerprint] = result
+        _atomic_write_json(self.autotune_path, results)
+        self.log(f"Auto-tune: best = batch {result['batch_size']}, chunk {result['chunk_size']} "
+                 f"({result['chars_per_sec']:.1f} chars/s). Saved to {self.autotune_path}")
+        return result
+
+    def _render_from_manifest_data(self, manifest, master_voice_path, progress_callback=None, stop_event=None, chunk_size=None,
+                                   voice_base_dir=None):
+        return self._run_render_job(manifest.get("title", "Untitled"), self._render_manifest_job, manifest, master_voice_path,
+                            progress_callback, stop_event, chunk_size, voice_base_dir)
+
+    def _render_manifest_job(self, manifest, master_voice_path, progress_callback=None, stop_event=None, chunk_size=None,
+                             voice_base_dir=None):
+        book_title = manifest.get("title", "Untitled")
+        author = manifest.get("author", "Unknown") # Get author for filename
+        chapters_data = manifest.get("chapters", [])
 
-        chapter_audio_files = []
-        chapters_info = []
+        # Fail fast on a bad cast list, before any model is loaded
+        voice_paths = self._resolve_manifest_voices(manifest, master_voice_path, voice_base_dir)
+
+        self._unload_active_model()
+        self._ensure_model('render')
+        self.memory_policy.reset()
         
+        # Clean folder name
+        book_output_dir = os.path.join(self.output_dir, "".join(c for c in book_title if c.isalnum() or c in ' -_').strip())
+        os.makedirs(book_output_dir, exist_ok=True)
+
+        # USE DYNAMIC CHUNK SIZE IF PROVIDED
+        use_chunk_size = chunk_size if chunk_size is not None else self.chunk_size
+
+        # --- CRASH-SAFE RESUME ---
+        manifest_key = hashlib.sha1(json.dumps(manifest, sort_keys=True).encode('utf-8')).hexdigest()
+        journal = RenderJournal(self.jobs_dir, manifest_key, list(voice_paths.values()),
+                                self._journal_settings(use_chunk_size), log=self.log)
+        if journal.is_resume:
+            self.log(f"Resuming job {journal.job_id}: {len(journal.data['chapters'])}/{len(chapters_data)} chapters already rendered.")
+
+        voices = self._prepare_voices(voice_paths)
+
         # AUDIT: Cap tokens to prevent loops
         MAX_TOKENS = 2048
 
+        # --- PLAN: chunk every chapter up front so batches can span chapter boundaries ---
+        chapter_state = []
+        items = []
         for chapter_idx, chapter in enumerate(chapters_data):
-            if stop_event and stop_event.is_set(): return None
-            
             label = chapter.get("label", f"Chapter {chapter_idx+1}")
-            text = chapter.get("text", "")
-            style = chapter.get("style_prompt", "")
-            self.log(f"Rendering: {label}")
-
-            # USE DYNAMIC CHUNK SIZE IF PROVIDED
-            use_chunk_size = chunk_size if chunk_size is not None else self.chunk_size
-            chunks = self._chunk_text(text, max_chars=use_chunk_size)
-            
-            # Smart Batching
-            indexed_chunks = [(i, (f"{style}\n\n{c}" if style else c)) for i, c in enumerate(chunks) if c.strip()]
-            indexed_chunks.sort(key=lambda x: len(x[1]), reverse=True)
-            
-            results_cache = {}
-            processed_count = 0
-            
-            with torch.inference_mode():
-                for i in range(0, len(indexed_chunks), self.batch_size):
-                    if stop_event and stop_event.is_set(): return None
-                    
-                    batch_items = indexed_chunks[i : i+self.batch_size]
-                    batch_indices = [x[0] for x in batch_items]
-                    batch_texts = [x[1] for x in batch_items]
-
-                    # --- FIX: Periodic Cleanup (Every 5 batches) ---
-                    if i % 5 == 0 and i > 0:
-                        gc.collect()
-                        if self.device == "cuda": 
-                            torch.cuda.empty_cache()
-                            torch.cuda.synchronize()
-
-                    try:
-                        batch_start = time.time()
-                        if voice_prompt:
-                            wavs, sr = self.active_model.generate_voice_clone(
-                                text=batch_texts, language="English", voice_clone_prompt=voice_prompt,
-                                max_new_tokens=MAX_TOKENS, temperature=self.temperature, top_p=self.top_p, 
-                                repetition_penalty=self.repetition_penalty, non_streaming_mode=True)
-                        else:
-                            wavs, sr = self.active_model.generate_voice_clone(
-                                text=batch_texts, language="English", ref_audio=master_voice_path, ref_text=ref_text,
-                                max_new_tokens=MAX_TOKENS, temperature=self.temperature, top_p=self.top_p, 
-                                repetition_penalty=self.repetition_penalty, non_streaming_mode=True)
-                        
-                        # --- FIX: Move to CPU *immediately* ---
-                        wavs_cpu = []
-                        for w in wavs:
-                            if hasattr(w, "cpu"):
-                                wavs_cpu.append(w.cpu().float().numpy())
-                            else:
-                                wavs_cpu.append(w)
-                        del wavs
-
-                        for wav, idx in zip(wavs_cpu, batch_indices):
-                            temp_wav = os.path.join(self.temp_dir, f"tmp_{chapter_idx}_{idx}.wav")
-                            sf.write(temp_wav, wav, sr)
-                            results_cache[idx] = AudioSegment.from_wav(temp_wav)
-                            os.unlink(temp_wav)
-
-                        # --- DETAILED LOGGING ---
-                        duration = time.time() - batch_start
-                        processed_count += len(batch_items)
-                        speed = duration / len(batch_items)
-                        
-                        timestamp = datetime.now().strftime("%H:%M:%S")
-                        if self.device == "cuda":
-                            # CHANGED TO MEMORY_RESERVED to match Task Manager
-                            reserved = torch.cuda.memory_reserved() / 1024**3
-                            self.log(f"[{timestamp}] Done {processed_count}/{len(chunks)} | {speed:.2f}s/chunk | VRAM: {reserved:.1f}GB")
-                        else:
-                            self.log(f"[{timestamp}] Done {processed_count}/{len(chunks)} | {speed:.2f}s/chunk")
-                            
-                    except Exception as e:
-                        self.log(f"Batch error: {e}")
-                        gc.collect()
-                        continue
-
-            audio_segments = []
-            for i in range(len(chunks)):
-                if i in results_cache: audio_segments.append(results_cache[i])
+            state = {"label": label, "chunks": [], "results": journal.chapter_chunks(chapter_idx), "pending": 0,
+                     "out_path": None, "complete": False}
+            chapter_state.append(state)
+
+            if journal.chapter_done(chapter_idx):
+                entry = journal.chapter_entry(chapter_idx)
+                state.update(out_path=entry["path"], label=entry["title"], complete=True)
+                self.log(f"Skipping (already rendered): {label}")
+                continue
 
-            if audio_segments:
-                # --- NEW STITCHING LOGIC WITH 250ms BREATH GAP & MICRO-FADES (MANIFEST MODE) ---
-                silence_gap = AudioSegment.silent(duration=250) # 250ms gap
-                
-                # Process first chunk
-                final = audio_segments[0].fade_in(50).fade_out(50)
-                
-                # Process subsequent chunks
-                for s in audio_segments[1:]: 
-                    processed_seg = s.fade_in(50).fade_out(50)
-                    final += silence_gap + processed_seg
-                
+            style = chapter.get("style_prompt", "")
+            chapter_voice = chapter.get("voice") or NARRATOR_VOICE
+            spans = chapter.get("spans") or [{"text": chapter.get("text", ""), "voice": chapter_voice}]
+            chunks, chunk_voices = [], []
+            for span in spans:
+                span_voice = span.get("voice") or chapter_voice
+                for c in self._chunk_text(span.get("text", ""), max_chars=use_chunk_size):
+                    chunks.append(c)
+                    chunk_voices.append(span_voice)
+            state["chunks"] = chunks
+            for i, c in enumerate(chunks):
+                if not c.strip(): continue
+                if i not in state["results"]:
+                    items.append((chapter_idx, i, f"{style}\n\n{c}" if style else c, chunk_voices[i]))
+                    state["pending"] += 1
+
+        total_chunks = sum(len(s["results"]) + s["pending"] for s in chapter_state)
+        processed_count = sum(len(s["results"]) for s in chapter_state)
+        self.metrics.set_totals(total_chunks, processed_count)
+        self._begin_eta(sum(len(x[2]) for x in items), use_chunk_size)
+        self.log(f"Starting render of {len(items)} chunks across {len(chapters_data)} chapters ({self.schedule_mode} order).")
+
+        def finish_chapter(chapter_idx):
+            """Stitch a chapter whose chunks are all done (or failed) and publish its WAV."""
+            state = chapter_state[chapter_idx]
+            chapter = chapters_data[chapter_idx]
+            label = state["label"]
+            chunks = state["chunks"]
+            results_cache = state["results"]
+            ready = [i for i in range(len(chunks)) if i in results_cache]
+
+            if ready:
                 # --- FIX: Sanitize Filename to remove illegal chars (: ? " < > | *) ---
                 safe_label = "".join(c for c in label if c.isalnum() or c in ' -_').strip()
                 fname = f"{chapter.get('id', chapter_idx+1):02d}_{safe_label}".replace(" ", "_") + ".wav"
                 out_path = os.path.join(book_output_dir, fname)
-                final.export(out_path, format="wav")
-                chapter_audio_files.append(out_path)
-                chapters_info.append({'title': label})
-                
-                if progress_callback: progress_callback((chapter_idx+1)/len(chapters_data))
+                self._write_stitched((results_cache.get(i) for i in ready), results_cache.sample_rate, out_path, "wav")
+                state["out_path"] = out_path
+                self.log(f"Chapter ready: {out_path}")
+
+                # Chapters with failed chunks keep their chunks so a rerun can fill the gaps
+                if all(i in results_cache for i, c in enumerate(chunks) if c.strip()):
+                    journal.record_chapter(chapter_idx, out_path, label)
+                    journal.release_chapter_chunks(chapter_idx)
+                    journal.save()
+                    state["complete"] = True
+            else:
+                state["complete"] = not any(c.strip() for c in chunks)
             
-            # --- FIX: HARD MEMORY RESET BETWEEN CHAPTERS ---
-            self.log(f"Chapter {chapter_idx+1} complete. Performing hard memory reset...")
-            del results_cache
-            del audio_segments
-            gc.collect()
-            if self.device == "cuda":
-                torch.cuda.empty_cache()
-                torch.cuda.synchronize()
+            # Chunk audio stays in the spool (on disk); deeper cleanup only under memory pressure
+            self.log(f"Chapter {chapter_idx+1} complete.")
+            self.memory_policy.maybe_cleanup(f"chapter {chapter_idx+1}")
+
+        # Chapters that need no generation (fully journaled chunks) can be stitched now
+        for chapter_idx, state in enumerate(chapter_state):
+            if state["out_path"] is None and state["pending"] == 0:
+                finish_chapter(chapter_idx)
+
+        for batch_items, wavs_cpu, sr, seconds in self._iter_rendered_batches(
+                items, voices, stop_event=stop_event, max_new_tokens=MAX_TOKENS):
+            with self.tracer.span("write_chunks", chunks=len(batch_items)):
+                for wav, (chapter_idx, idx, _, _) in zip(wavs_cpu, batch_items):
+                    chapter_state[chapter_idx]["results"].add(idx, wav, sr)
+                    chapter_state[chapter_idx]["pending"] -= 1
+            with self.tracer.span("journal_save"):
+                journal.save()
+
+            # --- DETAILED LOGGING ---
+            processed_count += len(batch_items)
+            self._log_batch_done(processed_count, total_chunks, seconds, len(batch_items))
+            if progress_callback:
+                progress_callback(processed_count / total_chunks)
+
+            for chapter_idx in sorted({x[0] for x in batch_items}):
+                if chapter_state[chapter_idx]["pending"] == 0:
+                    finish_chapter(chapter_idx)
+
+        self.log(self.memory_policy.summary())
+        if stop_event and stop_event.is_set():
+            self.log(f"Render stopped by user. Progress saved (job {journal.job_id}).")
+            return None
+
+        # Chapters whose last batches failed never reached pending == 0
+        for chapter_idx, state in enumerate(chapter_state):
+            if state["out_path"] is None and state["results"]:
+                finish_chapter(chapter_idx)
+
+        chapter_audio_files = [s["out_path"] for s in chapter_state if s["out_path"]]
+        chapters_info = [{'title': s["label"]} for s in chapter_state if s["out_path"]]
 
         if chapter_audio_files:
             # FIX: Filename now includes Author
@@ -847,6 +2556,11 @@ class AudioEngine:
             m4b_path = os.path.join(book_output_dir, filename)
             
             self._create_m4b_with_chapters(chapter_audio_files, chapters_info, m4b_path, book_title=book_title, artist=author)
+
+            # Finalize only after the M4B exists: until now a crash can resume from the journal
+            if not all(s["complete"] for s in chapter_state):
+                self.log(f"Some chunks failed; keeping job {journal.job_id} so a rerun can fill the gaps.")
+                return m4b_path
             
             # --- AGGRESSIVE CLEANUP: Wipes ALL .wav files in output folder ---
             self.log("Cleaning up intermediate chapter files...")
@@ -857,6 +2571,7 @@ class AudioEngine:
                         if os.path.isfile(full_path):
                             os.unlink(full_path)
                     except: pass
+            journal.finalize()
                 
             return m4b_path
         else:
@@ -866,6 +2581,7 @@ class AudioEngine:
         try:
             for f in os.listdir(self.temp_dir):
                 fp = os.path.join(self.temp_dir, f)
+                if fp == self.jobs_dir: continue  # keep resumable jobs
                 if os.path.isfile(fp): os.unlink(fp)
                 elif os.path.isdir(fp): shutil.rmtree(fp)
         except: pass
@@ -876,6 +2592,7 @@ class AudioEngine:
     # --- RESTORED HELPER FUNCTION 1 ---
     def _chunk_text(self, text, max_chars=None):
         if max_chars is None: max_chars = self.chunk_size
+        chunk_start = time.perf_counter()
         sentences = re.split(r'(?<=[.?!])\s+', text)
         chunks = []
         curr = ""
@@ -891,6 +2608,7 @@ class AudioEngine:
             elif len(curr) + len(s) < max_chars: curr += s + " "
             else: chunks.append(curr.strip()); curr = s + " "
         if curr: chunks.append(curr.strip())
+        self.tracer.record("chunking", chunk_start, chars=len(text), chunks=len(chunks))
         return chunks
 
     # --- RESTORED HELPER FUNCTION 2 ---
@@ -905,10 +2623,12 @@ class AudioEngine:
 
             updated_chapters_info = []
             cumulative_ms = 0
-            for i, (f, c) in enumerate(zip(chapter_audio_files, chapters_info)):
-                dur = len(AudioSegment.from_wav(f))
-                updated_chapters_info.append({'title': c['title'], 'start_ms': cumulative_ms, 'end_ms': cumulative_ms + dur})
-                cumulative_ms += dur
+            with self.tracer.span("chapter_durations", chapters=len(chapter_audio_files)):
+                for i, (f, c) in enumerate(zip(chapter_audio_files, chapters_info)):
+                    info = sf.info(f)  # header only; chapters are never decoded here
+                    dur = int(info.frames * 1000 / info.samplerate)
+                    updated_chapters_info.append({'title': c['title'], 'start_ms': cumulative_ms, 'end_ms': cumulative_ms + dur})
+                    cumulative_ms += dur
 
             metadata_file = os.path.join(self.temp_dir, "ffmetadata.txt")
             with open(metadata_file, 'w', encoding='utf-8') as f:
@@ -919,7 +2639,8 @@ class AudioEngine:
                    '-map_metadata', '1', '-map', '0:a', '-c:a', 'aac', '-b:a', '64k', '-y', output_path]
             
             # --- UPDATED: Added logging for FFMPEG errors ---
-            process = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8')
+            with self.tracer.span("ffmpeg_mux", chapters=len(chapter_audio_files)):
+                process = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8')
             if process.returncode != 0:
                 self.log(f"FFMPEG Error Output:\n{process.stderr}")
                 raise RuntimeError("FFMPEG failed to stitch audiobook")
@@ -0,0 +1,394 @@
+"""
+Render benchmark for Vox-1.
+
+Drives AudioEngine.render_book (TXT -> MP3) and render_from_manifest_dict
+(manifest -> M4B) end to end with a deterministic stand-in for Qwen3TTSModel,
+so the pipeline around the model (batching, journal, stitching, encoding,
+memory) can be measured on a CPU-only machine and compared against a baseline.
+
+Usage:
+    python benchmark.py                          # small + medium, both paths
+    python benchmark.py --sizes small medium huge --output results.json
+    python benchmark.py --baseline results.json  # compare against an earlier run
+    python benchmark.py --stitch-check           # engine stitch vs the legacy pydub stitch
+
+Requires the normal runtime dependencies (torch CPU build is fine) and ffmpeg.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import soundfile as sf
+
+from backend import AudioEngine, PreviewCache, RenderHistory, _process_rss_bytes
+
+SAMPLE_RATE = 24000
+# Spoken chars per second of generated audio (~ 180 words/min)
+AUDIO_CHARS_PER_SEC = 15.0
+
+# Synthetic book sizes: (chapters, paragraphs per chapter)
+BOOK_SIZES = {
+    "small": (3, 6),      # ~9k chars, ~10 min audio
+    "medium": (12, 20),   # ~120k chars, ~2 h audio
+    "huge": (40, 40),     # ~800k chars, ~15 h audio
+}
+
+_WORDS = ("the quiet harbor lay under a grey sky while gulls circled the masts and "
+          "an old keeper counted lanterns along the pier before the storm arrived "
+          "nobody spoke of the ship that left at dawn or the letter she carried").split()
+
+
+class FakeQwen3TTSModel:
+    """
+    Deterministic stand-in for Qwen3TTSModel.
+
+    Audio length is proportional to the text length and the waveform is seeded
+    from the text, so every run produces identical output. Generation time is
+    simulated: a fixed per-batch overhead plus time proportional to the longest
+    text in the batch (padding means the longest sequence sets the pace).
+
+    For auto-tune sweeps, `parallel_width` caps how many sequences run truly in
+    parallel (bigger batches pay for extra passes), and `memory_limit_chars`
+    raises a simulated out-of-memory error once batch size x longest text
+    exceeds it.
+    """
+
+    def __init__(self, chars_per_sec=5000.0, batch_overhead=0.02, sample_rate=SAMPLE_RATE,
+                 parallel_width=None, memory_limit_chars=None):
+        self.chars_per_sec = chars_per_sec
+        self.batch_overhead = batch_overhead
+        self.sample_rate = sample_rate
+        self.parallel_width = parallel_width
+        self.memory_limit_chars = memory_limit_chars
+        self.calls = 0
+
+    def _synthesize(self, text):
+        seed = int(hashlib.md5(text.encode('utf-8')).hexdigest()[:8], 16)
+        n = max(1, int(len(text) / AUDIO_CHARS_PER_SEC * self.sample_rate))
+        t = np.arange(n, dtype=np.float32) / self.sample_rate
+        freq = 110.0 + seed % 220
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 3.0 * t + (seed % 7))
+        return (0.3 * envelope * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+    def _simulate(self, texts):
+        self.calls += 1
+        longest = max((len(t) for t in texts), default=0)
+        if self.memory_limit_chars and len(texts) * longest > self.memory_limit_chars:
+            raise RuntimeError("CUDA out of memory (simulated)")
+        passes = -(-len(texts) // self.parallel_width) if self.parallel_width else 1
+        delay = self.batch_overhead + passes * (longest / self.chars_per_sec if self.chars_per_sec else 0)
+        if delay > 0: time.sleep(delay)
+
+    def create_voice_clone_prompt(self, ref_audio, ref_text):
+        return {"ref_audio": ref_audio, "ref_text": ref_text}
+
+    def generate_voice_clone(self, text, language="English", ref_audio=None, ref_text=None,
+                             voice_clone_prompt=None, max_new_tokens=2048, **kwargs):
+        texts = [text] if isinstance(text, str) else list(text)
+        self._simulate(texts)
+        return [self._synthesize(t) for t in texts], self.sample_rate
+
+    def generate_voice_design(self, text, language="English", instruct="", max_new_tokens=2048, **kwargs):
+        texts = [text] if isinstance(text, str) else list(text)
+        instructs = [instruct] * len(texts) if isinstance(instruct, str) else list(instruct)
+        self._simulate(texts)
+        return [self._synthesize(i + t) for i, t in zip(instructs, texts)], self.sample_rate
+
+
+class BenchmarkEngine(AudioEngine):
+    """AudioEngine wired to FakeQwen3TTSModel, with stage timers around stitch/encode."""
+
+    def __init__(self, work_dir, fake_model, **kwargs):
+        self.fake_model = fake_model
+        self.timings = {}
+        super().__init__(**kwargs)
+        # Keep benchmark output and journals out of the real app folders
+        self.temp_dir = os.path.join(work_dir, "temp_work")
+        self.output_dir = os.path.join(work_dir, "Output")
+        self.jobs_dir = os.path.join(self.temp_dir, "jobs")
+        self.history = RenderHistory(os.path.join(work_dir, "render_history.db"))
+        self.autotune_path = os.path.join(work_dir, "autotune.json")
+        self.preview_cache = PreviewCache(os.path.join(work_dir, "preview_cache"), log=self.log)
+        for d in (self.temp_dir, self.output_dir, self.jobs_dir):
+            os.makedirs(d, exist_ok=True)
+
+    def _add_time(self, stage, seconds):
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    def _ensure_model(self, model_type):
+        self.active_model = self.fake_model
+        self.active_model_type = model_type
+
+    def _transcribe_audio(self, audio_path, word_timestamps=False):
+        text = "This is the reference recording."
+        if not word_timestamps: return text
+        # Evenly spaced fake word timings across the reference
+        duration = sf.info(audio_path).duration
+        tokens = text.split()
+        step = duration / len(tokens)
+        return text, [(i * step, (i + 0.8) * step, " " + w) for i, w in enumerate(tokens)]
+
+    def _stitched_pieces(self, chunks, sample_rate):
+        # Time only the stitching work, not the encoder consuming each piece
+        pieces = super()._stitched_pieces(chunks, sample_rate)
+        while True:
+            start = time.perf_counter()
+            try: piece = next(pieces)
+            except StopIteration: return
+            finally: self._add_time("stitch", time.perf_counter() - start)
+            yield piece
+
+    def _write_stitched(self, chunks, sample_rate, out_path, fmt):
+        start = time.perf_counter()
+        stitch_before = self.timings.get("stitch", 0.0)
+        try: return super()._write_stitched(chunks, sample_rate, out_path, fmt)
+        finally:
+            stitched = self.timings.get("stitch", 0.0) - stitch_before
+            self._add_time("encode", time.perf_counter() - start - stitched)
+
+    def _create_m4b_with_chapters(self, *args, **kwargs):
+        start = time.perf_counter()
+        try: return super()._create_m4b_with_chapters(*args, **kwargs)
+        finally: self._add_time("mux", time.perf_counter() - start)
+
+
+class PeakRSSSampler:
+    """Samples process RSS in a background thread (ru_maxrss can't be reset per case)."""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, _process_rss_bytes() or 0)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _process_rss_bytes() or 0)
+
+
+def make_synthetic_book(size):
+    """Deterministic manifest for a named size (see BOOK_SIZES)."""
+    n_chapters, n_paragraphs = BOOK_SIZES[size]
+    chapters = []
+    for c in range(n_chapters):
+        paragraphs = []
+        for p in range(n_paragraphs):
+            sentences = []
+            for s in range(6):
+                k = (c * 131 + p * 17 + s * 7) % len(_WORDS)
+                length = 8 + (c + p + s) % 14
+                words = [_WORDS[(k + i) % len(_WORDS)] for i in range(length)]
+                sentences.append(" ".join(words).capitalize() + ".")
+            paragraphs.append(" ".join(sentences))
+        chapters.append({"id": c + 1, "label": f"Chapter {c + 1}", "style_prompt": "",
+                         "text": "\n\n".join(paragraphs)})
+    return {"title": f"Benchmark {size.title()}", "author": "Vox Bench", "chapters": chapters}
+
+
+def _write_reference_voice(path):
+    t = np.arange(3 * SAMPLE_RATE, dtype=np.float32) / SAMPLE_RATE
+    sf.write(path, (0.2 * np.sin(2 * np.pi * 180 * t)).astype(np.float32), SAMPLE_RATE)
+
+
+def run_case(size, mode, args):
+    """Render one synthetic book through one path and return its metrics."""
+    work_dir = tempfile.mkdtemp(prefix=f"vox_bench_{size}_{mode}_")
+    logs = []
+    log = print if args.verbose else logs.append
+    try:
+        fake = FakeQwen3TTSModel(chars_per_sec=args.chars_per_sec, batch_overhead=args.batch_overhead)
+        engine = BenchmarkEngine(work_dir, fake, log_callback=log, batch_size=args.batch_size,
+                                 chunk_size=args.chunk_size, schedule_mode=args.schedule_mode)
+        voice_path = os.path.join(work_dir, "voice.wav")
+        _write_reference_voice(voice_path)
+        manifest = make_synthetic_book(size)
+        total_chars = sum(len(ch["text"]) for ch in manifest["chapters"])
+
+        with PeakRSSSampler() as rss:
+            start = time.perf_counter()
+            if mode == "txt":
+                txt_path = os.path.join(work_dir, f"bench_{size}.txt")
+                with open(txt_path, 'w', encoding='utf-8') as f:
+                    f.write("\n\n".join(ch["text"] for ch in manifest["chapters"]))
+                out_path = engine.render_book(txt_path, voice_path)
+                chunks = len(engine._chunk_text(open(txt_path, encoding='utf-8').read()))
+            else:
+                out_path = engine.render_from_manifest_dict(manifest, voice_path)
+                chunks = sum(len(engine._chunk_text(ch["text"])) for ch in manifest["chapters"])
+            wall = time.perf_counter() - start
+
+        audio_seconds = total_chars / AUDIO_CHARS_PER_SEC
+        return {
+            "size": size,
+            "path": mode,
+            "chars": total_chars,
+            "chunks": chunks,
+            "model_calls": fake.calls,
+            "wall_s": round(wall, 3),
+            "chunks_per_s": round(chunks / wall, 3),
+            "audio_s_per_wall_s": round(audio_seconds / wall, 2),
+            "stitch_s": round(engine.timings.get("stitch", 0.0), 3),
+            "encode_s": round(engine.timings.get("encode", 0.0) + engine.timings.get("mux", 0.0), 3),
+            "peak_rss_mb": round(rss.peak / 1024**2, 1),
+            "output_bytes": os.path.getsize(out_path) if out_path and os.path.exists(out_path) else 0,
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def run_autotune(args):
+    """Run AudioEngine.auto_tune against the stand-in model and print the sweep."""
+    work_dir = tempfile.mkdtemp(prefix="vox_bench_autotune_")
+    try:
+        fake = FakeQwen3TTSModel(chars_per_sec=args.chars_per_sec, batch_overhead=args.batch_overhead,
+                                 parallel_width=args.parallel_width, memory_limit_chars=args.memory_limit_chars)
+        engine = BenchmarkEngine(work_dir, fake, log_callback=print if args.verbose else (lambda m: None))
+        voice_path = os.path.join(work_dir, "voice.wav")
+        _write_reference_voice(voice_path)
+        result = engine.auto_tune(voice_path, probe_batches=1)
+        if not result:
+            print("Auto-tune found no working configuration.")
+            return None
+        print(f"{'chunk':>6} | {'batch':>5} | {'chars/s':>9} | result")
+        for e in result["grid"]:
+            status = e.get("error") or ("ok" if e["stable"] else "over watermark")
+            print(f"{e['chunk_size']:>6} | {e['batch_size']:>5} | {e.get('chars_per_sec', 0):>9} | {status}")
+        print(f"\nBest: batch {result['batch_size']}, chunk {result['chunk_size']} ({result['chars_per_sec']} chars/s)")
+        return result
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def legacy_stitch(chunks, sample_rate):
+    """The stitch before chunk spooling: pydub fade_in(50).fade_out(50) per chunk, silent(250) gaps."""
+    from pydub import AudioSegment
+    gap = AudioSegment.silent(duration=250)
+    segments = [AudioSegment(c.tobytes(), frame_rate=sample_rate, sample_width=2, channels=1).fade_in(50).fade_out(50)
+                for c in chunks]
+    final = segments[0]
+    for seg in segments[1:]:
+        final += gap + seg
+    return np.frombuffer(final.raw_data, dtype=np.int16)
+
+
+def run_stitch_check(args):
+    """Stitch the same chunks with AudioEngine and the legacy pydub loop; compare samples and time."""
+    work_dir = tempfile.mkdtemp(prefix="vox_bench_stitch_")
+    try:
+        engine = BenchmarkEngine(work_dir, FakeQwen3TTSModel(), log_callback=lambda m: None)
+        rng = np.random.default_rng(0)
+        chunks = [rng.integers(-20000, 20000, int(rng.integers(1, 8) * SAMPLE_RATE + rng.integers(0, 999)), dtype=np.int16)
+                  for _ in range(args.stitch_chunks)]
+
+        start = time.perf_counter()
+        old = legacy_stitch(chunks, SAMPLE_RATE)
+        legacy_s = time.perf_counter() - start
+        start = time.perf_counter()
+        pieces = list(engine._stitched_pieces(chunks, SAMPLE_RATE))
+        engine_s = time.perf_counter() - start
+
+        new_chunks, gaps = pieces[::2], pieces[1::2]
+        old_gap = (len(old) - sum(len(c) for c in new_chunks)) // max(1, len(gaps))
+        same, pos = 0, 0
+        for c in new_chunks:
+            same += np.array_equal(old[pos:pos + len(c)], c)
+            pos += len(c) + old_gap
+        print(f"Chunks with identical faded samples: {same}/{len(chunks)}")
+        print(f"Breath gap: legacy {old_gap} frames, engine {len(gaps[0]) if gaps else 0} frames")
+        print(f"Stitch time: legacy {legacy_s:.3f}s, engine {engine_s:.3f}s")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def print_table(results, baseline=None):
+    cols = ["size", "path", "chunks", "wall_s", "chunks_per_s", "stitch_s", "encode_s", "peak_rss_mb"]
+    print(" | ".join(f"{c:>12}" for c in cols))
+    print("-" * (15 * len(cols)))
+    base = {(r["size"], r["path"]): r for r in (baseline or [])}
+    for r in results:
+        print(" | ".join(f"{r[c]!s:>12}" for c in cols))
+        ref = base.get((r["size"], r["path"]))
+        if ref:
+            deltas = []
+            for c in ("wall_s", "chunks_per_s", "stitch_s", "encode_s", "peak_rss_mb"):
+                if ref.get(c):
+                    deltas.append(f"{c} {100.0 * (r[c] - ref[c]) / ref[c]:+.1f}%")
+            print(f"{'':>12}   vs baseline: " + ", ".join(deltas))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Vox-1 render pipeline with a stand-in TTS model.")
+    parser.add_argument("--sizes", nargs="+", choices=list(BOOK_SIZES), default=["small", "medium"])
+    parser.add_argument("--paths", nargs="+", choices=["txt", "manifest"], default=["txt", "manifest"])
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--schedule-mode", choices=["length", "chapter"], default="length")
+    parser.add_argument("--chars-per-sec", type=float, default=5000.0,
+                        help="Simulated model speed (chars of the longest item per second); 0 = instant")
+    parser.add_argument("--batch-overhead", type=float, default=0.02, help="Simulated fixed cost per batch (s)")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--baseline", help="Compare against a results JSON from an earlier run")
+    parser.add_argument("--verbose", action="store_true", help="Show engine log output")
+    parser.add_argument("--autotune", action="store_true", help="Run the batch/chunk auto-tune sweep instead")
+    parser.add_argument("--parallel-width", type=int, default=None,
+                        help="Stand-in model: sequences processed truly in parallel (auto-tune saturation)")
+    parser.add_argument("--memory-limit-chars", type=int, default=None,
+                        help="Stand-in model: simulated OOM above batch size x longest text")
+    parser.add_argument("--stitch-check", action="store_true",
+                        help="Compare the engine's stitch against the legacy pydub stitch instead")
+    parser.add_argument("--stitch-chunks", type=int, default=120, help="Chunks for --stitch-check")
+    args = parser.parse_args(argv)
+
+    if args.autotune:
+        run_autotune(args)
+        return
+    if args.stitch_check:
+        run_stitch_check(args)
+        return
+
+    results = []
+    for size in args.sizes:
+        for mode in args.paths:
+            print(f"Running {size}/{mode}...", flush=True)
+            results.append(run_case(size, mode, args))
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)["results"]
+    print()
+    print_table(results, baseline)
+
+    if args.output:
+        report = {
+            "created": datetime.now().isoformat(timespec='seconds'),
+            "python": sys.version.split()[0],
+            "config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline", "verbose")},
+            "results": results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,519 @@
+"""
+Ingestion benchmark for BookSmith.
+
+Times TextCleaner stage by stage on a synthetic "dirty" book (PDF/EPUB
+artifacts: page numbers, running headers, ligatures, tables, HTML entities,
+invisible characters, ragged whitespace, prompt-like annotations) and checks
+each stage's output against the previous implementation, kept below as
+LegacyTextCleaner.
+
+With --epub, builds a synthetic illustrated EPUB from the same text and times
+EPUBProcessor.process serially and with its worker pool against the old
+ebooklib + html.parser path (chapters must match). --pdf does the same for
+a synthetic bookmarked PDF against the old page-by-page extraction.
+
+Pools use the spawn start method by default, as on Windows: every worker is
+a fresh interpreter that imports the main module and booksmith_module.
+Measured on a single-core Linux box (so the pool numbers are overhead only;
+there is no real parallelism, and in the app _worker_count keeps such a
+machine serial):
+
+    spawn start-up                               ~0.5 s per worker
+    serial EPUB parse + clean                    ~0.57 s per MB of XHTML
+    serial bookmarked-PDF extract + clean        ~1.9 ms per page
+    120 chapters x 50k chars: serial 4.33 s, pool (--workers 2) 5.20 s
+    --pdf, 1,260 pages:       serial 3.64 s, pool (--workers 2) 5.45 s
+
+On a multi-core machine the workers start side by side, so a pool of w
+workers costs ~0.5 s + serial / w. With 4 cores (3 workers) it breaks even
+at ~0.75 s of serial work: ~1.3 MB of XHTML or ~390 PDF pages. That is a
+projection, not a measurement, and it sets EPUB_PARALLEL_MIN_BYTES (1.5 MB)
+and PDF_PARALLEL_MIN_PAGES (400). Confirm on the target machine with
+--workers N before changing either.
+
+Usage:
+    python benchmark_ingest.py                    # 40 chapters x 20k chars
+    python benchmark_ingest.py --chapters 200 --chapter-chars 50000 --repeat 3
+    python benchmark_ingest.py --epub --chapters 120
+    python benchmark_ingest.py --pdf --chapters 60 --chapter-chars 50000
+    python benchmark_ingest.py --epub --workers 2 --start-method spawn
+
+Needs the BookSmith dependencies (ftfy, ebooklib, bs4, pymupdf); no torch / GPU.
+"""
+
+import argparse
+import html
+import multiprocessing
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import ftfy
+import unicodedata
+
+from booksmith_module import processors
+from booksmith_module.core import TextCleaner
+
+
+# Pre-optimization TextCleaner, verbatim: the reference for output equality
+class LegacyTextCleaner:
+    """
+    Aggressive text sanitization for LLM-based TTS models.
+
+    Qwen3-TTS/CosyVoice are sensitive to:
+    - Page numbers and headers (can trigger repetition loops)
+    - HTML entities and invisible characters (hallucination triggers)
+    - Ligatures and special unicode (breaks tokenization)
+    - Footnote markers and reference symbols (interpreted as prompts)
+    """
+
+    @staticmethod
+    def clean(text: str) -> str:
+        """Master cleaning pipeline."""
+        if not text:
+            return ""
+
+        # Stage 1: Fix encoding issues (mojibake, broken UTF-8)
+        text = ftfy.fix_text(text)
+
+        # Stage 2: Normalize unicode (NFC form for consistent rendering)
+        text = unicodedata.normalize('NFC', text)
+
+        # Stage 3: Remove common PDF/EPUB artifacts
+        text = LegacyTextCleaner._remove_page_numbers(text)
+        text = LegacyTextCleaner._remove_headers_footers(text)
+        text = LegacyTextCleaner._fix_ligatures(text)
+
+        # Stage 4: Remove tables (unreadable for TTS)
+        text = LegacyTextCleaner._remove_tables(text)
+
+        # Stage 5: Clean HTML entities and invisible characters
+        text = LegacyTextCleaner._remove_html_artifacts(text)
+        text = LegacyTextCleaner._remove_invisible_chars(text)
+
+        # Stage 6: Normalize whitespace (critical for TTS chunking)
+        text = LegacyTextCleaner._normalize_whitespace(text)
+
+        # Stage 7: Remove potential prompt injections
+        text = LegacyTextCleaner._remove_control_sequences(text)
+
+        return text.strip()
+
+    @staticmethod
+    def _remove_page_numbers(text: str) -> str:
+        """Remove common page number patterns."""
+        patterns = [
+            r'^\s*Page\s+\d+\s*$',           # "Page 12"
+            r'^\s*-\s*\d+\s*-\s*$',          # "- 12 -"
+            r'^\s*\d+\s*$',                  # Standalone numbers on lines
+            r'\[\s*\d+\s*\]',                # "[12]"
+            r'^\s*\d+\s*\|',                 # "12 |"
+        ]
+        for pattern in patterns:
+            text = re.sub(pattern, '', text, flags=re.MULTILINE)
+        return text
+
+    @staticmethod
+    def _remove_headers_footers(text: str) -> str:
+        """Remove repeated header/footer content."""
+        # Remove lines that are all caps (often headers)
+        text = re.sub(r'^[A-Z\s]{20,}$', '', text, flags=re.MULTILINE)
+
+        # Remove copyright notices
+        text = re.sub(r'©.*?All rights reserved\.?', '', text, flags=re.IGNORECASE)
+
+        return text
+
+    @staticmethod
+    def _fix_ligatures(text: str) -> str:
+        """
+        Replace typographic ligatures with normal characters.
+        Critical: TTS models may not handle these properly.
+        """
+        ligature_map = {
+            'ﬁ': 'fi',
+            'ﬂ': 'fl',
+            'ﬀ': 'ff',
+            'ﬃ': 'ffi',
+            'ﬄ': 'ffl',
+            'ﬆ': 'st',
+            'Ꜳ': 'AA',
+            'ꜳ': 'aa',
+        }
+        for ligature, replacement in ligature_map.items():
+            text = text.replace(ligature, replacement)
+        return text
+
+    @staticmethod
+    def _remove_tables(text: str) -> str:
+        """Remove markdown tables and table-like content."""
+        # Remove markdown tables (with header separators)
+        table_pattern = r'\|[^\n]*\|\s*\n\s*\|[-:|\s]+\|[\s\S]*?(?=\n\n|\n[^|]|\Z)'
+        text = re.sub(table_pattern, '\n', text, flags=re.MULTILINE)
+
+        # Remove standalone table rows
+        text = re.sub(r'^\s*\|[^\n]+\|\s*$', '', text, flags=re.MULTILINE)
+
+        # Remove table caption patterns
+        text = re.sub(r'^Table\s+\d+\.?\d*[:\s]+.*$', '', text, flags=re.MULTILINE | re.IGNORECASE)
+
+        return text
+
+    @staticmethod
+    def _remove_html_artifacts(text: str) -> str:
+        """Clean HTML entities and tags."""
+        # Decode HTML entities
+        import html
+        text = html.unescape(text)
+
+        # Remove any remaining HTML tags
+        text = re.sub(r'<[^>]+>', '', text)
+
+        # Remove common EPUB metadata artifacts
+        text = re.sub(r'\{[^}]*calibre[^}]*\}', '', text, flags=re.IGNORECASE)
+
+        return text
+
+    @staticmethod
+    def _remove_invisible_chars(text: str) -> str:
+        """Remove zero-width and non-printable characters."""
+        invisible_chars = [
+            '\u200B',  # Zero-width space
+            '\u200C',  # Zero-width non-joiner
+            '\u200D',  # Zero-width joiner
+            '\uFEFF',  # Zero-width no-break space (BOM)
+            '\u00AD',  # Soft hyphen
+        ]
+        for char in invisible_chars:
+            text = text.replace(char, '')
+
+        # Remove other control characters except newlines/tabs
+        text = re.sub(r'[\x00-\x08\x0B-\x0C\x0E-\x1F\x7F]', '', text)
+
+        return text
+
+    @staticmethod
+    def _normalize_whitespace(text: str) -> str:
+        """Normalize whitespace for consistent TTS chunking."""
+        # Replace multiple spaces with single space
+        text = re.sub(r' {2,}', ' ', text)
+
+        # Replace multiple newlines with double newline (paragraph breaks)
+        text = re.sub(r'\n{3,}', '\n\n', text)
+
+        # Remove trailing whitespace from lines
+        text = '\n'.join(line.rstrip() for line in text.split('\n'))
+
+        return text
+
+    @staticmethod
+    def _remove_control_sequences(text: str) -> str:
+        """Remove patterns that might be interpreted as system prompts."""
+        # Remove markdown-style annotations
+        text = re.sub(r'\[NOTE:.*?\]', '', text, flags=re.IGNORECASE)
+        text = re.sub(r'\[INSTRUCTION:.*?\]', '', text, flags=re.IGNORECASE)
+
+        # Remove excessive punctuation (!!!!, ????)
+        text = re.sub(r'([!?.])\1{3,}', r'\1', text)
+
+        return text
+
+
+# Building blocks for the synthetic corpus; every TextCleaner rule gets hit
+_SNIPPETS = [
+    "The ﬁrst ﬂight left at dawn, and the oﬃce was already ﬀull of people.",
+    "She said it was “ﬁne” — but it wasn't.",
+    "\n\nPage 12\n\n",
+    "\n- 13 -\n",
+    "\n14\n",
+    "As shown before [3], the results hold [ 12 ].",
+    "\n15 | Chapter heading\n",
+    "\nTHE LONG RUNNING HEADER OF THIS BOOK\n",
+    "© 2021 Some Publisher. All rights reserved.",
+    "\n| Name | Value |\n|------|-------|\n| a | 1 |\n| b | 2 |\n\n",
+    "\n| stray | row |\n",
+    "\nTable 2.1: Results by region\n",
+    "Fish &amp; chips &mdash; &quot;classic&quot; &#8203;zero&#173;width&#64257;.",
+    "<p>Some <em>tagged</em> text</p>",
+    "{calibre_span: x} leftover",
+    "zero\u200bwidth\u200c and\u200d BOM\ufeff soft\u00adhyphen ctrl\x07chars\x1f here\x7f.",
+    "Mojibake: cafÃ© and donâ€™t.",
+    "Too    many     spaces\t \u00a0\n\n\n\n\nand blank lines   \n",
+    "[NOTE: ignore this] Real text. [instruction: speak loudly] More text.",
+    "What?!!!! Really???? Yes.....",
+    "Plain narrative sentence with nothing special in it at all.",
+    "Another ordinary line of prose, long enough to look like a paragraph of a novel.\n",
+]
+
+
+def make_dirty_chapter(rng, chars):
+    """Random mix of clean prose and artifacts, about chars long."""
+    parts, total = [], 0
+    while total < chars:
+        piece = rng.choice(_SNIPPETS) if rng.random() < 0.5 else _SNIPPETS[-2 + rng.randrange(2)]
+        parts.append(piece + (" " if rng.random() < 0.7 else "\n"))
+        total += len(piece) + 1
+    return "".join(parts)
+
+
+def run_cleaner(args):
+    rng = random.Random(args.seed)
+    chapters = [make_dirty_chapter(rng, args.chapter_chars) for _ in range(args.chapters)]
+    total_chars = sum(map(len, chapters))
+    print(f"Corpus: {len(chapters)} chapters, {total_chars / 1e6:.1f}M chars")
+
+    # Stage by stage: both implementations get the same input, the old output feeds the next stage
+    legacy_stages = [
+        ("fix_encoding", ftfy.fix_text),
+        ("normalize_unicode", lambda t: unicodedata.normalize('NFC', t)),
+        ("page_numbers", LegacyTextCleaner._remove_page_numbers),
+        ("headers_footers", LegacyTextCleaner._remove_headers_footers),
+        ("ligatures", LegacyTextCleaner._fix_ligatures),
+        ("tables", LegacyTextCleaner._remove_tables),
+        ("html", LegacyTextCleaner._remove_html_artifacts),
+        ("invisible_chars", LegacyTextCleaner._remove_invisible_chars),
+        ("whitespace", LegacyTextCleaner._normalize_whitespace),
+        ("control_sequences", LegacyTextCleaner._remove_control_sequences),
+    ]
+    new_stages = dict(TextCleaner.STAGES)
+    rows, mismatches = [], 0
+    texts = chapters
+    for name, legacy_fn in legacy_stages:
+        new_fn = new_stages[name]
+        old_s = new_s = 0.0
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            old_out = [legacy_fn(t) for t in texts]
+            old_s += time.perf_counter() - start
+            start = time.perf_counter()
+            new_out = [new_fn(t) for t in texts]
+            new_s += time.perf_counter() - start
+        same = old_out == new_out
+        mismatches += not same
+        rows.append((name, old_s / args.repeat, new_s / args.repeat, same))
+        texts = old_out
+
+    # End to end
+    start = time.perf_counter()
+    old_full = [LegacyTextCleaner.clean(t) for t in chapters]
+    old_total = time.perf_counter() - start
+    timings = {}
+    start = time.perf_counter()
+    new_full = [TextCleaner.clean(t, timings=timings) for t in chapters]
+    new_total = time.perf_counter() - start
+    same_full = old_full == new_full
+    mismatches += not same_full
+
+    print(f"\n{'stage':>18} | {'old_ms':>9} | {'new_ms':>9} | {'speedup':>7} | equal")
+    print("-" * 58)
+    for name, old_t, new_t, same in rows + [("clean (total)", old_total, new_total, same_full)]:
+        speedup = old_t / new_t if new_t else float('inf')
+        print(f"{name:>18} | {old_t * 1000:9.1f} | {new_t * 1000:9.1f} | {speedup:6.1f}x | {'yes' if same else 'NO'}")
+    print(f"\nThroughput: {total_chars / new_total / 1e6:.1f}M chars/s (was {total_chars / old_total / 1e6:.1f}M)")
+    return mismatches
+
+
+def make_synthetic_epub(path, rng, chapters, chapter_chars, image_bytes=256 * 1024):
+    """Write an EPUB with one XHTML document and one incompressible image per chapter."""
+    from ebooklib import epub
+    book = epub.EpubBook()
+    book.set_identifier("vox-bench")
+    book.set_title("Synthetic Omnibus")
+    book.add_author("Benchmark")
+    spine = ["nav"]
+    for i in range(chapters):
+        body = "".join(f"<p>{html.escape(p)}</p>" for p in make_dirty_chapter(rng, chapter_chars).split("\n") if p)
+        doc = epub.EpubHtml(title=f"Chapter {i + 1}", file_name=f"chap_{i + 1:03d}.xhtml", lang="en")
+        doc.content = f"<html><body><h1>Chapter {i + 1}</h1><img src='img_{i}.jpg'/>{body}</body></html>"
+        book.add_item(doc)
+        book.add_item(epub.EpubItem(uid=f"img{i}", file_name=f"img_{i}.jpg", media_type="image/jpeg",
+                                    content=os.urandom(image_bytes)))
+        spine.append(doc)
+    book.toc = spine[1:]
+    book.add_item(epub.EpubNcx())
+    book.add_item(epub.EpubNav())
+    book.spine = spine
+    epub.write_epub(path, book)
+
+
+def legacy_epub_chapters(path):
+    """
+    The pre-zip-reader EPUB path: ebooklib loads every item, html.parser
+    parses each document. The EPUB 3 nav document is skipped here because
+    the spine reader no longer turns the table of contents into a chapter.
+    """
+    import ebooklib
+    from bs4 import BeautifulSoup
+    from ebooklib import epub
+    chapters = []
+    for item in epub.read_epub(path).get_items():
+        if item.get_type() != ebooklib.ITEM_DOCUMENT or isinstance(item, epub.EpubNav):
+            continue
+        soup = BeautifulSoup(item.get_content(), 'html.parser')
+        text = TextCleaner.clean(soup.get_text(separator='\n'))
+        if text and len(text.strip()) >= 100:
+            headings = [h.get_text().strip() for h in map(soup.find, ('h1', 'h2', 'h3')) if h]
+            label = next((h for h in headings if h), None) or \
+                os.path.splitext(os.path.basename(item.file_name))[0].replace('_', ' ').title()
+            chapters.append((len(chapters) + 1, label, text))
+    return chapters
+
+
+def _timed(fn, *fn_args):
+    start = time.perf_counter()
+    result = fn(*fn_args)
+    return time.perf_counter() - start, result
+
+
+def _peak_mb(fn, *fn_args):
+    tracemalloc.start()
+    try:
+        fn(*fn_args)
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def pool_startup(workers):
+    """Seconds to start `workers` pool processes, run a trivial job on each and shut down."""
+    start = time.perf_counter()
+    processors._pool_map(abs, list(range(workers)), workers)
+    return time.perf_counter() - start
+
+
+def run_epub(args):
+    work_dir = tempfile.mkdtemp(prefix="vox_ingest_")
+    try:
+        path = os.path.join(work_dir, "book.epub")
+        make_synthetic_epub(path, random.Random(args.seed), args.chapters, args.chapter_chars)
+        print(f"EPUB: {args.chapters} chapters, {os.path.getsize(path) / 1e6:.1f} MB on disk")
+
+        legacy_s, legacy = _timed(legacy_epub_chapters, path)
+        runs = {}
+        min_bytes = processors.EPUB_PARALLEL_MIN_BYTES
+        for label, threshold in (("serial", float("inf")), ("pool", 0)):
+            processors.EPUB_PARALLEL_MIN_BYTES = threshold
+            try:
+                runs[label] = _timed(processors.EPUBProcessor.process, path)
+                if label == "serial":
+                    serial_mb = _peak_mb(processors.EPUBProcessor.process, path)
+            finally:
+                processors.EPUB_PARALLEL_MIN_BYTES = min_bytes
+        legacy_mb = _peak_mb(legacy_epub_chapters, path)
+
+        serial_s, serial_book = runs["serial"]
+        pool_s, pool_book = runs["pool"]
+        serial = [(c.id, c.label, c.text) for c in serial_book.chapters]
+        same = serial == legacy == [(c.id, c.label, c.text) for c in pool_book.chapters]
+        print(f"legacy: {legacy_s:.2f}s, peak {legacy_mb:.0f} MB | "
+              f"serial: {serial_s:.2f}s ({legacy_s / serial_s:.1f}x), peak {serial_mb:.0f} MB | "
+              f"pool: {pool_s:.2f}s ({legacy_s / pool_s:.1f}x)")
+        print(f"{len(serial)} chapters | identical: {'yes' if same else 'NO'}")
+        return 0 if same else 1
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def make_synthetic_pdf(path, rng, chapters, chapter_chars, page_chars=2500):
+    """Write a bookmarked PDF: one level-1 outline entry per chapter, ~page_chars of text per page."""
+    import pymupdf
+    doc = pymupdf.open()
+    toc = []
+    for i in range(chapters):
+        text = f"Chapter {i + 1}\n" + make_dirty_chapter(rng, chapter_chars)
+        toc.append([1, f"Chapter {i + 1}", doc.page_count + 1])
+        for offset in range(0, len(text), page_chars):
+            page = doc.new_page()
+            page.insert_textbox(page.rect + (36, 36, -36, -36), text[offset:offset + page_chars], fontsize=6)
+    doc.set_toc(toc)
+    doc.save(path)
+    return doc.page_count
+
+
+def legacy_pdf_chapters(path):
+    """The pre-pool bookmark path: pages appended to one string, chapters cleaned one by one."""
+    import pymupdf
+    pdf_doc = pymupdf.open(path)
+    bookmarks = [item for item in pdf_doc.get_toc() if item[0] == 1]
+    chapters = []
+    for i, (level, title, page_num) in enumerate(bookmarks):
+        end_page = bookmarks[i + 1][2] - 2 if i + 1 < len(bookmarks) else pdf_doc.page_count - 1
+        chapter_text = ""
+        for page_idx in range(page_num - 1, end_page + 1):
+            if 0 <= page_idx < pdf_doc.page_count:
+                chapter_text += pdf_doc[page_idx].get_text()
+        chapter_text = TextCleaner.clean(chapter_text)
+        if len(chapter_text.strip()) >= 100:
+            chapters.append((len(chapters) + 1, title.strip(), chapter_text.strip()))
+    pdf_doc.close()
+    return chapters
+
+
+def run_pdf(args):
+    work_dir = tempfile.mkdtemp(prefix="vox_ingest_")
+    try:
+        path = os.path.join(work_dir, "book.pdf")
+        pages = make_synthetic_pdf(path, random.Random(args.seed), args.chapters, args.chapter_chars)
+        print(f"PDF: {args.chapters} bookmarked chapters, {pages} pages")
+
+        legacy_s, legacy = _timed(legacy_pdf_chapters, path)
+        runs = {}
+        min_pages = processors.PDF_PARALLEL_MIN_PAGES
+        for label, threshold in (("serial", float("inf")), ("pool", 0)):
+            processors.PDF_PARALLEL_MIN_PAGES = threshold
+            try:
+                runs[label] = _timed(processors.PDFProcessor._extract_chapters_from_bookmarks, path)
+            finally:
+                processors.PDF_PARALLEL_MIN_PAGES = min_pages
+
+        serial_s, serial = runs["serial"]
+        pool_s, pool = runs["pool"]
+        serial = [(c.id, c.label, c.text) for c in serial]
+        same = serial == legacy == [(c.id, c.label, c.text) for c in pool]
+        print(f"legacy: {legacy_s:.2f}s | serial: {serial_s:.2f}s ({legacy_s / serial_s:.1f}x) | "
+              f"pool: {pool_s:.2f}s ({legacy_s / pool_s:.1f}x)")
+        print(f"{len(serial)} chapters | identical: {'yes' if same else 'NO'}")
+        return 0 if same else 1
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark BookSmith ingestion stages.")
+    parser.add_argument("--chapters", type=int, default=40)
+    parser.add_argument("--chapter-chars", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per stage (times are averaged)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--epub", action="store_true", help="Benchmark EPUB ingestion instead of the cleaner")
+    parser.add_argument("--pdf", action="store_true", help="Benchmark bookmarked-PDF ingestion instead of the cleaner")
+    parser.add_argument("--start-method", default="spawn", choices=("spawn", "fork", "forkserver"),
+                        help="Pool start method (spawn is what Windows uses)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Force the pool size (default: the processors' own choice, 1 on a single core)")
+    args = parser.parse_args(argv)
+
+    multiprocessing.set_start_method(args.start_method, force=True)
+    if args.workers:
+        processors._worker_count = lambda jobs: max(1, min(jobs, args.workers))
+    workers = processors._worker_count(1 << 20)
+    if workers > 1 and (args.epub or args.pdf):
+        print(f"pool start-up ({args.start_method}, {workers} workers): {pool_startup(workers):.2f}s")
+
+    if args.pdf:
+        mismatches = run_pdf(args)
+    elif args.epub:
+        mismatches = run_epub(args)
+    else:
+        mismatches = run_cleaner(args)
+    if mismatches:
+        print(f"\n{mismatches} result(s) differ from the reference.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
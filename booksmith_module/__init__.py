@@ -6,6 +6,7 @@ Provides clean text extraction from EPUB/PDF files optimized for TTS models.
 """
 
 from .core import TextCleaner, BookData, Chapter
+from .cache import IngestCache
 from .processors import EPUBProcessor, PDFProcessor
 
 __all__ = [
@@ -13,7 +14,8 @@ __all__ = [
     'BookData',
     'Chapter',
     'EPUBProcessor',
-    'PDFProcessor'
+    'PDFProcessor',
+    'IngestCache'
 ]
 
 __version__ = '1.0.0'
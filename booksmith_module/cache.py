@@ -0,0 +1,132 @@
+"""
+On-disk cache of processed books, so reopening a file skips re-extraction.
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+import shutil
+import threading
+from typing import Optional
+
+from .core import BookData, Chapter
+
+INGEST_CACHE_ENTRIES = 24  # Source files kept; least recently used are evicted
+
+
+def _file_digest(path: str, block_size: int = 1 << 20) -> str:
+    """SHA1 of a file's contents."""
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _atomic_write(path: str, text: str):
+    """Write via temp file + os.replace so a crash never leaves a torn entry."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class IngestCacheEntry:
+    """
+    Cached results for one source file (identified by content digest):
+    processed books per processor/cleaner version, and raw Docling markdown
+    per page range.
+    """
+
+    def __init__(self, cache: "IngestCache", digest: str):
+        self.cache = cache
+        self.digest = digest
+        self.path = os.path.join(cache.cache_dir, digest)
+
+    def load_book(self, version: str, source_file: str = "") -> Optional[BookData]:
+        """The BookData stored under version, or None."""
+        data = self._read(f"book-{version}.json")
+        if data is None:
+            return None
+        try:
+            data = json.loads(data)
+            book_data = BookData()
+            book_data.title = data["title"]
+            book_data.author = data["author"]
+            book_data.voices = dict(data.get("voices", {}))
+            book_data.chapters = [Chapter(**chapter) for chapter in data["chapters"]]
+        except (ValueError, KeyError, TypeError):
+            return None  # Written by an incompatible version: treat as a miss
+        book_data.source_file = source_file or data.get("source_file", "")
+        return book_data
+
+    def save_book(self, version: str, book_data: BookData):
+        self._write(f"book-{version}.json", json.dumps({
+            "title": book_data.title,
+            "author": book_data.author,
+            "source_file": book_data.source_file,
+            "voices": book_data.voices,
+            "chapters": [dataclasses.asdict(chapter) for chapter in book_data.chapters],
+        }, ensure_ascii=False))
+
+    def load_markdown(self, name: str) -> Optional[str]:
+        return self._read(f"{name}.md")
+
+    def save_markdown(self, name: str, markdown_text: str):
+        self._write(f"{name}.md", markdown_text)
+
+    def _read(self, file_name: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self.path, file_name), 'r', encoding='utf-8') as f:
+                text = f.read()
+        except OSError:
+            return None
+        self.cache.touch(self.digest)
+        return text
+
+    def _write(self, file_name: str, text: str):
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            _atomic_write(os.path.join(self.path, file_name), text)
+        except OSError:
+            return  # A read-only or full disk only costs the cache, never the load
+        self.cache.touch(self.digest)
+        self.cache.evict()
+
+
+class IngestCache:
+    """
+    Bounded on-disk cache of BookSmith ingestion results. Each source file
+    gets a directory named after its content SHA1, so renamed or moved copies
+    still hit, and an edited file never does. Books are stored per processor
+    and TextCleaner version: bumping either re-runs extraction, but a PDF can
+    still reuse its cached Docling markdown and skip layout analysis.
+    Least recently used source files are evicted.
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int = INGEST_CACHE_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def entry(self, file_path: str) -> IngestCacheEntry:
+        """Cache entry for the current contents of file_path (hashes the file)."""
+        return IngestCacheEntry(self, _file_digest(file_path))
+
+    def touch(self, digest: str):
+        """Mark a source file as recently used."""
+        try:
+            os.utime(os.path.join(self.cache_dir, digest))
+        except OSError:
+            pass
+
+    def evict(self):
+        with self._lock:
+            try:
+                entries = [e for e in os.scandir(self.cache_dir) if e.is_dir()]
+            except OSError:
+                return
+            entries.sort(key=lambda e: e.stat().st_mtime)
+            for stale in entries[:max(0, len(entries) - self.max_entries)]:
+                shutil.rmtree(stale.path, ignore_errors=True)
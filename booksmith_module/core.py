@@ -4,10 +4,12 @@ Pure Python with no GUI dependencies - ready for pipeline integration.
 """
 
 import re
+import html
+import time
 import ftfy
 import unicodedata
-from dataclasses import dataclass
-from typing import List, Dict
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional
 
 
 @dataclass
@@ -18,6 +20,8 @@ class Chapter:
     text: str
     style_prompt: str = ""
     enabled: bool = True
+    voice: str = ""  # Key into BookData.voices; empty = narrator (master voice)
+    spans: List[Dict] = field(default_factory=list)  # Optional [{"text", "voice"}] overriding text for rendering
 
 
 class BookData:
@@ -28,24 +32,75 @@ class BookData:
         self.author: str = ""
         self.chapters: List[Chapter] = []
         self.source_file: str = ""
+        self.voices: Dict[str, str] = {}  # Character voice key -> reference audio path
 
     def to_manifest(self) -> Dict:
         """Generate JSON manifest with only enabled chapters (renumbered sequentially)."""
         enabled_chapters = [ch for ch in self.chapters if ch.enabled]
 
-        return {
+        chapters = []
+        for idx, ch in enumerate(enabled_chapters, start=1):
+            entry = {
+                "id": idx,
+                "label": ch.label,
+                "style_prompt": ch.style_prompt,
+                "text": ch.text
+            }
+            # Voice fields are only written when used, so single-voice manifests are unchanged
+            if ch.voice:
+                entry["voice"] = ch.voice
+            if ch.spans:
+                entry["spans"] = [dict(span) for span in ch.spans]
+            chapters.append(entry)
+
+        manifest = {
             "title": self.title,
             "author": self.author,
-            "chapters": [
-                {
-                    "id": idx,
-                    "label": ch.label,
-                    "style_prompt": ch.style_prompt,
-                    "text": ch.text
-                }
-                for idx, ch in enumerate(enabled_chapters, start=1)
-            ]
+            "chapters": chapters
         }
+        if self.voices:
+            manifest["voices"] = dict(self.voices)
+        return manifest
+
+
+# --- Cleaning patterns, compiled once at import ---
+
+_PAGE_NUMBER_PATTERNS = [
+    re.compile(r'^\s*Page\s+\d+\s*$', re.MULTILINE),   # "Page 12"
+    re.compile(r'^\s*-\s*\d+\s*-\s*$', re.MULTILINE),  # "- 12 -"
+    re.compile(r'^\s*\d+\s*$', re.MULTILINE),          # Standalone numbers on lines
+    re.compile(r'\[\s*\d+\s*\]', re.MULTILINE),        # "[12]"
+    re.compile(r'^\s*\d+\s*\|', re.MULTILINE),         # "12 |"
+]
+_CAPS_HEADER = re.compile(r'^[A-Z\s]{20,}$', re.MULTILINE)
+_COPYRIGHT = re.compile(r'©.*?All rights reserved\.?', re.IGNORECASE)
+_TABLE_BLOCK = re.compile(r'\|[^\n]*\|\s*\n\s*\|[-:|\s]+\|[\s\S]*?(?=\n\n|\n[^|]|\Z)', re.MULTILINE)
+_TABLE_ROW = re.compile(r'^\s*\|[^\n]+\|\s*$', re.MULTILINE)
+_TABLE_CAPTION = re.compile(r'^Table\s+\d+\.?\d*[:\s]+.*$', re.MULTILINE | re.IGNORECASE)
+_HTML_TAG = re.compile(r'<[^>]+>')
+_CALIBRE_BLOCK = re.compile(r'\{[^}]*calibre[^}]*\}', re.IGNORECASE)
+_MULTI_SPACE = re.compile(r' {2,}')
+_MULTI_NEWLINE = re.compile(r'\n{3,}')
+_NOTE_TAG = re.compile(r'\[NOTE:.*?\]', re.IGNORECASE)
+_INSTRUCTION_TAG = re.compile(r'\[INSTRUCTION:.*?\]', re.IGNORECASE)
+_REPEATED_PUNCT = re.compile(r'([!?.])\1{3,}')
+
+# Typographic ligatures -> plain letters (TTS models may not handle these properly)
+_LIGATURES = {
+    'ﬁ': 'fi',
+    'ﬂ': 'fl',
+    'ﬀ': 'ff',
+    'ﬃ': 'ffi',
+    'ﬄ': 'ffl',
+    'ﬆ': 'st',
+    'Ꜳ': 'AA',
+    'ꜳ': 'aa',
+}
+# Zero-width chars, BOM, soft hyphen and control characters except \t, \n and \r, in one pass
+_INVISIBLE_CHARS = re.compile('[\u200B\u200C\u200D\uFEFF\u00AD\x00-\x08\x0B-\x0C\x0E-\x1F\x7F]')
+# The only things ftfy can change in a pure-ASCII line: HTML entities,
+# carriage returns, terminal escapes and control characters
+_FTFY_ASCII_TRIGGERS = re.compile('[&\x00-\x08\x0B-\x1F\x7F]')
 
 
 class TextCleaner:
@@ -57,63 +112,93 @@ class TextCleaner:
     - HTML entities and invisible characters (hallucination triggers)
     - Ligatures and special unicode (breaks tokenization)
     - Footnote markers and reference symbols (interpreted as prompts)
+
+    Stages run in a fixed order (see STAGES). Each uses patterns compiled at
+    import and skips its passes when a cheap substring test rules out a
+    match, and ftfy only sees lines it could actually change. Output is
+    identical to the original one-re.sub-per-rule pipeline
+    (benchmark_ingest.py checks this stage by stage).
     """
 
+    # Bump when cleaning output changes, so cached cleaned text is invalidated
+    VERSION = 1
+
     @staticmethod
-    def clean(text: str) -> str:
-        """Master cleaning pipeline."""
+    def clean(text: str, timings: Optional[Dict[str, float]] = None) -> str:
+        """
+        Master cleaning pipeline. Pass a dict as timings to accumulate seconds
+        spent per stage (keys from STAGES).
+        """
         if not text:
             return ""
 
-        # Stage 1: Fix encoding issues (mojibake, broken UTF-8)
-        text = ftfy.fix_text(text)
-
-        # Stage 2: Normalize unicode (NFC form for consistent rendering)
-        text = unicodedata.normalize('NFC', text)
-
-        # Stage 3: Remove common PDF/EPUB artifacts
-        text = TextCleaner._remove_page_numbers(text)
-        text = TextCleaner._remove_headers_footers(text)
-        text = TextCleaner._fix_ligatures(text)
-
-        # Stage 4: Remove tables (unreadable for TTS)
-        text = TextCleaner._remove_tables(text)
+        for name, stage in TextCleaner.STAGES:
+            if timings is None:
+                text = stage(text)
+            else:
+                start = time.perf_counter()
+                text = stage(text)
+                timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
 
-        # Stage 5: Clean HTML entities and invisible characters
-        text = TextCleaner._remove_html_artifacts(text)
-        text = TextCleaner._remove_invisible_chars(text)
+        return text.strip()
 
-        # Stage 6: Normalize whitespace (critical for TTS chunking)
-        text = TextCleaner._normalize_whitespace(text)
+    @staticmethod
+    def _fix_encoding(text: str) -> str:
+        """
+        Fix encoding issues (mojibake, broken UTF-8) with ftfy.fix_text.
 
-        # Stage 7: Remove potential prompt injections
-        text = TextCleaner._remove_control_sequences(text)
+        ftfy works line by line, so plain-ASCII lines it has nothing to fix
+        are passed through and only runs of other lines are handed to it.
+        Its one piece of cross-line state (HTML unescaping switches off for
+        the rest of the text after the first line containing '<') is
+        carried over to each run.
+        """
+        if text.isascii() and not _FTFY_ASCII_TRIGGERS.search(text):
+            return text
+
+        out, run = [], []
+        tag_seen = run_tag_seen = False
+        lines = text.split('\n')
+        for i, line in enumerate(lines):
+            if i < len(lines) - 1: line += '\n'  # same segments as ftfy: split after each \n
+            elif not line: break
+            if line.isascii() and not _FTFY_ASCII_TRIGGERS.search(line):
+                if run:
+                    out.append(ftfy.fix_text(''.join(run), unescape_html=False if run_tag_seen else "auto"))
+                    run = []
+                out.append(line)
+            else:
+                if not run: run_tag_seen = tag_seen
+                run.append(line)
+            if '<' in line: tag_seen = True
+        if run:
+            out.append(ftfy.fix_text(''.join(run), unescape_html=False if run_tag_seen else "auto"))
+        return ''.join(out)
 
-        return text.strip()
+    @staticmethod
+    def _normalize_unicode(text: str) -> str:
+        """NFC form for consistent rendering."""
+        return unicodedata.normalize('NFC', text)
 
     @staticmethod
     def _remove_page_numbers(text: str) -> str:
         """Remove common page number patterns."""
-        patterns = [
-            r'^\s*Page\s+\d+\s*$',           # "Page 12"
-            r'^\s*-\s*\d+\s*-\s*$',          # "- 12 -"
-            r'^\s*\d+\s*$',                  # Standalone numbers on lines
-            r'\[\s*\d+\s*\]',                # "[12]"
-            r'^\s*\d+\s*\|',                 # "12 |"
-        ]
-        for pattern in patterns:
-            text = re.sub(pattern, '', text, flags=re.MULTILINE)
+        has_bracket, has_pipe = '[' in text, '|' in text
+        for i, pattern in enumerate(_PAGE_NUMBER_PATTERNS):
+            if (i == 3 and not has_bracket) or (i == 4 and not has_pipe):
+                continue
+            text = pattern.sub('', text)
         return text
 
     @staticmethod
     def _remove_headers_footers(text: str) -> str:
         """Remove repeated header/footer content."""
-        # Remove lines that are all caps (often headers)
-        text = re.sub(r'^[A-Z\s]{20,}$', '', text, flags=re.MULTILINE)
-
-        # Remove copyright notices
-        text = re.sub(r'©.*?All rights reserved\.?', '', text, flags=re.IGNORECASE)
+        # Lines that are all caps (often headers)
+        text = _CAPS_HEADER.sub('', text)
 
+        # Copyright notices
+        if '©' in text:
+            text = _COPYRIGHT.sub('', text)
         return text
 
     @staticmethod
@@ -122,90 +207,74 @@ class TextCleaner:
         Replace typographic ligatures with normal characters.
         Critical: TTS models may not handle these properly.
         """
-        ligature_map = {
-            'ﬁ': 'fi',
-            'ﬂ': 'fl',
-            'ﬀ': 'ff',
-            'ﬃ': 'ffi',
-            'ﬄ': 'ffl',
-            'ﬆ': 'st',
-            'Ꜳ': 'AA',
-            'ꜳ': 'aa',
-        }
-        for ligature, replacement in ligature_map.items():
-            text = text.replace(ligature, replacement)
+        # One str.replace per ligature actually present (translate is far slower here)
+        for ligature, replacement in _LIGATURES.items():
+            if ligature in text:
+                text = text.replace(ligature, replacement)
         return text
 
     @staticmethod
     def _remove_tables(text: str) -> str:
         """Remove markdown tables and table-like content."""
-        # Remove markdown tables (with header separators)
-        table_pattern = r'\|[^\n]*\|\s*\n\s*\|[-:|\s]+\|[\s\S]*?(?=\n\n|\n[^|]|\Z)'
-        text = re.sub(table_pattern, '\n', text, flags=re.MULTILINE)
-
-        # Remove standalone table rows
-        text = re.sub(r'^\s*\|[^\n]+\|\s*$', '', text, flags=re.MULTILINE)
+        if '|' in text:
+            # Markdown tables (with header separators), then standalone rows
+            text = _TABLE_BLOCK.sub('\n', text)
+            text = _TABLE_ROW.sub('', text)
 
-        # Remove table caption patterns
-        text = re.sub(r'^Table\s+\d+\.?\d*[:\s]+.*$', '', text, flags=re.MULTILINE | re.IGNORECASE)
-
-        return text
+        # Table caption patterns
+        return _TABLE_CAPTION.sub('', text)
 
     @staticmethod
     def _remove_html_artifacts(text: str) -> str:
         """Clean HTML entities and tags."""
-        # Decode HTML entities
-        import html
         text = html.unescape(text)
-
-        # Remove any remaining HTML tags
-        text = re.sub(r'<[^>]+>', '', text)
-
-        # Remove common EPUB metadata artifacts
-        text = re.sub(r'\{[^}]*calibre[^}]*\}', '', text, flags=re.IGNORECASE)
-
+        if '<' in text:
+            text = _HTML_TAG.sub('', text)
+        # Common EPUB metadata artifacts
+        if '{' in text:
+            text = _CALIBRE_BLOCK.sub('', text)
         return text
 
     @staticmethod
     def _remove_invisible_chars(text: str) -> str:
-        """Remove zero-width and non-printable characters."""
-        invisible_chars = [
-            '\u200B',  # Zero-width space
-            '\u200C',  # Zero-width non-joiner
-            '\u200D',  # Zero-width joiner
-            '\uFEFF',  # Zero-width no-break space (BOM)
-            '\u00AD',  # Soft hyphen
-        ]
-        for char in invisible_chars:
-            text = text.replace(char, '')
-
-        # Remove other control characters except newlines/tabs
-        text = re.sub(r'[\x00-\x08\x0B-\x0C\x0E-\x1F\x7F]', '', text)
-
-        return text
+        """Remove zero-width and non-printable characters (keeps newlines/tabs)."""
+        return _INVISIBLE_CHARS.sub('', text)
 
     @staticmethod
     def _normalize_whitespace(text: str) -> str:
         """Normalize whitespace for consistent TTS chunking."""
         # Replace multiple spaces with single space
-        text = re.sub(r' {2,}', ' ', text)
+        if '  ' in text:
+            text = _MULTI_SPACE.sub(' ', text)
 
         # Replace multiple newlines with double newline (paragraph breaks)
-        text = re.sub(r'\n{3,}', '\n\n', text)
+        if '\n\n\n' in text:
+            text = _MULTI_NEWLINE.sub('\n\n', text)
 
-        # Remove trailing whitespace from lines
-        text = '\n'.join(line.rstrip() for line in text.split('\n'))
-
-        return text
+        # Remove trailing whitespace from lines (split/rstrip/join beats any regex here)
+        return '\n'.join(line.rstrip() for line in text.split('\n'))
 
     @staticmethod
     def _remove_control_sequences(text: str) -> str:
         """Remove patterns that might be interpreted as system prompts."""
-        # Remove markdown-style annotations
-        text = re.sub(r'\[NOTE:.*?\]', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'\[INSTRUCTION:.*?\]', '', text, flags=re.IGNORECASE)
-
-        # Remove excessive punctuation (!!!!, ????)
-        text = re.sub(r'([!?.])\1{3,}', r'\1', text)
-
-        return text
+        # Markdown-style annotations
+        if '[' in text:
+            text = _NOTE_TAG.sub('', text)
+            text = _INSTRUCTION_TAG.sub('', text)
+
+        # Excessive punctuation (!!!!, ????)
+        return _REPEATED_PUNCT.sub(r'\1', text)
+
+
+TextCleaner.STAGES = (
+    ("fix_encoding", TextCleaner._fix_encoding),
+    ("normalize_unicode", TextCleaner._normalize_unicode),
+    ("page_numbers", TextCleaner._remove_page_numbers),
+    ("headers_footers", TextCleaner._remove_headers_footers),
+    ("ligatures", TextCleaner._fix_ligatures),
+    ("tables", TextCleaner._remove_tables),
+    ("html", TextCleaner._remove_html_artifacts),
+    ("invisible_chars", TextCleaner._remove_invisible_chars),
+    ("whitespace", TextCleaner._normalize_whitespace),
+    ("control_sequences", TextCleaner._remove_control_sequences),
+)
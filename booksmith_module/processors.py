@@ -3,161 +3,439 @@ Book file processors for EPUB and PDF formats.
 Uses Docling AI for intelligent PDF layout analysis.
 """
 
+import os
+import pickle
+import posixpath
 import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import List, Optional, Callable
+from typing import List, Optional, Callable, Tuple
+from urllib.parse import unquote
 
-# EPUB processing
-import ebooklib
-from ebooklib import epub
-from bs4 import BeautifulSoup
+# EPUB processing: the zip is read directly (container -> OPF -> spine) and
+# each XHTML document is decompressed only when it is parsed
+from lxml import etree
+from lxml import html as lxml_html
 
-# PDF processing
-from docling.document_converter import DocumentConverter, PdfFormatOption
-from docling.datamodel.pipeline_options import PdfPipelineOptions
+# PDF processing (Docling itself is imported on first use, see PDFProcessor._get_converter)
 import pymupdf  # For PDF bookmark/outline extraction
 
+try:
+    import psutil  # Optional: caps Docling workers by available RAM
+except ImportError:
+    psutil = None
+
+from .cache import IngestCache, IngestCacheEntry
 from .core import BookData, Chapter, TextCleaner
 
+# EPUB documents are parsed and cleaned in a process pool once the book is
+# big enough to pay for the worker start-up. On Windows workers are spawned:
+# each is a fresh interpreter that re-imports the app's main module and this
+# package, so the pool is kept small. _worker_count leaves a core for the GUI,
+# so one- and two-core machines always stay serial
+INGEST_MAX_WORKERS = 4
+# Sized for a 4-core machine (3 workers): spawned workers start side by side in
+# ~0.5 s, and the pool breaks even once the serial work passes ~0.75 s. Serial
+# costs ~0.57 s per MB of XHTML and ~1.9 ms per bookmarked PDF page
+# (benchmark_ingest.py; a projection, see its docstring)
+EPUB_PARALLEL_MIN_BYTES = 3 * 1024 * 1024 // 2
+EPUB_PARALLEL_MIN_DOCS = 4
+# Bookmarked PDFs fan chapter page runs out the same way from this many pages
+PDF_PARALLEL_MIN_PAGES = 400
+
+# Docling converts PDFs in page windows, so only one window's document model
+# is alive per converter. Windows go to worker processes, each loading its own
+# models; their number is capped, and by available RAM when psutil is present
+DOCLING_WINDOW_PAGES = 50
+DOCLING_MAX_WORKERS = 2
+DOCLING_WORKER_MEMORY = 3 * 1024 ** 3  # Models + one window's document, per worker
+
+EPUB_CONTAINER_PATH = "META-INF/container.xml"
+EPUB_DOCUMENT_TYPES = ("application/xhtml+xml", "text/html")
+_EPUB_NS = {
+    "c": "urn:oasis:names:tc:opendocument:xmlns:container",
+    "opf": "http://www.idpf.org/2007/opf",
+    "dc": "http://purl.org/dc/elements/1.1/",
+}
+# Container and OPF are small, trusted-format XML: never fetch or expand anything
+_EPUB_XML_PARSER = etree.XMLParser(resolve_entities=False, no_network=True)
+_XML_DECLARATION = re.compile(rb'^(?:\xef\xbb\xbf)?\s*<\?xml[^>]*\?>')
+_XML_ENCODING = re.compile(rb'encoding\s*=\s*["\']([A-Za-z0-9._-]+)')
+_ASCII_SPACES = ' \t\n\r\f'
+
+
+def _worker_count(jobs: int) -> int:
+    """Pool size for this many jobs, leaving a core for the GUI."""
+    return max(1, min(jobs, INGEST_MAX_WORKERS, (os.cpu_count() or 1) - 1))
+
+
+def _epub_worker_count(sizes: List[int]) -> int:
+    """Pool size for documents of these (uncompressed) sizes; 1 means run serially."""
+    if len(sizes) < EPUB_PARALLEL_MIN_DOCS or sum(sizes) < EPUB_PARALLEL_MIN_BYTES:
+        return 1
+    return _worker_count(len(sizes))
+
+
+def _docling_worker_count(windows: int) -> int:
+    """Docling worker processes for this many windows; 1 means convert in-process."""
+    workers = min(DOCLING_MAX_WORKERS, _worker_count(windows))
+    if psutil is not None:
+        workers = min(workers, psutil.virtual_memory().available // DOCLING_WORKER_MEMORY)
+    return max(1, workers)
+
+
+def _page_windows(first: int, last: int, size: int) -> List[Tuple[int, int]]:
+    """Split 1-based inclusive pages first..last into (first, last) windows of up to size pages."""
+    return [(start, min(start + size - 1, last)) for start in range(first, last + 1, size)]
+
+
+# Markdown blocks that are not running text: headings, tables, lists, quotes,
+# code, Docling's image placeholders
+_STRUCTURAL_BLOCK = re.compile(r'^(?:#|\||[-*+]\s|\d+[.)]\s|>|```|<!--)')
+_SENTENCE_END = re.compile(r'[.!?:;…"\'”’)\]]$')
+
+
+def _stitch_windows(parts: List[str]) -> str:
+    """
+    Join per-window Docling markdown in page order. A block cut by a window
+    boundary is rejoined instead of becoming two blocks: table rows continue
+    the table, and a paragraph that stops mid-sentence continues into the
+    next window's first paragraph.
+    """
+    pieces = []
+    for part in parts:
+        part = part.strip()
+        if not part:
+            continue
+        if pieces:
+            tail = pieces[-1].rsplit('\n\n', 1)[-1]
+            head = part.split('\n\n', 1)[0]
+            if tail.startswith('|') and head.startswith('|'):
+                pieces.append('\n')  # Table continues across the boundary
+            elif _STRUCTURAL_BLOCK.match(tail) or _STRUCTURAL_BLOCK.match(head) or _SENTENCE_END.search(tail):
+                pieces.append('\n\n')
+            elif tail.endswith('-') and head[:1].islower():
+                pieces[-1] = pieces[-1][:-1]  # Word hyphenated across the page break
+            else:
+                pieces.append(' ')  # Paragraph continues
+        pieces.append(part)
+    return ''.join(pieces)
+
+
+def _convert_docling_window(job: Tuple[str, Tuple[int, int]]) -> str:
+    """Docling markdown of one (file_path, page_range) window. Module-level so a process pool can pickle it."""
+    file_path, page_range = job
+    return PDFProcessor._convert_pages(file_path, page_range)
+
+
+def _pool_map(fn: Callable, jobs: list, workers: int,
+              log: Optional[Callable[[str], None]] = None) -> list:
+    """
+    fn over jobs, results in job order, across a process pool when workers > 1.
+    fn must be module-level so the pool can pickle it.
+
+    Only failures of the pool itself (workers that cannot start or die, jobs
+    that cannot be pickled) are logged and answered by running the jobs here.
+    Errors raised by fn propagate: a serial rerun would only repeat them.
+    """
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                try:
+                    results = pool.map(fn, jobs, chunksize=max(1, len(jobs) // (workers * 4)))
+                except OSError as e:  # Workers are started here (frozen app, restricted env...)
+                    raise BrokenProcessPool(f"could not start workers: {e}") from e
+                return list(results)
+        except (BrokenProcessPool, pickle.PicklingError) as e:
+            (log or print)(f"Worker pool unavailable ({type(e).__name__}: {e}), continuing in this process...")
+    return [fn(job) for job in jobs]
+
+
+def _parse_xhtml(content: bytes):
+    """
+    Parse an XHTML document with lxml. Returns its <body> (the <head> only
+    repeats the title), or None for an empty document. Text in
+    script/style/template is dropped, as BeautifulSoup's get_text() does.
+    """
+    # lxml's HTML parser ignores the XML declaration, so honour its encoding
+    # here; without one, EPUB text is UTF-8 (lxml would assume Latin-1)
+    encoding = 'utf-8-sig'
+    declaration = _XML_DECLARATION.match(content)
+    if declaration:
+        declared = _XML_ENCODING.search(declaration.group())
+        if declared:
+            encoding = declared.group(1).decode('ascii')
+        content = content[declaration.end():]
+    try:
+        markup = content.decode(encoding)
+    except (UnicodeDecodeError, LookupError):
+        markup = content  # Let lxml sniff the BOM / <meta> charset
+    try:
+        root = lxml_html.document_fromstring(markup)
+    except (etree.ParserError, ValueError):
+        return None
+    body = root.find('body')
+    root = body if body is not None else root
+    etree.strip_elements(root, 'script', 'style', 'template', with_tail=False)
+    return root
+
+
+def _document_text(root) -> str:
+    """
+    Text nodes joined by newlines. Whitespace-only nodes (indentation between
+    tags) collapse to a single newline or space, as BeautifulSoup does.
+    """
+    pieces = []
+    for piece in root.itertext():
+        if not piece.strip(_ASCII_SPACES):
+            piece = '\n' if '\n' in piece else ' '
+        pieces.append(piece)
+    return '\n'.join(pieces)
+
+
+def _extract_epub_document(job: Tuple[str, str]) -> Optional[Tuple[str, str]]:
+    """
+    Read, parse and clean one document (epub_path, member) straight from the
+    zip. Returns (label, text), or None if it holds too little text to be a
+    chapter. Module-level so a process pool can pickle it.
+    """
+    epub_path, member = job
+    with zipfile.ZipFile(epub_path) as archive:
+        content = archive.read(member)
+
+    root = _parse_xhtml(content)
+    if root is None:
+        return None
+
+    # Extract text and clean it aggressively
+    text = TextCleaner.clean(_document_text(root))
+
+    # Skip if empty after cleaning
+    if not text or len(text.strip()) < 100:
+        return None
+
+    # Try to find chapter title
+    return EPUBProcessor._extract_title(root, member), text
+
+
+def _extract_pdf_chapters(job: Tuple[str, List[Tuple[str, int, int]]]) -> List[Optional[Tuple[str, str]]]:
+    """
+    Extract and clean a run of bookmarked chapters (file_path, [(title,
+    first_page, last_page), ...]), pages 0-based inclusive. Opens its own
+    pymupdf document, so it can run in a worker process. Returns (label, text)
+    per chapter, or None for chapters with very little text.
+    """
+    file_path, ranges = job
+    results = []
+    with pymupdf.open(file_path) as pdf_doc:
+        for title, start_page, end_page in ranges:
+            pages = range(max(start_page, 0), min(end_page, pdf_doc.page_count - 1) + 1)
+            chapter_text = ''.join([pdf_doc[page_idx].get_text() for page_idx in pages])
+
+            # Clean the extracted text
+            chapter_text = TextCleaner.clean(chapter_text).strip()
+
+            # Skip if chapter has very little text
+            results.append((title.strip(), chapter_text) if len(chapter_text) >= 100 else None)
+    return results
+
+
+def _page_batches(ranges: List[Tuple[str, int, int]], batches: int) -> List[List[Tuple[str, int, int]]]:
+    """Split chapter page ranges, in order, into up to `batches` runs of similar page counts."""
+    target = sum(max(0, end - start + 1) for _, start, end in ranges) / batches
+    runs, current, pages = [], [], 0
+    for chapter in ranges:
+        current.append(chapter)
+        pages += max(0, chapter[2] - chapter[1] + 1)
+        if pages >= target and len(runs) < batches - 1:
+            runs.append(current)
+            current, pages = [], 0
+    if current:
+        runs.append(current)
+    return runs
+
 
 class EPUBProcessor:
     """Extract and clean chapters from EPUB files."""
 
+    # Bump when extraction changes what a book comes out as (invalidates IngestCache entries)
+    VERSION = 1
+
     @staticmethod
-    def process(file_path: str) -> BookData:
-        """Main entry point for EPUB processing."""
+    def process(file_path: str, cache: Optional[IngestCache] = None,
+                progress_callback: Optional[Callable[[str], None]] = None) -> BookData:
+        """Main entry point for EPUB processing. With a cache, an unchanged file is loaded from it."""
+        entry = cache.entry(file_path) if cache else None
+        version = f"epub{EPUBProcessor.VERSION}-cleaner{TextCleaner.VERSION}"
+        if entry:
+            cached = entry.load_book(version, file_path)
+            if cached:
+                return cached
+
         book_data = BookData()
         book_data.source_file = file_path
 
-        # Load EPUB
-        book = epub.read_epub(file_path)
-
-        # Extract metadata
-        book_data.title = EPUBProcessor._get_metadata(book, 'title')
-        book_data.author = EPUBProcessor._get_metadata(book, 'creator')
+        # Read metadata and the reading order; no document is decompressed yet
+        with zipfile.ZipFile(file_path) as archive:
+            opf = EPUBProcessor._read_package(archive)
+            if opf is not None:
+                opf_path, package = opf
+                book_data.title = EPUBProcessor._get_metadata(package, 'title')
+                book_data.author = EPUBProcessor._get_metadata(package, 'creator')
+                documents = EPUBProcessor._spine_documents(archive, opf_path, package)
+            else:
+                book_data.title = book_data.author = "Unknown"
+                documents = EPUBProcessor._archive_documents(archive)
 
         # Extract chapters
-        chapters = EPUBProcessor._extract_chapters(book)
+        chapters = EPUBProcessor._chapters_from_documents(file_path, documents, progress_callback)
         book_data.chapters = chapters
 
+        if entry:
+            entry.save_book(version, book_data)
         return book_data
 
     @staticmethod
-    def _get_metadata(book: epub.EpubBook, field: str) -> str:
-        """Extract metadata field from EPUB."""
+    def _read_package(archive: zipfile.ZipFile) -> Optional[Tuple[str, etree._Element]]:
+        """Locate and parse the OPF package document. None if the EPUB has no usable one."""
         try:
-            value = book.get_metadata('DC', field)
-            if value:
-                return value[0][0] if isinstance(value[0], tuple) else value[0]
-        except:
-            pass
-        return "Unknown"
+            container = etree.fromstring(archive.read(EPUB_CONTAINER_PATH), _EPUB_XML_PARSER)
+            rootfile = container.find('.//c:rootfile', _EPUB_NS)
+            opf_path = rootfile.get('full-path')
+            return opf_path, etree.fromstring(archive.read(opf_path), _EPUB_XML_PARSER)
+        except (KeyError, AttributeError, TypeError, etree.XMLSyntaxError):
+            return None
 
     @staticmethod
-    def _extract_chapters(book: epub.EpubBook) -> List[Chapter]:
-        """Extract chapters from EPUB spine."""
-        chapters = []
-        chapter_id = 1
-
-        for item in book.get_items():
-            if item.get_type() == ebooklib.ITEM_DOCUMENT:
-                # Parse HTML content
-                soup = BeautifulSoup(item.get_content(), 'html.parser')
-
-                # Extract text
-                text = soup.get_text(separator='\n')
-
-                # Clean text aggressively
-                text = TextCleaner.clean(text)
+    def _get_metadata(package: etree._Element, field: str) -> str:
+        """Extract a Dublin Core metadata field from the OPF package."""
+        value = package.findtext(f'opf:metadata/dc:{field}', namespaces=_EPUB_NS)
+        if value and value.strip():
+            return value.strip()
+        return "Unknown"
 
-                # Skip if empty after cleaning
-                if not text or len(text.strip()) < 100:
-                    continue
+    @staticmethod
+    def _spine_documents(archive: zipfile.ZipFile, opf_path: str,
+                         package: etree._Element) -> List[Tuple[str, int]]:
+        """(zip member, uncompressed size) of each spine document, in reading order."""
+        manifest = {item.get('id'): item for item in package.iterfind('opf:manifest/opf:item', _EPUB_NS)}
+        opf_dir = posixpath.dirname(opf_path)
+        documents = []
+        seen = set()
+        for itemref in package.iterfind('opf:spine/opf:itemref', _EPUB_NS):
+            item = manifest.get(itemref.get('idref'))
+            if item is None or item.get('media-type') not in EPUB_DOCUMENT_TYPES or not item.get('href'):
+                continue
+            # The EPUB 3 navigation document is a table of contents, not a chapter
+            if 'nav' in (item.get('properties') or '').split():
+                continue
+            member = posixpath.normpath(posixpath.join(opf_dir, unquote(item.get('href').split('#')[0])))
+            if member in seen:
+                continue
+            try:
+                documents.append((member, archive.getinfo(member).file_size))
+            except KeyError:
+                continue  # Listed in the manifest but missing from the zip
+            seen.add(member)
+        return documents
 
-                # Try to find chapter title
-                label = EPUBProcessor._extract_title(soup, item)
+    @staticmethod
+    def _archive_documents(archive: zipfile.ZipFile) -> List[Tuple[str, int]]:
+        """Fallback for EPUBs without a readable OPF: every (X)HTML file in archive order."""
+        return [(info.filename, info.file_size) for info in archive.infolist()
+                if info.filename.lower().endswith(('.xhtml', '.html', '.htm'))]
 
-                chapters.append(Chapter(
-                    id=chapter_id,
-                    label=label,
-                    text=text,
-                    style_prompt=""
-                ))
-                chapter_id += 1
+    @staticmethod
+    def _chapters_from_documents(file_path: str, documents: List[Tuple[str, int]],
+                                 progress_callback: Optional[Callable[[str], None]] = None) -> List[Chapter]:
+        """
+        Parse and clean (member, size) documents of the EPUB, across a process
+        pool for big books, keeping document order and sequential chapter ids.
+        """
+        jobs = [(file_path, member) for member, _ in documents]
+        results = _pool_map(_extract_epub_document, jobs, _epub_worker_count([size for _, size in documents]),
+                            progress_callback)
 
-        return chapters
+        return [Chapter(id=chapter_id, label=label, text=text, style_prompt="")
+                for chapter_id, (label, text) in enumerate((r for r in results if r), start=1)]
 
     @staticmethod
-    def _extract_title(soup: BeautifulSoup, item) -> str:
+    def _extract_title(root: etree._Element, file_name: str = "") -> str:
         """Attempt to extract chapter title from HTML."""
         # Try h1, h2 tags first
         for tag in ['h1', 'h2', 'h3']:
-            heading = soup.find(tag)
-            if heading:
-                title = heading.get_text().strip()
+            heading = next(root.iter(tag), None)
+            if heading is not None:
+                title = ''.join(heading.itertext()).strip()
                 if title:
                     return title
 
         # Fallback to filename
-        if hasattr(item, 'file_name'):
-            return Path(item.file_name).stem.replace('_', ' ').title()
+        if file_name:
+            return Path(file_name).stem.replace('_', ' ').title()
 
         return "Untitled Chapter"
 
 
 class PDFProcessor:
-    """Extract and clean chapters from PDF files using Docling (IBM AI)."""
+    """Extract and clean chapters from PDF files: bookmarks via pymupdf, else Docling (IBM AI)."""
 
     # Shared converter instance (models are loaded once and cached)
     _converter = None
 
+    # Bump when extraction changes what a book comes out as (invalidates IngestCache entries)
+    VERSION = 1
+    # Bump when the Docling pipeline options change (invalidates cached markdown)
+    LAYOUT_VERSION = 1
+
     @staticmethod
-    def process(file_path: str, progress_callback: Optional[Callable[[str], None]] = None) -> BookData:
+    def process(file_path: str, progress_callback: Optional[Callable[[str], None]] = None,
+                cache: Optional[IngestCache] = None) -> BookData:
         """
         Main entry point for PDF processing.
 
+        Tiered: pymupdf reads the metadata and bookmarks first (seconds, no
+        models). Docling's layout analysis only runs when the bookmarks do not
+        yield chapters, and only over the pages that carry a text layer.
+
         Args:
             file_path: Path to the PDF file
             progress_callback: Optional function to call with progress updates
+            cache: Optional IngestCache. An unchanged file is loaded from it;
+                after a cleaner/processor update, Docling's markdown is still
+                reused, so only the cheap steps re-run.
 
         Returns:
             BookData object with extracted chapters
         """
+        entry = cache.entry(file_path) if cache else None
+        version = f"pdf{PDFProcessor.VERSION}-cleaner{TextCleaner.VERSION}"
+        if entry:
+            cached = entry.load_book(version, file_path)
+            if cached:
+                if progress_callback:
+                    progress_callback(f"Loaded {len(cached.chapters)} chapters from cache")
+                return cached
+
         book_data = BookData()
         book_data.source_file = file_path
 
-        # Initialize Docling converter (first time only)
-        if PDFProcessor._converter is None:
-            if progress_callback:
-                progress_callback("Loading Docling AI models (first time only)...")
-
-            # Configure pipeline for optimal TTS text extraction
-            pipeline_options = PdfPipelineOptions()
-            pipeline_options.do_ocr = False  # Disable OCR unless needed (faster)
-            pipeline_options.do_table_structure = False  # Skip tables for audiobooks
-
-            PDFProcessor._converter = DocumentConverter(
-                format_options={
-                    "pdf": PdfFormatOption(pipeline_options=pipeline_options)
-                }
-            )
-
-        # Convert PDF to structured markdown
+        # Extract metadata
         if progress_callback:
-            progress_callback("Analyzing PDF layout with AI...")
+            progress_callback("Extracting metadata...")
 
         try:
-            result = PDFProcessor._converter.convert(file_path)
+            with pymupdf.open(file_path) as pdf_doc:
+                doc_meta = pdf_doc.metadata or {}
+                page_count = pdf_doc.page_count
+                text_pages = PDFProcessor._text_page_range(pdf_doc)
         except Exception as e:
             raise Exception(f"Failed to process PDF: {str(e)}")
 
-        # Extract metadata
-        if progress_callback:
-            progress_callback("Extracting metadata...")
-
-        doc_meta = result.document.meta if hasattr(result.document, 'meta') else {}
-        book_data.title = doc_meta.get('title', '') or Path(file_path).stem.replace('_', ' ').title()
-        book_data.author = doc_meta.get('author', '') or 'Unknown'
+        book_data.title = (doc_meta.get('title') or '').strip() or Path(file_path).stem.replace('_', ' ').title()
+        book_data.author = (doc_meta.get('author') or '').strip() or 'Unknown'
 
         # Try to extract chapters from PDF bookmarks first (most reliable)
         if progress_callback:
@@ -175,7 +453,8 @@ class PDFProcessor:
                 progress_callback("No bookmarks found, analyzing document structure...")
 
             # Export to markdown (Docling automatically removes headers/footers)
-            markdown_text = result.document.export_to_markdown()
+            markdown_text = PDFProcessor._docling_markdown(file_path, text_pages or (1, page_count),
+                                                           progress_callback, entry)
 
             # Parse markdown into chapters
             if progress_callback:
@@ -184,8 +463,123 @@ class PDFProcessor:
             chapters = PDFProcessor._parse_markdown_chapters(markdown_text)
             book_data.chapters = chapters
 
+        if entry:
+            entry.save_book(version, book_data)
         return book_data
 
+    @staticmethod
+    def _text_page_range(pdf_doc) -> Optional[Tuple[int, int]]:
+        """
+        1-based inclusive (first, last) span of pages with a text layer, or
+        None if no page has one. Blank and image-only pages at either end
+        (covers, end papers) give Docling nothing to read with OCR off, so
+        they are left out of its page range. Scans inwards from both ends, so
+        only those edge pages are read.
+        """
+        pages = range(pdf_doc.page_count)
+        first = next((i for i in pages if pdf_doc[i].get_text().strip()), None)
+        if first is None:
+            return None
+        last = next(i for i in reversed(pages) if pdf_doc[i].get_text().strip())
+        return first + 1, last + 1
+
+    @staticmethod
+    def _get_converter(progress_callback: Optional[Callable[[str], None]] = None):
+        """The shared Docling converter, created (and its models loaded) on first use."""
+        if PDFProcessor._converter is None:
+            if progress_callback:
+                progress_callback("Loading Docling AI models (first time only)...")
+            # Imported here: Docling is slow to import, and EPUB-only sessions,
+            # bookmarked PDFs and EPUB worker processes never need it
+            from docling.document_converter import DocumentConverter, PdfFormatOption
+            from docling.datamodel.pipeline_options import PdfPipelineOptions
+
+            # Configure pipeline for optimal TTS text extraction
+            pipeline_options = PdfPipelineOptions()
+            pipeline_options.do_ocr = False  # Disable OCR unless needed (faster)
+            pipeline_options.do_table_structure = False  # Skip tables for audiobooks
+
+            PDFProcessor._converter = DocumentConverter(
+                format_options={
+                    "pdf": PdfFormatOption(pipeline_options=pipeline_options)
+                }
+            )
+        return PDFProcessor._converter
+
+    @staticmethod
+    def _convert_pages(file_path: str, page_range: Tuple[int, int],
+                       progress_callback: Optional[Callable[[str], None]] = None) -> str:
+        """Docling markdown (uncleaned) of the 1-based inclusive page_range, in this process."""
+        converter = PDFProcessor._get_converter(progress_callback)
+        try:
+            result = converter.convert(file_path, page_range=page_range)
+        except Exception as e:
+            raise Exception(f"Failed to process PDF: {str(e)}")
+        return result.document.export_to_markdown()
+
+    @staticmethod
+    def _docling_markdown(file_path: str, page_range: Tuple[int, int],
+                          progress_callback: Optional[Callable[[str], None]] = None,
+                          cache_entry: Optional[IngestCacheEntry] = None) -> str:
+        """
+        Run Docling layout analysis on the 1-based inclusive page_range and
+        return the document as markdown, uncleaned.
+
+        The range is converted in DOCLING_WINDOW_PAGES windows, across worker
+        processes when there are several (see _docling_worker_count), and the
+        windows' markdown is stitched back in page order, rejoining blocks cut
+        by a window boundary (see _stitch_windows). Each finished window is
+        cached in cache_entry when given, so an interrupted conversion resumes
+        where it stopped.
+        """
+        windows = _page_windows(page_range[0], page_range[1], DOCLING_WINDOW_PAGES)
+        names = [f"docling{PDFProcessor.LAYOUT_VERSION}-p{first}-{last}" for first, last in windows]
+        markdown = [cache_entry.load_markdown(name) if cache_entry else None for name in names]
+        todo = [i for i, text in enumerate(markdown) if text is None]
+        if progress_callback and len(todo) < len(windows):
+            progress_callback(f"Reusing cached layout analysis for {len(windows) - len(todo)} of {len(windows)} page windows...")
+
+        def finished(i: int, text: str):
+            markdown[i] = text
+            if cache_entry:
+                cache_entry.save_markdown(names[i], text)
+            if progress_callback and len(windows) > 1:
+                done = sum(t is not None for t in markdown)
+                progress_callback(f"Layout analysis: pages {windows[i][0]}-{windows[i][1]} done "
+                                  f"({done}/{len(windows)} windows)")
+
+        workers = _docling_worker_count(len(todo)) if len(todo) > 1 else 1
+        if workers > 1:
+            if progress_callback:
+                progress_callback(f"Analyzing PDF layout with AI: {len(todo)} windows of up to "
+                                  f"{DOCLING_WINDOW_PAGES} pages on {workers} workers "
+                                  f"(each loads the models once)...")
+            pool = None
+            try:
+                pool = ProcessPoolExecutor(max_workers=workers)
+                try:
+                    futures = {pool.submit(_convert_docling_window, (file_path, windows[i])): i for i in todo}
+                except OSError as e:  # Workers are started here (frozen app, restricted env...)
+                    raise BrokenProcessPool(f"could not start workers: {e}") from e
+                for future in as_completed(futures):
+                    finished(futures[future], future.result())
+            except (BrokenProcessPool, pickle.PicklingError) as e:
+                # The pool failed (e.g. a worker ran out of memory): finish here. Conversion
+                # errors raised inside a worker propagate as they would in-process
+                (progress_callback or print)(f"Parallel layout analysis stopped ({type(e).__name__}: {e}), "
+                                            f"continuing in this process...")
+            finally:
+                if pool is not None:
+                    pool.shutdown(cancel_futures=True)
+            todo = [i for i in todo if markdown[i] is None]
+
+        for i in todo:
+            if progress_callback:
+                progress_callback(f"Analyzing PDF layout with AI (pages {windows[i][0]}-{windows[i][1]})...")
+            finished(i, PDFProcessor._convert_pages(file_path, windows[i], progress_callback))
+
+        return _stitch_windows(markdown)
+
     @staticmethod
     def _extract_chapters_from_bookmarks(file_path: str, progress_callback: Optional[Callable[[str], None]] = None) -> List[Chapter]:
         """
@@ -193,24 +587,22 @@ class PDFProcessor:
         Returns empty list if no suitable bookmarks found.
         """
         try:
-            pdf_doc = pymupdf.open(file_path)
-            toc = pdf_doc.get_toc()
+            with pymupdf.open(file_path) as pdf_doc:
+                toc = pdf_doc.get_toc()
+                page_count = pdf_doc.page_count
 
             if not toc:
-                pdf_doc.close()
                 return []
 
             # Filter TOC to only top-level entries (level 1)
             chapter_bookmarks = [item for item in toc if item[0] == 1]
 
             if len(chapter_bookmarks) < 2:
-                pdf_doc.close()
                 return []
 
-            chapters = []
-
+            ranges = []
             for i, bookmark in enumerate(chapter_bookmarks):
-                level, title, page_num = bookmark
+                level, title, page_num = bookmark[:3]
 
                 # Get the page range for this chapter
                 start_page = page_num - 1
@@ -219,31 +611,20 @@ class PDFProcessor:
                 if i + 1 < len(chapter_bookmarks):
                     end_page = chapter_bookmarks[i + 1][2] - 2
                 else:
-                    end_page = pdf_doc.page_count - 1
-
-                # Extract text from this chapter's pages
-                chapter_text = ""
-                for page_idx in range(start_page, end_page + 1):
-                    if page_idx < 0 or page_idx >= pdf_doc.page_count:
-                        continue
-                    page = pdf_doc[page_idx]
-                    chapter_text += page.get_text()
-
-                # Clean the extracted text
-                chapter_text = TextCleaner.clean(chapter_text)
-
-                # Skip if chapter has very little text
-                if len(chapter_text.strip()) < 100:
-                    continue
-
-                chapters.append(Chapter(
-                    id=len(chapters) + 1,
-                    label=title.strip(),
-                    text=chapter_text.strip(),
-                    style_prompt=""
-                ))
-
-            pdf_doc.close()
+                    end_page = page_count - 1
+
+                ranges.append((title, start_page, end_page))
+
+            # Chapters are read and cleaned in runs (one document open per run),
+            # across worker processes for long books
+            workers = _worker_count(len(ranges)) if page_count >= PDF_PARALLEL_MIN_PAGES else 1
+            if workers > 1 and progress_callback:
+                progress_callback(f"Extracting {len(ranges)} chapters ({page_count} pages) with {workers} workers...")
+            jobs = [(file_path, run) for run in _page_batches(ranges, workers * 4 if workers > 1 else 1)]
+            results = [r for run in _pool_map(_extract_pdf_chapters, jobs, workers, progress_callback) for r in run]
+
+            chapters = [Chapter(id=chapter_id, label=label, text=text, style_prompt="")
+                        for chapter_id, (label, text) in enumerate((r for r in results if r), start=1)]
 
             return chapters if len(chapters) >= 2 else []
 